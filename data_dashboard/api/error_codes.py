@@ -0,0 +1,51 @@
+import asyncio
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from data_dashboard.services.database_service import data_version, db_service
+from data_dashboard.services.error_codes import error_code_stats
+from data_dashboard.services.orders_query import (
+    ERROR_CODE_WINDOWS,
+    ERROR_CODES_DEFAULT_WINDOW,
+    ERROR_CODES_TOP_N,
+    error_code_window_start,
+)
+
+ERROR_CODES_URL = "/_api/error-codes"
+
+# Most codes one request may ask for.
+ERROR_CODES_MAX_LIMIT = 100
+
+
+def _current_stats(window: str, limit: int):
+    version = data_version(db_service.get_watermarks())
+    return version, error_code_stats.get(version, error_code_window_start(window), limit)
+
+
+async def error_codes(request: Request):
+    """
+    The most frequent error codes over ``?window=`` days (one of
+    ERROR_CODE_WINDOWS, empty for all time), at most ``?limit=`` of them,
+    with lines, affected orders and revenue, and first and last seen dates.
+    """
+    window = request.query_params.get("window", ERROR_CODES_DEFAULT_WINDOW)
+    if window not in ERROR_CODE_WINDOWS:
+        return PlainTextResponse("Invalid window", status_code=400)
+    try:
+        limit = int(request.query_params.get("limit", str(ERROR_CODES_TOP_N)))
+    except ValueError:
+        return PlainTextResponse("Invalid limit", status_code=400)
+    if not 1 <= limit <= ERROR_CODES_MAX_LIMIT:
+        return PlainTextResponse("Invalid limit", status_code=400)
+
+    version, stats = await asyncio.to_thread(_current_stats, window, limit)
+    if not stats:
+        return PlainTextResponse("Error code stats unavailable", status_code=503)
+    return JSONResponse({"window": window, "version": version, **stats})
+
+
+error_codes_routes = [
+    Route(ERROR_CODES_URL, error_codes),
+]
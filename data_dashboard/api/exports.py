@@ -0,0 +1,19 @@
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse
+from starlette.routing import Route
+
+from data_dashboard.services.export_service import EXPORT_URL_PREFIX, export_service
+
+
+async def download_export(request: Request):
+    """Serve a finished export file in chunks."""
+    filename = request.path_params["filename"]
+    path = export_service.resolve(request.path_params["token"], filename)
+    if path is None:
+        return PlainTextResponse("Export not found", status_code=404)
+    return FileResponse(path, filename=filename)
+
+
+export_routes = [
+    Route(f"{EXPORT_URL_PREFIX}/{{token}}/{{filename}}", download_export),
+]
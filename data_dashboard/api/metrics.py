@@ -0,0 +1,80 @@
+import os
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from data_dashboard.services.instrumentation import metrics, profiler
+from data_dashboard.services.session_data import session_data
+
+METRICS_URL_PREFIX = "/_metrics"
+
+# Metrics are only served to the local machine unless this is set.
+METRICS_ALLOW_REMOTE = os.getenv("METRICS_ALLOW_REMOTE", "0") in ("1", "true", "True")
+
+_LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def _is_allowed(request: Request) -> bool:
+    return METRICS_ALLOW_REMOTE or (
+        request.client is not None and request.client.host in _LOCAL_HOSTS
+    )
+
+
+async def metrics_json(request: Request):
+    """Per-name latency, call counts and delta sizes as JSON."""
+    if not _is_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return JSONResponse({**metrics.snapshot(), "session_data": session_data.stats()})
+
+
+async def metrics_prometheus(request: Request):
+    """The same metrics in the Prometheus text format."""
+    if not _is_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return PlainTextResponse(
+        metrics.prometheus_text(), media_type="text/plain; version=0.0.4"
+    )
+
+
+async def reset_metrics(request: Request):
+    if not _is_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    metrics.reset()
+    return JSONResponse(metrics.snapshot())
+
+
+async def profile(request: Request):
+    """
+    GET shows the profiler status, POST arms it for the next event slower
+    than ``?threshold_ms=`` and DELETE disarms it.
+    """
+    if not _is_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    if request.method == "POST":
+        try:
+            threshold_ms = float(request.query_params.get("threshold_ms", "500"))
+        except ValueError:
+            return PlainTextResponse("Invalid threshold_ms", status_code=400)
+        profiler.arm(threshold_ms / 1000)
+    elif request.method == "DELETE":
+        profiler.disarm()
+    return JSONResponse(profiler.status())
+
+
+async def latest_profile(request: Request):
+    """The last captured event as folded stacks, ready for a flamegraph tool."""
+    if not _is_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    if profiler.last_profile is None or not profiler.last_profile.is_file():
+        return PlainTextResponse("No profile captured", status_code=404)
+    return PlainTextResponse(profiler.last_profile.read_text(encoding="utf-8"))
+
+
+metrics_routes = [
+    Route(METRICS_URL_PREFIX, metrics_json),
+    Route(f"{METRICS_URL_PREFIX}/prometheus", metrics_prometheus),
+    Route(f"{METRICS_URL_PREFIX}/reset", reset_metrics, methods=["POST"]),
+    Route(f"{METRICS_URL_PREFIX}/profile", profile, methods=["GET", "POST", "DELETE"]),
+    Route(f"{METRICS_URL_PREFIX}/profile/latest", latest_profile),
+]
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from data_dashboard.services.database_service import db_service
+from data_dashboard.services.search_index import IDENTIFIER_FIELDS
+
+ORDERS_LOOKUP_URL = "/_api/orders/lookup"
+
+# Lookups return customer details, so they are only served to the local
+# machine unless this is set.
+ORDERS_LOOKUP_ALLOW_REMOTE = os.getenv("ORDERS_LOOKUP_ALLOW_REMOTE", "0") in (
+    "1",
+    "true",
+    "True",
+)
+
+_LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def _is_allowed(request: Request) -> bool:
+    return ORDERS_LOOKUP_ALLOW_REMOTE or (
+        request.client is not None and request.client.host in _LOCAL_HOSTS
+    )
+
+
+async def orders_lookup(request: Request):
+    """
+    The order lines whose ``?field=`` (phone_number, imei, order_id or
+    document_number) equals ``?value=``, ignoring case, spaces, dashes and
+    the +84 phone prefix.
+    """
+    if not _is_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    field = request.query_params.get("field", "")
+    if field not in IDENTIFIER_FIELDS:
+        return PlainTextResponse("Invalid field", status_code=400)
+    value = request.query_params.get("value", "")
+    if not value.strip():
+        return PlainTextResponse("Missing value", status_code=400)
+
+    rows = await asyncio.to_thread(db_service.find_orders, field, value)
+    return JSONResponse({"field": field, "value": value, "rows": rows})
+
+
+orders_routes = [
+    Route(ORDERS_LOOKUP_URL, orders_lookup),
+]
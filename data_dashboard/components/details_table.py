@@ -84,8 +84,8 @@ def details_table(is_secondary: bool = False) -> rx.Component:
         all_rows_selected = DashboardState.secondary_all_rows_on_page_selected
         total_rows = DashboardState.secondary_total_rows
         current_rows_display = DashboardState.secondary_current_rows_display
-        current_page = DashboardState.secondary_current_page
-        total_pages = DashboardState.secondary_total_pages
+        has_previous_page = DashboardState.secondary_has_previous_page
+        has_next_page = DashboardState.secondary_has_next_page
         sort_column = DashboardState.secondary_sort_column
         sort_ascending = DashboardState.secondary_sort_ascending
         toggle_select_all = DashboardState.toggle_secondary_select_all_on_page
@@ -99,8 +99,8 @@ def details_table(is_secondary: bool = False) -> rx.Component:
         all_rows_selected = DashboardState.all_rows_on_page_selected
         total_rows = DashboardState.total_rows
         current_rows_display = DashboardState.current_rows_display
-        current_page = DashboardState.current_page
-        total_pages = DashboardState.total_pages
+        has_previous_page = DashboardState.current_page > 1
+        has_next_page = DashboardState.current_page < DashboardState.total_pages
         sort_column = DashboardState.sort_column
         sort_ascending = DashboardState.sort_ascending
         toggle_select_all = DashboardState.toggle_select_all_on_page
@@ -248,13 +248,13 @@ def details_table(is_secondary: bool = False) -> rx.Component:
                 rx.el.button(
                     rx.icon(tag="chevron_left", size=18),
                     on_click=previous_page,
-                    disabled=current_page <= 1,
+                    disabled=~has_previous_page,
                     class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50",
                 ),
                 rx.el.button(
                     rx.icon(tag="chevron_right", size=18),
                     on_click=next_page,
-                    disabled=current_page >= total_pages,
+                    disabled=~has_next_page,
                     class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50 ml-2",
                 ),
                 class_name="flex items-center",
@@ -0,0 +1,110 @@
+import reflex as rx
+
+from data_dashboard.services.orders_query import ERROR_CODE_WINDOWS
+from data_dashboard.states.dashboard_state import DashboardState
+
+HEADER_CLASS = "px-3 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider bg-gray-50 border-b border-gray-200"
+CELL_CLASS = "px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100"
+
+
+def error_code_row(stat: rx.Var) -> rx.Component:
+    """One error code with its counts, and a link to its orders."""
+    return rx.el.tr(
+        rx.el.td(
+            rx.el.div(
+                rx.el.span(stat["error_code"], class_name="font-medium"),
+                rx.el.div(
+                    rx.el.div(
+                        class_name="bg-red-500 h-1.5",
+                        style={"width": stat["percent"].to_string() + "%"},
+                    ),
+                    class_name="w-full h-1.5 bg-gray-200 rounded-full overflow-hidden mt-1",
+                ),
+            ),
+            class_name=CELL_CLASS,
+        ),
+        rx.el.td(
+            stat["lines"].to_string() + " (" + stat["percent"].to_string() + "%)",
+            class_name=CELL_CLASS,
+        ),
+        rx.el.td(stat["orders"], class_name=CELL_CLASS),
+        rx.el.td(stat["revenue"], class_name=CELL_CLASS),
+        rx.el.td(stat["first_seen"], class_name=CELL_CLASS),
+        rx.el.td(stat["last_seen"], class_name=CELL_CLASS),
+        rx.el.td(
+            rx.el.button(
+                rx.icon(tag="send_horizontal", size=16),
+                on_click=DashboardState.drill_into_error_code(stat["error_code"]),
+                title="Xem đơn hàng",
+                class_name="text-gray-400 hover:text-gray-600",
+            ),
+            class_name="px-3 py-2 whitespace-nowrap text-right text-sm font-medium border-b border-gray-100",
+        ),
+        class_name="hover:bg-gray-50 bg-white",
+    )
+
+
+def error_codes_panel() -> rx.Component:
+    """The most frequent error codes of a time window, each opening its orders."""
+    return rx.el.div(
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    "Thống kê mã lỗi",
+                    class_name="text-lg font-semibold text-gray-900 mb-1",
+                ),
+                rx.el.div(
+                    DashboardState.error_code_totals["lines"].to_string()
+                    + " dòng lỗi, "
+                    + DashboardState.error_code_totals["orders"].to_string()
+                    + " đơn hàng",
+                    class_name="text-sm text-gray-600",
+                ),
+            ),
+            rx.el.select(
+                *[
+                    rx.el.option(label, value=window)
+                    for window, label in ERROR_CODE_WINDOWS.items()
+                ],
+                value=DashboardState.error_codes_window,
+                on_change=DashboardState.set_error_codes_window,
+                class_name="py-1.5 px-2 border border-gray-300 rounded text-sm text-gray-700 focus:outline-none focus:ring-1 focus:ring-blue-500 focus:border-blue-500",
+            ),
+            class_name="flex items-start justify-between mb-4",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        *[
+                            rx.el.th(name, scope="col", class_name=HEADER_CLASS)
+                            for name in [
+                                "Mã lỗi",
+                                "Số dòng",
+                                "Đơn hàng",
+                                "Doanh thu",
+                                "Lần đầu",
+                                "Lần cuối",
+                                "",
+                            ]
+                        ],
+                    ),
+                    class_name="sticky top-0 z-10 bg-gray-50",
+                ),
+                rx.el.tbody(
+                    rx.foreach(DashboardState.error_code_stats, error_code_row),
+                    class_name="divide-y divide-gray-100",
+                ),
+                class_name="min-w-full",
+            ),
+            rx.cond(
+                DashboardState.error_code_stats.length() == 0,
+                rx.el.p(
+                    "Không có lỗi trong khoảng thời gian này.",
+                    class_name="px-3 py-4 text-sm text-gray-500 text-center",
+                ),
+            ),
+            class_name="overflow-auto border border-gray-200 rounded-lg",
+        ),
+        class_name="p-6 bg-white border border-gray-200 rounded-lg shadow-sm",
+    )
@@ -0,0 +1,51 @@
+import reflex as rx
+from data_dashboard.states.dashboard_state import DashboardState
+
+
+def export_progress() -> rx.Component:
+    """Floating progress card for the export running in the background."""
+    return rx.cond(
+        (DashboardState.export_job_status == "queued")
+        | (DashboardState.export_job_status == "running"),
+        rx.el.div(
+            rx.el.div(
+                rx.el.div(
+                    rx.icon(
+                        tag="loader_circle",
+                        size=16,
+                        class_name="mr-2 animate-spin text-orange-500",
+                    ),
+                    rx.el.span(
+                        DashboardState.export_job_filename,
+                        class_name="text-sm font-medium text-gray-900 truncate",
+                    ),
+                    class_name="flex items-center min-w-0",
+                ),
+                rx.el.button(
+                    "Cancel",
+                    on_click=DashboardState.cancel_export_job,
+                    class_name="ml-4 px-2 py-1 text-xs font-medium text-gray-700 border border-gray-300 rounded hover:bg-gray-50",
+                ),
+                class_name="flex items-center justify-between mb-2",
+            ),
+            rx.el.div(
+                rx.el.div(
+                    class_name="bg-orange-500 h-2 rounded-full transition-all",
+                    style={
+                        "width": DashboardState.export_job_progress.to_string()
+                        + "%"
+                    },
+                ),
+                class_name="w-full bg-gray-200 h-2 rounded-full overflow-hidden",
+            ),
+            rx.el.span(
+                rx.cond(
+                    DashboardState.export_job_status == "queued",
+                    "Đang chờ...",
+                    "Đang xuất " + DashboardState.export_job_progress.to_string() + "%",
+                ),
+                class_name="text-xs text-gray-500 mt-1 block",
+            ),
+            class_name="fixed bottom-6 right-6 z-50 w-72 p-4 bg-white border border-gray-200 rounded-lg shadow-lg",
+        ),
+    )
@@ -24,6 +24,29 @@ def filter_checkbox_item(
     )
 
 
+def facet_checkbox_item(
+    facet: rx.Var,
+    is_checked: rx.Var[bool],
+    on_change: Callable[[str], None],
+) -> rx.Component:
+    """Checkbox item showing how many rows a value matches; greyed out at 0."""
+    return rx.el.label(
+        rx.el.input(
+            type="checkbox",
+            checked=is_checked,
+            on_change=lambda: on_change(facet["value"]),
+            class_name="mr-2 h-4 w-4 border-gray-300 rounded text-blue-600 focus:ring-blue-500 cursor-pointer",
+        ),
+        rx.el.span(facet["value"], class_name="flex-1 truncate"),
+        rx.el.span(facet["count"], class_name="ml-2 text-xs text-gray-400"),
+        class_name=rx.cond(
+            facet["count"].to(int) > 0,
+            "flex items-center text-sm text-gray-700 p-2 hover:bg-gray-50 cursor-pointer rounded",
+            "flex items-center text-sm text-gray-400 p-2 hover:bg-gray-50 cursor-pointer rounded",
+        ),
+    )
+
+
 def status_filter_dropdown(is_secondary: bool = False) -> rx.Component:
     """Dropdown component for filtering by Status."""
     if is_secondary:
@@ -213,10 +236,10 @@ def orders_type_filter_dropdown() -> rx.Component:
         ),
         rx.el.div(
             rx.foreach(
-                DashboardState.unique_types,
-                lambda source_type: filter_checkbox_item(
-                    label=source_type,
-                    is_checked=DashboardState.orders_temp_selected_types.contains(source_type),
+                DashboardState.orders_type_facets,
+                lambda facet: facet_checkbox_item(
+                    facet=facet,
+                    is_checked=DashboardState.orders_temp_selected_types.contains(facet["value"]),
                     on_change=DashboardState.toggle_orders_temp_type,
                 ),
             ),
@@ -247,15 +270,32 @@ def orders_product_filter_dropdown() -> rx.Component:
             "Filter by Product",
             class_name="text-xs font-semibold text-gray-500 px-3 pt-2 pb-1",
         ),
+        rx.el.div(
+            rx.el.input(
+                placeholder="Search product name or code...",
+                on_change=DashboardState.set_orders_product_query.debounce(300),
+                class_name="w-full p-2 border border-gray-300 rounded text-sm focus:outline-none focus:ring-1 focus:ring-blue-500 focus:border-blue-500",
+                default_value=DashboardState.orders_product_query,
+            ),
+            class_name="px-2 pb-1",
+        ),
         rx.el.div(
             rx.foreach(
-                DashboardState.unique_products,
-                lambda product: filter_checkbox_item(
-                    label=product,
-                    is_checked=DashboardState.orders_temp_selected_products.contains(product),
+                DashboardState.orders_product_facets,
+                lambda facet: facet_checkbox_item(
+                    facet=facet,
+                    is_checked=DashboardState.orders_temp_selected_products.contains(facet["value"]),
                     on_change=DashboardState.toggle_orders_temp_product,
                 ),
             ),
+            rx.cond(
+                DashboardState.orders_product_has_more,
+                rx.el.button(
+                    "Load more",
+                    on_click=DashboardState.load_more_orders_products,
+                    class_name="w-full px-3 py-1 text-sm text-blue-600 hover:bg-gray-50 rounded",
+                ),
+            ),
             class_name="max-h-48 overflow-y-auto p-1",
         ),
         rx.el.div(
@@ -380,27 +420,32 @@ def export_dropdown(
     csv_action: EventSpec,
     xlsx_action: EventSpec,
     is_disabled: rx.Var[bool] = False,
+    parquet_action: EventSpec = None,
+    arrow_action: EventSpec = None,
 ) -> rx.Component:
-    """Reusable export dropdown component with CSV and XLSX options."""
+    """Reusable export dropdown component with CSV and XLSX, and optionally Parquet and Arrow, options."""
+    options = [
+        ("file_text", "CSV", csv_action),
+        ("file_spreadsheet", "XLSX", xlsx_action),
+        ("database", "Parquet", parquet_action),
+        ("file_box", "Arrow", arrow_action),
+    ]
     return rx.el.div(
         rx.el.div(
-            rx.el.button(
-                rx.icon(tag="file_text", size=16, class_name="mr-2"),
-                "CSV",
-                on_click=csv_action,
-                disabled=is_disabled,
-                class_name="flex items-center w-full px-3 py-2 text-left text-sm text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
-            ),
-            rx.el.button(
-                rx.icon(tag="file_spreadsheet", size=16, class_name="mr-2"),
-                "XLSX",
-                on_click=xlsx_action,
-                disabled=is_disabled,
-                class_name="flex items-center w-full px-3 py-2 text-left text-sm text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
-            ),
+            *[
+                rx.el.button(
+                    rx.icon(tag=icon, size=16, class_name="mr-2"),
+                    label,
+                    on_click=action,
+                    disabled=is_disabled,
+                    class_name="flex items-center w-full px-3 py-2 text-left text-sm text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
+                )
+                for icon, label, action in options
+                if action is not None
+            ],
             class_name="py-1",
         ),
         class_name="absolute top-full right-0 mt-1 bg-white border border-gray-300 rounded-lg shadow-lg z-50",
-        style={"width": "100px"},  # Match export button width
+        style={"width": "120px"},
         hidden=~show_dropdown,
     )
@@ -0,0 +1,48 @@
+import reflex as rx
+from data_dashboard.states.dashboard_state import DashboardState
+
+
+def order_detail_panel() -> rx.Component:
+    """Side panel listing every column of the order line opened from the orders table."""
+    return rx.cond(
+        DashboardState.show_orders_detail,
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    "Chi tiết đơn hàng",
+                    class_name="text-base font-semibold text-gray-900",
+                ),
+                rx.el.button(
+                    rx.icon(tag="x", size=18),
+                    on_click=DashboardState.close_orders_detail,
+                    class_name="p-1 text-gray-400 hover:text-gray-600",
+                ),
+                class_name="flex items-center justify-between px-4 py-3 border-b border-gray-200",
+            ),
+            rx.cond(
+                DashboardState.orders_detail.length() > 0,
+                rx.el.dl(
+                    rx.foreach(
+                        DashboardState.orders_detail,
+                        lambda field: rx.el.div(
+                            rx.el.dt(
+                                field["label"],
+                                class_name="text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.dd(
+                                field["value"],
+                                class_name="mt-1 text-sm text-gray-900 break-words",
+                            ),
+                            class_name="px-4 py-2 border-b border-gray-100",
+                        ),
+                    ),
+                    class_name="flex-1 overflow-y-auto",
+                ),
+                rx.el.p(
+                    "Dòng đơn hàng này không còn tồn tại.",
+                    class_name="px-4 py-6 text-sm text-gray-500",
+                ),
+            ),
+            class_name="fixed inset-y-0 right-0 z-50 w-96 flex flex-col bg-white border-l border-gray-200 shadow-lg",
+        ),
+    )
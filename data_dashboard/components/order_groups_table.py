@@ -0,0 +1,154 @@
+import reflex as rx
+
+from data_dashboard.components.details_table import table_header_cell
+from data_dashboard.components.orders_table import orders_table_header_cell
+from data_dashboard.states.dashboard_state import DashboardState
+
+ORDER_GROUPS_COLUMN_NAMES = [
+    "Mã đơn hàng",
+    "Ngày Ct",
+    "Tên khách hàng",
+    "Số dòng",
+    "Số lượng",
+    "Doanh thu",
+    "Ghi chú",
+]
+ORDER_ERROR_GROUPS_COLUMN_NAMES = ["Mã đơn hàng", "Thông báo lỗi", "Số dòng"]
+
+CELL_CLASS = "px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100"
+LINE_CELL_CLASS = "px-3 py-1.5 whitespace-nowrap text-xs text-gray-600 border-b border-gray-100"
+
+
+def group_toggle_cell(row: rx.Var, toggle_group) -> rx.Component:
+    """Chevron showing or hiding the lines of an order."""
+    return rx.el.td(
+        rx.el.button(
+            rx.icon(
+                tag=rx.cond(row["expanded"], "chevron_down", "chevron_right"),
+                size=16,
+            ),
+            on_click=toggle_group(row["order_id"]),
+            class_name="text-gray-400 hover:text-gray-600",
+        ),
+        class_name="px-3 py-2 whitespace-nowrap w-12 border-b border-gray-100",
+    )
+
+
+def order_group_row(row: rx.Var, is_secondary: bool) -> rx.Component:
+    """An order, or one of its lines under it when the order is expanded."""
+    toggle_group = (
+        DashboardState.toggle_secondary_group
+        if is_secondary
+        else DashboardState.toggle_orders_group
+    )
+    if is_secondary:
+        order_cells = [row["order_id"], row["error_codes"], row["line_count"]]
+        line_cells = [row["product_code"], row["error_code"], row["imei"]]
+    else:
+        order_cells = [
+            row["order_id"],
+            row["order_date"],
+            row["customer_name"],
+            row["line_count"],
+            row["total_quantity"],
+            row["total_revenue"],
+            row["error_codes"],
+        ]
+        line_cells = [
+            row["product_code"],
+            row["order_date"],
+            row["product_name"],
+            row["imei"],
+            row["quantity"],
+            row["revenue"],
+            row["error_code"],
+        ]
+
+    return rx.cond(
+        row["kind"] == "order",
+        rx.el.tr(
+            group_toggle_cell(row, toggle_group),
+            *[rx.el.td(cell, class_name=CELL_CLASS) for cell in order_cells],
+            class_name="hover:bg-gray-50 bg-white",
+        ),
+        rx.el.tr(
+            rx.el.td(class_name="w-12 border-b border-gray-100"),
+            rx.el.td(line_cells[0], class_name=LINE_CELL_CLASS + " pl-8"),
+            *[rx.el.td(cell, class_name=LINE_CELL_CLASS) for cell in line_cells[1:]],
+            class_name="bg-gray-50",
+        ),
+    )
+
+
+def order_groups_table(is_secondary: bool = False) -> rx.Component:
+    """The orders or order-errors table aggregated to one row per order."""
+    if is_secondary:
+        column_names = ORDER_ERROR_GROUPS_COLUMN_NAMES
+        rows = DashboardState.secondary_group_rows
+        total = DashboardState.secondary_group_total
+        rows_display = DashboardState.secondary_group_rows_display
+        has_previous_page = DashboardState.secondary_group_has_previous_page
+        has_next_page = DashboardState.secondary_group_has_next_page
+        next_page = DashboardState.secondary_group_next_page
+        previous_page = DashboardState.secondary_group_previous_page
+        header_cell = lambda name: table_header_cell(name, is_secondary=True)
+    else:
+        column_names = ORDER_GROUPS_COLUMN_NAMES
+        rows = DashboardState.orders_group_rows
+        total = DashboardState.orders_group_total
+        rows_display = DashboardState.orders_group_rows_display
+        has_previous_page = DashboardState.orders_group_has_previous_page
+        has_next_page = DashboardState.orders_group_has_next_page
+        next_page = DashboardState.orders_group_next_page
+        previous_page = DashboardState.orders_group_previous_page
+        header_cell = orders_table_header_cell
+
+    return rx.el.div(
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th(
+                            scope="col",
+                            class_name="px-3 py-3 w-12 bg-gray-50 border-b border-gray-200",
+                        ),
+                        *[header_cell(name) for name in column_names],
+                    ),
+                    class_name="sticky top-0 z-10 bg-gray-50",
+                ),
+                rx.el.tbody(
+                    rx.foreach(rows, lambda row: order_group_row(row, is_secondary)),
+                    class_name="divide-y divide-gray-100",
+                ),
+                class_name="min-w-full",
+            ),
+            class_name="overflow-auto border border-gray-200 rounded-lg",
+        ),
+        rx.el.div(
+            rx.el.p(
+                total.to_string() + " order(s)",
+                class_name="text-sm text-gray-500",
+            ),
+            rx.el.div(
+                rx.el.span(
+                    "Showing " + rows_display + " of " + total.to_string(),
+                    class_name="text-sm text-gray-500 mr-4",
+                ),
+                rx.el.button(
+                    rx.icon(tag="chevron_left", size=18),
+                    on_click=previous_page,
+                    disabled=~has_previous_page,
+                    class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50",
+                ),
+                rx.el.button(
+                    rx.icon(tag="chevron_right", size=18),
+                    on_click=next_page,
+                    disabled=~has_next_page,
+                    class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50 ml-2",
+                ),
+                class_name="flex items-center",
+            ),
+            class_name="flex items-center justify-between px-4 py-2 border-t border-gray-200 bg-white rounded-b-lg",
+        ),
+        class_name="shadow-sm",
+    )
@@ -1,6 +1,17 @@
 import reflex as rx
 
-from data_dashboard.states.dashboard_state import DashboardState
+from data_dashboard.states.dashboard_state import ORDERS_ROW_HEIGHT, DashboardState
+
+# First and last row in view of the scroll grid, below its sticky header.
+ORDERS_VIEWPORT_SCRIPT = f"""(() => {{
+    const grid = document.getElementById("orders-grid");
+    if (!grid) return [0, 0];
+    const header = grid.querySelector("thead")?.offsetHeight || 0;
+    return [
+        Math.floor(grid.scrollTop / {ORDERS_ROW_HEIGHT}),
+        Math.ceil((grid.scrollTop + grid.clientHeight - header) / {ORDERS_ROW_HEIGHT}),
+    ];
+}})()"""
 
 
 def orders_table_header_cell(name: str, is_sortable: bool = True) -> rx.Component:
@@ -40,9 +51,61 @@ def orders_table_header_cell(name: str, is_sortable: bool = True) -> rx.Componen
     )
 
 
+def orders_selection_banner() -> rx.Component:
+    """Banner offering to extend a full-page selection to every matching row."""
+    return rx.cond(
+        DashboardState.orders_select_all_matching,
+        rx.el.div(
+            rx.el.span(
+                "All "
+                + DashboardState.orders_selected_count.to_string()
+                + " matching row(s) are selected.",
+                class_name="text-sm text-gray-700",
+            ),
+            rx.el.button(
+                "Clear selection",
+                on_click=DashboardState.clear_orders_selection,
+                class_name="ml-2 text-sm font-medium text-blue-600 hover:text-blue-800",
+            ),
+            class_name="flex items-center justify-center px-4 py-2 bg-blue-50 border-b border-blue-100",
+        ),
+        rx.cond(
+            DashboardState.orders_all_rows_on_page_selected
+            & (DashboardState.orders_total_pages > 1)
+            & ~DashboardState.orders_scroll_mode,
+            rx.el.div(
+                rx.el.span(
+                    "All rows on this page are selected.",
+                    class_name="text-sm text-gray-700",
+                ),
+                rx.el.button(
+                    "Select all "
+                    + DashboardState.orders_total_rows.to_string()
+                    + " matching row(s)",
+                    on_click=DashboardState.select_all_orders_matching,
+                    class_name="ml-2 text-sm font-medium text-blue-600 hover:text-blue-800",
+                ),
+                class_name="flex items-center justify-center px-4 py-2 bg-blue-50 border-b border-blue-100",
+            ),
+        ),
+    )
+
+
+def orders_spacer_row(rows: rx.Var) -> rx.Component:
+    """Empty row standing in for the scroll grid rows outside the served window."""
+    return rx.cond(
+        rows > 0,
+        rx.el.tr(
+            rx.el.td(col_span=DashboardState.orders_column_names.length() + 1),
+            style={"height": (rows * ORDERS_ROW_HEIGHT).to_string() + "px"},
+        ),
+    )
+
+
 def orders_table() -> rx.Component:
     """The orders table component displaying DuckDB data."""
     return rx.el.div(
+        orders_selection_banner(),
         rx.el.div(
             rx.el.table(
                 rx.el.thead(
@@ -52,8 +115,12 @@ def orders_table() -> rx.Component:
                                 type="checkbox",
                                 class_name="h-4 w-4 border-gray-300 rounded text-blue-600 focus:ring-blue-500 cursor-pointer",
                                 on_change=DashboardState.toggle_orders_select_all_on_page,
-                                checked=DashboardState.orders_all_rows_on_page_selected
-                                & (DashboardState.orders_paginated_data.length() > 0),
+                                checked=rx.cond(
+                                    DashboardState.orders_scroll_mode,
+                                    DashboardState.orders_select_all_matching,
+                                    DashboardState.orders_all_rows_on_page_selected
+                                    & (DashboardState.orders_paginated_data.length() > 0),
+                                ),
                                 disabled=DashboardState.orders_paginated_data.length() <= 0,
                             ),
                             scope="col",
@@ -70,6 +137,7 @@ def orders_table() -> rx.Component:
                     class_name="sticky top-0 z-10 bg-gray-50",
                 ),
                 rx.el.tbody(
+                    orders_spacer_row(DashboardState.orders_window_rows_before),
                     rx.foreach(
                         DashboardState.orders_paginated_data,
                         lambda row: rx.el.tr(
@@ -78,7 +146,7 @@ def orders_table() -> rx.Component:
                                     type="checkbox",
                                     class_name="h-4 w-4 border-gray-300 rounded text-blue-600 focus:ring-blue-500 cursor-pointer",
                                     on_change=lambda: DashboardState.toggle_orders_row_selection(row["id"]),
-                                    checked=DashboardState.orders_selected_rows.contains(row["id"]),
+                                    checked=DashboardState.orders_page_selected_ids.contains(row["id"]),
                                 ),
                                 class_name="px-3 py-2 whitespace-nowrap w-12 border-b border-gray-100",
                             ),
@@ -86,18 +154,6 @@ def orders_table() -> rx.Component:
                                 row["order_date"],
                                 class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
                             ),
-                            rx.el.td(
-                                row["document_type"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
-                            rx.el.td(
-                                row["document_number"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
-                            rx.el.td(
-                                row["department_code"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
                             rx.el.td(
                                 row["order_id"],
                                 class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
@@ -106,42 +162,10 @@ def orders_table() -> rx.Component:
                                 row["customer_name"],
                                 class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
                             ),
-                            rx.el.td(
-                                row["phone_number"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
-                            rx.el.td(
-                                row["province"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
-                            rx.el.td(
-                                row["district"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
-                            rx.el.td(
-                                row["ward"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
-                            rx.el.td(
-                                row["address"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100 max-w-xs truncate",
-                            ),
                             rx.el.td(
                                 row["product_code"],
                                 class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
                             ),
-                            rx.el.td(
-                                row["product_name"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100 max-w-xs truncate",
-                            ),
-                            rx.el.td(
-                                row["imei"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
-                            rx.el.td(
-                                row["quantity"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
                             rx.el.td(
                                 row["revenue"],
                                 class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
@@ -150,61 +174,90 @@ def orders_table() -> rx.Component:
                                 row["error_code"],
                                 class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
                             ),
-                            rx.el.td(
-                                row["source_type"],
-                                class_name="px-3 py-2 whitespace-nowrap text-sm text-gray-900 border-b border-gray-100",
-                            ),
                             rx.el.td(
                                 rx.el.button(
                                     rx.icon(
                                         tag="send_horizontal",
                                         size=16,
                                     ),
+                                    on_click=DashboardState.open_orders_detail(
+                                        row["id"], row["order_id"]
+                                    ),
                                     variant="ghost",
                                     class_name="text-gray-400 hover:text-gray-600",
                                 ),
                                 class_name="px-3 py-2 whitespace-nowrap text-right text-sm font-medium border-b border-gray-100",
                             ),
                             class_name=rx.cond(
-                                DashboardState.orders_selected_rows.contains(row["id"]),
+                                DashboardState.orders_page_selected_ids.contains(row["id"]),
                                 "bg-gray-50 hover:bg-gray-50",
                                 "hover:bg-gray-50 bg-white",
                             ),
+                            style={"height": f"{ORDERS_ROW_HEIGHT}px"},
                         ),
                     ),
+                    orders_spacer_row(DashboardState.orders_window_rows_after),
                     class_name="divide-y divide-gray-100",
                 ),
                 class_name="min-w-full",
             ),
+            id="orders-grid",
+            # Throttled while scrolling, plus once where the scroll comes to rest.
+            on_scroll=rx.call_script(
+                ORDERS_VIEWPORT_SCRIPT, callback=DashboardState.set_orders_viewport
+            ).throttle(100),
+            on_scroll_end=rx.call_script(
+                ORDERS_VIEWPORT_SCRIPT, callback=DashboardState.set_orders_viewport
+            ),
+            style={"max-height": rx.cond(DashboardState.orders_scroll_mode, "600px", "none")},
             class_name="overflow-auto border border-gray-200 rounded-lg",
         ),
         rx.el.div(
             rx.el.p(
-                DashboardState.orders_selected_rows.length().to_string()
+                DashboardState.orders_selected_count.to_string()
                 + " of "
                 + DashboardState.orders_total_rows.to_string()
                 + " row(s) selected.",
                 class_name="text-sm text-gray-500",
             ),
             rx.el.div(
-                rx.el.span(
-                    "Showing "
-                    + DashboardState.orders_current_rows_display
-                    + " of "
-                    + DashboardState.orders_total_rows.to_string(),
-                    class_name="text-sm text-gray-500 mr-4",
-                ),
                 rx.el.button(
-                    rx.icon(tag="chevron_left", size=18),
-                    on_click=DashboardState.orders_previous_page,
-                    disabled=DashboardState.orders_current_page <= 1,
-                    class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50",
+                    rx.icon(
+                        tag=rx.cond(DashboardState.orders_scroll_mode, "book_open", "scroll_text"),
+                        size=16,
+                    ),
+                    rx.cond(DashboardState.orders_scroll_mode, "Pages", "Scroll"),
+                    on_click=DashboardState.toggle_orders_scroll_mode,
+                    class_name="flex items-center gap-1 px-2 py-1 text-sm text-gray-600 border border-gray-300 rounded hover:bg-gray-50 mr-4",
                 ),
-                rx.el.button(
-                    rx.icon(tag="chevron_right", size=18),
-                    on_click=DashboardState.orders_next_page,
-                    disabled=DashboardState.orders_current_page >= DashboardState.orders_total_pages,
-                    class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50 ml-2",
+                rx.cond(
+                    DashboardState.orders_scroll_mode,
+                    rx.el.span(
+                        DashboardState.orders_total_rows.to_string() + " row(s)",
+                        class_name="text-sm text-gray-500",
+                    ),
+                    rx.el.div(
+                        rx.el.span(
+                            "Showing "
+                            + DashboardState.orders_current_rows_display
+                            + " of "
+                            + DashboardState.orders_total_rows.to_string(),
+                            class_name="text-sm text-gray-500 mr-4",
+                        ),
+                        rx.el.button(
+                            rx.icon(tag="chevron_left", size=18),
+                            on_click=DashboardState.orders_previous_page,
+                            disabled=~DashboardState.orders_has_previous_page,
+                            class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50",
+                        ),
+                        rx.el.button(
+                            rx.icon(tag="chevron_right", size=18),
+                            on_click=DashboardState.orders_next_page,
+                            disabled=~DashboardState.orders_has_next_page,
+                            class_name="p-1 border border-gray-300 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50 ml-2",
+                        ),
+                        class_name="flex items-center",
+                    ),
                 ),
                 class_name="flex items-center",
             ),
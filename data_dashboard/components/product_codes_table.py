@@ -1,4 +1,5 @@
 import reflex as rx
+from data_dashboard.components.filter_dropdown import export_dropdown
 from data_dashboard.states.dashboard_state import DashboardState
 
 
@@ -6,15 +7,39 @@ def product_codes_table() -> rx.Component:
     """Table showing non-existing product codes with compact design."""
     return rx.el.div(
         rx.el.div(
-            rx.el.h3(
-                "Mã hàng không tồn tại",
-                class_name="text-lg font-semibold text-gray-900 mb-3",
+            rx.el.div(
+                rx.el.h3(
+                    "Mã hàng không tồn tại",
+                    class_name="text-lg font-semibold text-gray-900 mb-3",
+                ),
+                rx.el.div(
+                    f"Tổng: {DashboardState.product_codes_total_rows}",
+                    class_name="text-sm text-gray-600 mb-2",
+                ),
             ),
             rx.el.div(
-                f"Tổng: {DashboardState.product_codes_total_rows}",
-                class_name="text-sm text-gray-600 mb-2",
+                rx.el.button(
+                    rx.icon(
+                        tag="upload",
+                        size=14,
+                        class_name="mr-1",
+                    ),
+                    "Export",
+                    on_click=DashboardState.toggle_product_codes_export_dropdown,
+                    disabled=DashboardState.product_codes_total_rows <= 0,
+                    class_name="flex items-center px-2 py-1 text-xs font-medium text-gray-700 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
+                ),
+                export_dropdown(
+                    show_dropdown=DashboardState.show_product_codes_export_dropdown,
+                    csv_action=DashboardState.download_product_codes_csv,
+                    xlsx_action=DashboardState.download_product_codes_xlsx,
+                    is_disabled=DashboardState.product_codes_total_rows <= 0,
+                    parquet_action=DashboardState.download_product_codes_parquet,
+                    arrow_action=DashboardState.download_product_codes_arrow,
+                ),
+                class_name="relative",
             ),
-            class_name="mb-4",
+            class_name="flex items-start justify-between mb-4",
         ),
         rx.el.div(
             rx.el.div(
@@ -1,6 +1,8 @@
 import reflex as rx
 
 from data_dashboard.states.dashboard_state import (
+    CHART_GRANULARITIES,
+    CHART_TIMEFRAMES,
     TOOLTIP_PROPS,
     DashboardState,
 )
@@ -19,6 +21,19 @@ def time_range_button(text: str) -> rx.Component:
     )
 
 
+def granularity_button(granularity: str, text: str) -> rx.Component:
+    """Button for selecting chart bucket size."""
+    return rx.el.button(
+        text,
+        on_click=lambda: DashboardState.set_chart_granularity(granularity),
+        class_name=rx.cond(
+            DashboardState.chart_granularity == granularity,
+            "px-2 py-1 text-xs font-medium text-gray-700 bg-gray-100",
+            "px-2 py-1 text-xs font-medium text-gray-500 bg-white hover:bg-gray-50",
+        ),
+    )
+
+
 def visitors_chart_section() -> rx.Component:
     """The section displaying the total visitors chart."""
     return rx.el.div(
@@ -29,15 +44,21 @@ def visitors_chart_section() -> rx.Component:
                     class_name="text-lg font-semibold text-gray-900",
                 ),
                 rx.el.p(
-                    "Thống kê thành công và thất bại trong 3 tháng gần nhất",
+                    "Thống kê thành công và thất bại: "
+                    + DashboardState.selected_visitor_timeframe.lower(),
                     class_name="text-sm text-gray-500",
                 ),
             ),
             rx.el.div(
-                time_range_button("3 tháng gần nhất"),
-                time_range_button("30 ngày gần nhất"),
-                time_range_button("7 ngày gần nhất"),
-                class_name="flex items-center space-x-2",
+                rx.el.div(
+                    *[
+                        granularity_button(granularity, text)
+                        for granularity, text in CHART_GRANULARITIES.items()
+                    ],
+                    class_name="flex items-center border border-gray-300 rounded-md overflow-hidden divide-x divide-gray-300",
+                ),
+                *[time_range_button(text) for text in CHART_TIMEFRAMES],
+                class_name="flex flex-wrap items-center gap-2",
             ),
             class_name="flex flex-wrap items-center justify-between mb-4 gap-y-2",
         ),
@@ -69,6 +90,11 @@ def visitors_chart_section() -> rx.Component:
                 min_tick_gap=16,
             ),
             rx.recharts.y_axis(hide=True, domain=["auto", "auto"]),
+            rx.recharts.y_axis(
+                y_axis_id="revenue",
+                orientation="right",
+                hide=True,
+            ),
             rx.recharts.area(
                 data_key="series1",
                 name="Thất bại",
@@ -99,6 +125,17 @@ def visitors_chart_section() -> rx.Component:
                     "strokeWidth": 2,
                 },
             ),
+            rx.recharts.area(
+                data_key="revenue",
+                name="Doanh thu",
+                y_axis_id="revenue",
+                type_="monotone",
+                stroke="#2563eb",
+                fill="none",
+                stroke_width=1.5,
+                stroke_dasharray="4 3",
+                dot=False,
+            ),
             rx.el.defs(
                 rx.el.linear_gradient(
                     rx.el.stop(
@@ -144,5 +181,10 @@ def visitors_chart_section() -> rx.Component:
                 "bottom": 0,
             },
         ),
+        id="visitors-chart",
+        on_mount=rx.call_script(
+            "document.getElementById('visitors-chart').clientWidth",
+            callback=DashboardState.set_chart_pixel_width,
+        ),
         class_name="p-5 bg-white border border-gray-200 rounded-lg shadow-sm mt-5",
     )
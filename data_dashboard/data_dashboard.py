@@ -1,6 +1,13 @@
 import reflex as rx
+from starlette.applications import Starlette
 
+from data_dashboard.api.error_codes import error_codes_routes
+from data_dashboard.api.exports import export_routes
+from data_dashboard.api.metrics import metrics_routes
+from data_dashboard.api.orders import orders_routes
 from data_dashboard.components.details_table import details_table
+from data_dashboard.components.error_codes_panel import error_codes_panel
+from data_dashboard.components.export_progress import export_progress
 from data_dashboard.components.filter_dropdown import (
     costs_filter_dropdown,
     date_filter_dropdown,
@@ -14,12 +21,26 @@ from data_dashboard.components.filter_dropdown import (
 )
 from data_dashboard.components.header import header_bar
 from data_dashboard.components.key_metrics import key_metrics_section
+from data_dashboard.components.order_detail import order_detail_panel
+from data_dashboard.components.order_groups_table import order_groups_table
 from data_dashboard.components.orders_table import orders_table
 from data_dashboard.components.orders_summary import orders_summary_section
 from data_dashboard.components.product_codes_table import product_codes_table
 from data_dashboard.components.sidebar import sidebar
 from data_dashboard.components.visitors_chart import visitors_chart_section
-from data_dashboard.states.dashboard_state import DashboardState
+from data_dashboard.services.instrumentation import (
+    METRICS_ENABLED,
+    EventMetricsMiddleware,
+    StateSizeMiddleware,
+    metrics,
+    profiler,
+)
+from data_dashboard.services.live_updates import live_updates
+from data_dashboard.services.session_data import (
+    SessionDataMiddleware,
+    evict_idle_sessions,
+)
+from data_dashboard.states.dashboard_state import ORDERS_SEARCH_MODES, DashboardState
 
 
 def overview_section() -> rx.Component:
@@ -36,6 +57,7 @@ def orders_table_header() -> rx.Component:
     return rx.el.div(
         rx.el.h1(
             "Orders Data",
+            id="orders-data",
             class_name="text-2xl font-semibold text-gray-900 mb-4",
         ),
         rx.el.div(
@@ -84,7 +106,25 @@ def orders_table_header() -> rx.Component:
                     date_filter_dropdown(is_orders=True),
                     class_name="relative",
                 ),
+                rx.cond(
+                    DashboardState.orders_error_code != "",
+                    rx.el.button(
+                        "Error: " + DashboardState.orders_error_code,
+                        rx.icon(tag="x", size=14, class_name="ml-1"),
+                        on_click=DashboardState.clear_orders_error_code_filter,
+                        class_name="flex items-center px-3 py-1.5 text-sm font-medium text-red-700 bg-red-50 border border-red-200 rounded-md hover:bg-red-100",
+                    ),
+                ),
                 rx.el.div(
+                    rx.el.select(
+                        *[
+                            rx.el.option(label, value=mode)
+                            for mode, label in ORDERS_SEARCH_MODES.items()
+                        ],
+                        value=DashboardState.orders_search_mode,
+                        on_change=DashboardState.set_orders_search_mode,
+                        class_name="py-1.5 px-2 border border-gray-300 rounded text-sm text-gray-700 focus:outline-none focus:ring-1 focus:ring-blue-500 focus:border-blue-500",
+                    ),
                     rx.el.div(
                         rx.icon(
                             tag="search",
@@ -92,7 +132,11 @@ def orders_table_header() -> rx.Component:
                             class_name="absolute left-3 top-1/2 transform -translate-y-1/2 text-gray-400",
                         ),
                         rx.el.input(
-                            placeholder="Search by customer...",
+                            placeholder=rx.cond(
+                                DashboardState.orders_search_mode == "",
+                                "Search customer, phone or order ID...",
+                                "Exact value...",
+                            ),
                             on_change=DashboardState.set_orders_search_customer.debounce(
                                 300
                             ),
@@ -106,6 +150,7 @@ def orders_table_header() -> rx.Component:
                         on_click=DashboardState.reset_all_orders_filters,
                         class_name="px-3 py-1.5 border border-gray-300 rounded text-sm text-gray-700 hover:bg-gray-50",
                         disabled=(DashboardState.orders_search_customer == "")
+                        & (DashboardState.orders_search_mode == "")
                         & (
                             DashboardState.orders_selected_types.length()
                             == 0
@@ -117,7 +162,8 @@ def orders_table_header() -> rx.Component:
                         & (DashboardState.orders_min_revenue is None)
                         & (DashboardState.orders_max_revenue is None)
                         & (DashboardState.orders_start_date is None)
-                        & (DashboardState.orders_end_date is None),
+                        & (DashboardState.orders_end_date is None)
+                        & (DashboardState.orders_error_code == ""),
                     ),
                     rx.el.button(
                         rx.icon(
@@ -147,7 +193,7 @@ def orders_table_header() -> rx.Component:
                             class_name="ml-1",
                         ),
                         on_click=DashboardState.toggle_orders_export_dropdown,
-                        disabled=DashboardState.orders_filtered_and_sorted_data.length()
+                        disabled=DashboardState.orders_total_rows
                         <= 0,
                         class_name="flex items-center px-3 py-1.5 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-orange-500 transition disabled:opacity-50 disabled:cursor-not-allowed",
                     ),
@@ -155,8 +201,10 @@ def orders_table_header() -> rx.Component:
                         show_dropdown=DashboardState.show_orders_export_dropdown,
                         csv_action=DashboardState.download_orders_csv,
                         xlsx_action=DashboardState.download_orders_xlsx,
-                        is_disabled=DashboardState.orders_filtered_and_sorted_data.length()
+                        is_disabled=DashboardState.orders_total_rows
                         <= 0,
+                        parquet_action=DashboardState.download_orders_parquet,
+                        arrow_action=DashboardState.download_orders_arrow,
                     ),
                     class_name="relative",
                 ),
@@ -166,7 +214,8 @@ def orders_table_header() -> rx.Component:
                         size=16,
                         class_name="mr-1.5",
                     ),
-                    "View",
+                    rx.cond(DashboardState.orders_group_by_order, "By line", "By order"),
+                    on_click=DashboardState.toggle_orders_group_view,
                     class_name="flex items-center px-3 py-1.5 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-orange-500 transition",
                 ),
                 class_name="flex items-center space-x-2",
@@ -285,7 +334,7 @@ def data_table_header() -> rx.Component:
                             class_name="ml-1",
                         ),
                         on_click=DashboardState.toggle_export_dropdown,
-                        disabled=DashboardState.filtered_and_sorted_data.length()
+                        disabled=DashboardState.total_rows
                         <= 0,
                         class_name="flex items-center px-3 py-1.5 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-orange-500 transition disabled:opacity-50 disabled:cursor-not-allowed",
                     ),
@@ -293,7 +342,7 @@ def data_table_header() -> rx.Component:
                         show_dropdown=DashboardState.show_export_dropdown,
                         csv_action=DashboardState.download_csv,
                         xlsx_action=DashboardState.download_xlsx,
-                        is_disabled=DashboardState.filtered_and_sorted_data.length()
+                        is_disabled=DashboardState.total_rows
                         <= 0,
                     ),
                     class_name="relative",
@@ -374,7 +423,7 @@ def secondary_data_table_header() -> rx.Component:
                             class_name="ml-1",
                         ),
                         on_click=DashboardState.toggle_secondary_export_dropdown,
-                        disabled=DashboardState.secondary_filtered_and_sorted_data.length()
+                        disabled=DashboardState.secondary_total_rows
                         <= 0,
                         class_name="flex items-center px-3 py-1.5 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-orange-500 transition disabled:opacity-50 disabled:cursor-not-allowed",
                     ),
@@ -382,8 +431,10 @@ def secondary_data_table_header() -> rx.Component:
                         show_dropdown=DashboardState.show_secondary_export_dropdown,
                         csv_action=DashboardState.download_secondary_csv,
                         xlsx_action=DashboardState.download_secondary_xlsx,
-                        is_disabled=DashboardState.secondary_filtered_and_sorted_data.length()
+                        is_disabled=DashboardState.secondary_total_rows
                         <= 0,
+                        parquet_action=DashboardState.download_secondary_parquet,
+                        arrow_action=DashboardState.download_secondary_arrow,
                     ),
                     class_name="relative",
                 ),
@@ -393,7 +444,8 @@ def secondary_data_table_header() -> rx.Component:
                         size=16,
                         class_name="mr-1.5",
                     ),
-                    "View",
+                    rx.cond(DashboardState.secondary_group_by_order, "By line", "By order"),
+                    on_click=DashboardState.toggle_secondary_group_view,
                     class_name="flex items-center px-3 py-1.5 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-orange-500 transition",
                 ),
                 class_name="flex items-center space-x-2",
@@ -410,19 +462,28 @@ def data_section() -> rx.Component:
         rx.el.div(
             orders_table_header(),
             rx.el.div(
-                orders_table(),
+                rx.cond(
+                    DashboardState.orders_group_by_order,
+                    order_groups_table(),
+                    orders_table(),
+                ),
                 class_name="mt-6",
             ),
             rx.el.div(
                 secondary_data_table_header(),
                 rx.el.div(
-                    details_table(is_secondary=True),
+                    rx.cond(
+                        DashboardState.secondary_group_by_order,
+                        order_groups_table(is_secondary=True),
+                        details_table(is_secondary=True),
+                    ),
                     class_name="mt-6",
                 ),
                 class_name="mt-8",
             ),
             class_name="space-y-6 mb-8",
         ),
+        error_codes_panel(),
         # New layout section (similar to account_section and summary_section)
         rx.el.div(
             rx.el.div(
@@ -435,10 +496,22 @@ def data_section() -> rx.Component:
             ),
             class_name="flex flex-col lg:flex-row",
         ),
+        export_progress(),
+        order_detail_panel(),
         class_name="space-y-6",
     )
 
 
+async def poll_live_updates(app: rx.App):
+    """One watermark poller per process, shared by every session."""
+    await live_updates.run(app, DashboardState)
+
+
+async def evict_idle_session_data(app: rx.App):
+    """Free the tables of sessions that went idle."""
+    await evict_idle_sessions(app, DashboardState)
+
+
 def index() -> rx.Component:
     """The main dashboard page with sidebar navigation."""
     return rx.el.div(
@@ -469,5 +542,19 @@ app = rx.App(
         rx.el.h1: {"font_family": "JetBrains Mono,ui-monospace,monospace"},
         rx.el.h2: {"font_family": "JetBrains Mono,ui-monospace,monospace"},
     },
+    api_transformer=Starlette(
+        routes=export_routes + metrics_routes + error_codes_routes + orders_routes
+    ),
 )
 app.add_page(index, route="/")
+app.register_lifespan_task(poll_live_updates)
+app.register_lifespan_task(evict_idle_session_data)
+# Ahead of hydration, so a returning idle session is hydrated with its tables.
+app.add_middleware(SessionDataMiddleware(DashboardState), index=0)
+
+# Every deployment checks state var sizes; timings are recorded only when
+# metrics are enabled.
+if METRICS_ENABLED:
+    app.add_middleware(EventMetricsMiddleware(metrics, profiler))
+else:
+    app.add_middleware(StateSizeMiddleware())
@@ -1,25 +1,107 @@
-from typing import TypedDict
+from typing import List, Optional, TypedDict
 
 
 class OrderEntry(TypedDict):
-    """Type definition for order data from DuckDB."""
+    """Type definition for order data from DuckDB, as the orders table loads it."""
 
-    id: int
+    id: int  # Stable across reloads, see ORDERS_ID_SQL
     order_date: str  # "Ngày Ct"
-    document_type: str  # "Mã Ct"
     document_number: str  # "Số Ct"
-    department_code: str  # "Mã bộ phận"
     order_id: str  # "Mã đơn hàng"
     customer_name: str  # "Tên khách hàng"
     phone_number: str  # "Số điện thoại"
-    province: str  # "Tỉnh thành"
-    district: str  # "Quận huyện"
-    ward: str  # "Phường xã"
-    address: str  # "Địa chỉ"
     product_code: str  # "Mã hàng"
     product_name: str  # "Tên hàng"
     imei: str  # "Imei"
-    quantity: str  # "Số lượng"
     revenue: str  # "Doanh thu"
     error_code: str  # "Ghi chú"
     source_type: str  # "Nguồn"
+
+
+class OrderDetailField(TypedDict):
+    """One labelled column of an order line in the detail panel."""
+
+    label: str
+    value: str
+
+
+class OrderGroup(TypedDict):
+    """One order of the order-grouped tables, aggregated over its lines."""
+
+    order_id: str
+    order_date: str  # Latest line date
+    customer_name: str
+    line_count: int
+    total_quantity: int
+    total_revenue: float
+    error_codes: str  # Distinct error codes, comma separated
+    error_lines: int
+
+
+class OrderGroupLine(TypedDict):
+    """A line shown under an expanded order."""
+
+    id: int
+    order_date: str
+    product_code: str
+    product_name: str
+    imei: str
+    quantity: str
+    revenue: str
+    error_code: str
+
+
+class ErrorCodeStat(TypedDict):
+    """How often one error code was reported, over a time window."""
+
+    error_code: str
+    lines: int
+    orders: int  # Distinct orders with at least one such line
+    revenue: float  # Revenue of the failed lines
+    first_seen: str  # Order date of the earliest line
+    last_seen: str
+    percent: float  # Share of the failed lines in the window
+
+
+class ErrorCodeStats(TypedDict):
+    """The most frequent error codes of a window, and totals over all codes."""
+
+    start_date: Optional[str]  # First order date counted, None for all time
+    codes: List[ErrorCodeStat]
+    total: ErrorCodeStat
+
+
+class OrdersFilter(TypedDict):
+    """Snapshot of the filters applied to the orders table."""
+
+    search_customer: str
+    # "" searches names, phones and order ids by substring; an identifier
+    # field name looks that field up by exact value.
+    search_mode: str
+    types: List[str]
+    products: List[str]
+    min_revenue: Optional[float]
+    max_revenue: Optional[float]
+    start_date: Optional[str]
+    end_date: Optional[str]
+    error_code: str  # "" matches any line
+
+
+class OrdersSelection(TypedDict):
+    """Selection expressed as a filter predicate plus explicit exceptions.
+
+    When ``all_matching`` is set, every row matching ``filters`` is selected
+    except the ids in ``excluded``. Ids in ``included`` are always selected.
+    """
+
+    all_matching: bool
+    filters: OrdersFilter
+    included: List[int]
+    excluded: List[int]
+
+
+class FacetCount(TypedDict):
+    """A filter value with the number of rows it would match."""
+
+    value: str
+    count: int
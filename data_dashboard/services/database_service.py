@@ -1,10 +1,69 @@
 import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import duckdb
+import numpy as np
 import pandas as pd
 
+from data_dashboard.models.order import OrdersFilter
+from data_dashboard.services.orders_query import (
+    ORDER_ERRORS_ID_SQL,
+    ORDER_ERRORS_LOAD_ORDER_SQL,
+    ORDERS_FACET_FIELDS,
+    ORDERS_ID_SQL,
+    ORDERS_LIST_COLUMNS,
+    ORDERS_LOAD_ORDER_SQL,
+    ERROR_CODES_TOP_N,
+    PRODUCT_CODES_ID_SQL,
+    error_code_stats_query,
+    identifier_key,
+    identifier_sql,
+    order_group_lines_query,
+    order_identifiers_query,
+    order_groups_query,
+    orders_facets_query,
+)
+from data_dashboard.services.search_index import IDENTIFIER_FIELDS, normalize_identifier
+
+
+# Change markers returned by get_watermarks, in query order.
+WATERMARK_FIELDS = (
+    "orders_count",
+    "orders_updated_at",
+    "codes_count",
+    "codes_detected_at",
+    "tasks_count",
+    "tasks_last_updated",
+)
+
+
+# Tables derived from the orders and rebuilt by each process. They live in an
+# in-memory database, so keeping them up to date never writes (or
+# checkpoints) the orders database while other cursors read it.
+LOOKUP_SCHEMA = """
+    ATTACH ':memory:' AS lookup;
+    CREATE TABLE lookup.order_identifiers (
+        identifier VARCHAR NOT NULL, -- "<field>:<normalized value>", see identifier_key
+        order_id VARCHAR NOT NULL
+    );
+    CREATE INDEX idx_order_identifiers_identifier ON lookup.order_identifiers(identifier);
+"""
+
+
+def _sql_string(value: str) -> str:
+    """SQL literal of a string."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def data_version(watermarks: Dict[str, Any]) -> str:
+    """Fold watermarks into the version string caches are keyed by."""
+    return "|".join(
+        "" if watermarks.get(field) is None else str(watermarks[field])
+        for field in WATERMARK_FIELDS
+    )
+
 
 class DatabaseService:
     """Service layer for DuckDB database operations."""
@@ -14,73 +73,82 @@ class DatabaseService:
             "DB_PATH", "/home/khoi/code/crm-restate/orders.db"
         )
         self._connection = None
+        self._owner_thread = None
+        self._generation = 0
+        self._local = threading.local()
+        self._connection_lock = threading.Lock()
+        # Orders watermarks order_identifiers was last synced at.
+        self._identifiers_watermarks: Optional[Dict[str, Any]] = None
+        self._identifiers_lock = threading.Lock()
 
     def get_connection(self):
-        """Get or create database connection."""
-        if self._connection is None:
-            if Path(self.db_path).exists():
-                self._connection = duckdb.connect(self.db_path)
-            else:
-                raise FileNotFoundError(
-                    f"Database file not found: {self.db_path}"
-                )
-        return self._connection
+        """
+        Get or create database connection.
+        Threads other than the one that opened it get their own cursor,
+        since a DuckDB connection must not be shared between threads.
+        """
+        # Event handlers, the live-updates poller and export workers can all
+        # be first to ask, so opening the connection and its cursors is
+        # serialized; otherwise two threads could each open one.
+        with self._connection_lock:
+            if self._connection is None:
+                if Path(self.db_path).exists():
+                    self._connection = duckdb.connect(self.db_path)
+                    self._connection.execute(LOOKUP_SCHEMA)
+                    self._identifiers_watermarks = None
+                    self._owner_thread = threading.get_ident()
+                    self._generation += 1
+                else:
+                    raise FileNotFoundError(
+                        f"Database file not found: {self.db_path}"
+                    )
+            if threading.get_ident() == self._owner_thread:
+                return self._connection
+            cursor = getattr(self._local, "cursor", None)
+            if cursor is None or self._local.generation != self._generation:
+                cursor = self._connection.cursor()
+                self._local.cursor = cursor
+                self._local.generation = self._generation
+            return cursor
 
     def close_connection(self):
         """Close database connection."""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        with self._connection_lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
 
-    def get_orders_data(self) -> List[Dict[str, Any]]:
+    def get_orders_data(self, updated_since: Any = None) -> List[Dict[str, Any]]:
         """
         Fetch orders data from DuckDB database.
-        Returns data formatted for Reflex table consumption.
+        Returns data formatted for Reflex table consumption: only the columns
+        the table shows or filters on, the rest is read by get_order_detail.
+        With ``updated_since``, only the rows inserted or updated after it.
         """
         try:
             con = self.get_connection()
-            query = """
-                SELECT
-                    ROW_NUMBER() OVER (ORDER BY order_date DESC) as id,
-                    CAST(order_date AS VARCHAR) as "order_date",
-                    document_type as "document_type",
-                    document_number as "document_number",
-                    department_code as "department_code",
-                    order_id as "order_id",
-                    customer_name as "customer_name",
-                    phone_number as "phone_number",
-                    province as "province",
-                    district as "district",
-                    ward as "ward",
-                    address as "address",
-                    product_code as "product_code",
-                    product_name as "product_name",
-                    imei as "imei",
-                    quantity as "quantity",
-                    revenue as "revenue",
-                    error_code as "error_code",
-                    source_type as "source_type"
-                FROM orders
-                ORDER BY order_date DESC
+            # Ids depend on the whole table, so they are assigned before filtering.
+            # Values are turned into display strings by DuckDB, which is much
+            # cheaper than converting a DataFrame cell by cell.
+            columns = ",\n".join(
+                f"COALESCE(CAST({column} AS VARCHAR), '') as \"{column}\""
+                for column in ORDERS_LIST_COLUMNS
+            )
+            query = f"""
+                SELECT * EXCLUDE (updated_at) FROM (
+                    SELECT
+                        {ORDERS_ID_SQL} as id,
+                        {columns},
+                        updated_at
+                    FROM orders
+                )
+                WHERE ? IS NULL OR updated_at > ?
+                ORDER BY {ORDERS_LOAD_ORDER_SQL}
             """
 
-            df = con.execute(query).df()
-
-            # Convert DataFrame to list of dictionaries
-            records = df.to_dict("records")
-
-            # Ensure all values are JSON serializable and convert id to int
-            for record in records:
-                for key, value in record.items():
-                    if key == "id":
-                        # Keep id as integer
-                        record[key] = int(value) if value is not None else 0
-                    elif pd.isna(value):
-                        record[key] = ""
-                    elif isinstance(value, (pd.Timestamp, pd.NaT.__class__)):
-                        record[key] = str(value) if not pd.isna(value) else ""
-                    else:
-                        record[key] = str(value) if value is not None else ""
+            cursor = con.execute(query, [updated_since, updated_since])
+            names = [description[0] for description in cursor.description]
+            records = [dict(zip(names, row)) for row in cursor.fetchall()]
 
             return records
 
@@ -88,6 +156,229 @@ class DatabaseService:
             print(f"Error fetching orders data: {e}")
             return []
 
+    def get_order_detail(self, order_id: str, row_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch every column of one order line by its id. Ids are assigned
+        within an order, so only that order's lines are read, through the
+        order_id index. Returns None if the line is gone.
+        """
+        try:
+            con = self.get_connection()
+            query = f"""
+                SELECT COALESCE(CAST(COLUMNS(* EXCLUDE (id)) AS VARCHAR), '') FROM (
+                    SELECT *, {ORDERS_ID_SQL} as id FROM orders WHERE order_id = ?
+                )
+                WHERE id = ?
+            """
+            cursor = con.execute(query, [order_id, row_id])
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip((description[0] for description in cursor.description), row))
+
+        except Exception as e:
+            print(f"Error fetching order detail: {e}")
+            return None
+
+    def get_order_groups(
+        self,
+        predicate: Tuple[str, List[Any]],
+        sort_column: Optional[str],
+        ascending: bool,
+        limit: int,
+        offset: int,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch one page of orders aggregated over their lines matching
+        ``predicate`` (a SQL clause and its parameters), sorted and paged
+        over orders, with the number of orders on all pages.
+        Returns ([], 0) on error.
+        """
+        try:
+            con = self.get_connection()
+            query, params = order_groups_query(
+                predicate, sort_column, ascending, limit, offset
+            )
+            cursor = con.execute(query, params)
+            names = [description[0] for description in cursor.description][:-1]
+            rows = cursor.fetchall()
+            total = int(rows[0][-1]) if rows else 0
+            groups = [
+                {
+                    name: "" if value is None else value
+                    for name, value in zip(names, row[:-1])
+                }
+                for row in rows
+                if row[0] is not None
+            ]
+            return groups, total
+
+        except Exception as e:
+            print(f"Error fetching order groups: {e}")
+            return [], 0
+
+    def get_order_group_lines(
+        self, predicate: Tuple[str, List[Any]], order_id: str
+    ) -> List[Dict[str, Any]]:
+        """Fetch the lines of one order matching ``predicate``. Returns [] on error."""
+        try:
+            con = self.get_connection()
+            query, params = order_group_lines_query(predicate, order_id)
+            cursor = con.execute(query, params)
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"Error fetching order lines: {e}")
+            return []
+
+    def sync_order_identifiers(self, watermarks: Dict[str, Any] = None):
+        """
+        Bring the lookup.order_identifiers table up to date with the orders at
+        ``watermarks`` (the current ones by default). The first sync in a
+        process, or one after rows were deleted, rebuilds the table; later
+        ones re-index only the orders with a line updated since the last.
+        """
+        watermarks = watermarks or self.get_watermarks()
+        if not watermarks:
+            return
+        with self._identifiers_lock:
+            previous = self._identifiers_watermarks
+            if previous is not None and all(
+                previous[field] == watermarks[field]
+                for field in ("orders_count", "orders_updated_at")
+            ):
+                return
+            rebuild = previous is None or (
+                (watermarks["orders_count"] or 0) < (previous["orders_count"] or 0)
+            )
+            updated_since = None if rebuild else previous["orders_updated_at"]
+            con = self.get_connection().cursor()
+            con.execute("BEGIN TRANSACTION")
+            try:
+                if updated_since is None:
+                    con.execute("DELETE FROM lookup.order_identifiers")
+                else:
+                    con.execute(
+                        """
+                        DELETE FROM lookup.order_identifiers WHERE order_id IN (
+                            SELECT order_id FROM orders WHERE updated_at > ?
+                        )
+                        """,
+                        [updated_since],
+                    )
+                query, params = order_identifiers_query(updated_since)
+                con.execute(f"INSERT INTO lookup.order_identifiers {query}", params)
+                con.execute("COMMIT")
+            except Exception as e:
+                con.execute("ROLLBACK")
+                print(f"Error syncing order identifiers: {e}")
+                return
+            finally:
+                con.close()
+            self._identifiers_watermarks = watermarks
+
+    def find_orders(self, field: str, value: str) -> List[Dict[str, Any]]:
+        """
+        Fetch the order lines whose identifier ``field`` (phone_number, imei,
+        order_id or document_number) equals ``value`` once both are
+        normalized like normalize_identifier, so "0912 345 678" finds
+        "+84 912 345 678". Rows have the shape of get_orders_data.
+        """
+        if field not in IDENTIFIER_FIELDS:
+            raise ValueError(f"Not an identifier field: {field}")
+        identifier = normalize_identifier(field, value)
+        if not identifier:
+            return []
+        try:
+            self.sync_order_identifiers()
+            con = self.get_connection()
+            # Constants rather than parameters, since DuckDB only plans an
+            # index scan for constants.
+            key = identifier_key(field, identifier)
+            order_ids = con.execute(
+                "SELECT DISTINCT order_id FROM lookup.order_identifiers "
+                f"WHERE identifier = {_sql_string(key)}"
+            ).fetchall()
+            if not order_ids:
+                return []
+            # Ids are assigned within an order, so whole orders are read
+            # before the matching lines are kept.
+            columns = ",\n".join(
+                f"COALESCE(CAST({column} AS VARCHAR), '') as \"{column}\""
+                for column in ORDERS_LIST_COLUMNS
+            )
+            query = f"""
+                SELECT * FROM (
+                    SELECT
+                        {ORDERS_ID_SQL} as id,
+                        {columns}
+                    FROM orders
+                    WHERE order_id IN ({", ".join(_sql_string(row[0]) for row in order_ids)})
+                )
+                WHERE {identifier_sql(field)} = ?
+                ORDER BY {ORDERS_LOAD_ORDER_SQL}
+            """
+            cursor = con.execute(query, [identifier])
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"Error looking up orders by {field}: {e}")
+            return []
+
+    def get_orders_facet_counts(self, filters: OrdersFilter) -> Dict[str, Dict[str, int]]:
+        """
+        Count the orders per value of each facet field under ``filters``,
+        in a single scan. Returns {field: {value: count}}, empty on error.
+        """
+        try:
+            con = self.get_connection()
+            query, params = orders_facets_query(filters)
+            counts: Dict[str, Dict[str, int]] = {field: {} for field in ORDERS_FACET_FIELDS}
+            fields = len(ORDERS_FACET_FIELDS)
+            for row in con.execute(query, params).fetchall():
+                values, flags, totals = row[:fields], row[fields:2 * fields], row[2 * fields:]
+                for field, value, flag, total in zip(ORDERS_FACET_FIELDS, values, flags, totals):
+                    if flag and value:
+                        counts[field][str(value)] = int(total)
+            return counts
+
+        except Exception as e:
+            print(f"Error fetching orders facet counts: {e}")
+            return {}
+
+    def get_watermarks(self, con=None) -> Dict[str, Any]:
+        """
+        Get cheap change markers for the data the dashboard reads, through
+        ``con`` when given (e.g. a cursor inside a transaction).
+        Returns an empty dict if they cannot be read.
+        """
+        try:
+            con = con or self.get_connection()
+            query = """
+                SELECT
+                    (SELECT COUNT(*) FROM orders),
+                    (SELECT MAX(updated_at) FROM orders),
+                    (SELECT COUNT(*) FROM non_existing_codes),
+                    (SELECT MAX(detected_at) FROM non_existing_codes),
+                    (SELECT COUNT(*) FROM daily_task_stats),
+                    (SELECT MAX(last_updated) FROM daily_task_stats)
+            """
+            result = con.execute(query).fetchone()
+            return dict(zip(WATERMARK_FIELDS, result))
+
+        except Exception as e:
+            print(f"Error fetching watermarks: {e}")
+            return {}
+
+    def get_data_version(self, con=None) -> str:
+        """
+        Get a cheap fingerprint of the data the dashboard reads.
+        It changes whenever rows are inserted, updated or deleted.
+        """
+        return data_version(self.get_watermarks(con))
+
     def get_table_stats(self) -> Dict[str, Any]:
         """Get basic statistics about the orders table."""
         try:
@@ -169,14 +460,14 @@ class DatabaseService:
         """
         try:
             con = self.get_connection()
-            query = """
+            query = f"""
                 SELECT
-                    ROW_NUMBER() OVER (ORDER BY order_id) as id,
+                    {ORDER_ERRORS_ID_SQL} as id,
                     order_id as "order_id",
                     error_code as "error_code"
                 FROM orders
                 WHERE order_id IS NOT NULL
-                ORDER BY order_id
+                ORDER BY {ORDER_ERRORS_LOAD_ORDER_SQL}
             """
 
             df = con.execute(query).df()
@@ -201,124 +492,103 @@ class DatabaseService:
             print(f"Error fetching orders error data: {e}")
             return []
 
-    def get_daily_task_stats(self, days: int = 90) -> List[Dict[str, Any]]:
+    def get_error_code_stats(
+        self, start_date: Optional[str], limit: int = ERROR_CODES_TOP_N
+    ) -> Dict[str, Any]:
         """
-        Fetch daily task statistics from daily_task_stats table.
-        Returns data formatted for the chart with zero-filling for missing days.
-        Data is grouped by the created_at field converted to date.
+        Count the failed lines per error code since ``start_date`` (all time
+        if None): lines, affected orders and revenue, first and last order
+        date, for the ``limit`` most frequent codes plus totals over all
+        codes. Returns an empty dict on error.
         """
         try:
             con = self.get_connection()
-
-            # Generate date series for the last N days
-            query = f"""
-                WITH date_series AS (
-                    SELECT
-                        (CURRENT_DATE - INTERVAL (generate_series) DAY)::DATE as chart_date
-                    FROM generate_series(0, {days - 1})
-                ),
-                stats_data AS (
-                    SELECT
-                        chart_date,
-                        COALESCE(SUM(completed_tasks), 0) as completed_tasks,
-                        COALESCE(SUM(failed_tasks), 0) as failed_tasks
-                    FROM date_series
-                    LEFT JOIN daily_task_stats ON DATE(daily_task_stats.created_at) = chart_date
-                    GROUP BY chart_date
-                )
-                SELECT
-                    chart_date,
-                    completed_tasks,
-                    failed_tasks
-                FROM stats_data
-                ORDER BY chart_date ASC
-            """
-
-            df = con.execute(query).df()
-
-            # Convert to chart format
-            records = []
-            for _, row in df.iterrows():
-                date_obj = pd.to_datetime(row["chart_date"])
-                records.append(
-                    {
-                        "date": date_obj.strftime("%b %d"),
-                        "series1": int(row["failed_tasks"])
-                        if not pd.isna(row["failed_tasks"])
-                        else 0,
-                        "series2": int(row["completed_tasks"])
-                        if not pd.isna(row["completed_tasks"])
-                        else 0,
-                    }
+            query, params = error_code_stats_query(start_date, limit)
+            cursor = con.execute(query, params)
+            names = [description[0] for description in cursor.description]
+            rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+            total, codes = rows[0], rows[1:]
+            for row in rows:
+                row["error_code"] = row["error_code"] or ""
+                row["revenue"] = float(row["revenue"])
+                row["percent"] = (
+                    round(row["lines"] / total["lines"] * 100, 1) if total["lines"] else 0.0
                 )
-
-            return records
+            return {"start_date": start_date, "codes": codes, "total": total}
 
         except Exception as e:
-            print(f"Error fetching daily task stats: {e}")
-            # Fallback to empty data with proper structure
-            import datetime
-
-            today = datetime.date.today()
-            records = []
-            for i in range(days):
-                date = today - datetime.timedelta(days=i)
-                records.append(
-                    {
-                        "date": date.strftime("%b %d"),
-                        "series1": 0,
-                        "series2": 0,
-                    }
-                )
-            return list(reversed(records))
-
-    def get_monthly_revenue(self, months_ago: int = 0) -> float:
-        """Get total revenue for a specific month (0 = current month, 1 = previous month, etc.)."""
-        try:
-            con = self.get_connection()
-            query = f"""
-                SELECT COALESCE(SUM(revenue), 0) as total_revenue
-                FROM orders
-                WHERE EXTRACT(YEAR FROM order_date) = EXTRACT(YEAR FROM (CURRENT_DATE - INTERVAL '{months_ago} month'))
-                AND EXTRACT(MONTH FROM order_date) = EXTRACT(MONTH FROM (CURRENT_DATE - INTERVAL '{months_ago} month'))
-            """
-            result = con.execute(query).fetchone()
-            return float(result[0]) if result[0] else 0.0
-        except Exception:
-            print("Error fetching monthly revenue: {e}")
-            return 0.0
+            print(f"Error fetching error code stats: {e}")
+            return {}
 
-    def get_monthly_failed_tasks(self, months_ago: int = 0) -> int:
-        """Get total failed tasks for a specific month based on created_at."""
+    def get_task_buckets(self, since: Any = None) -> Dict[str, np.ndarray]:
+        """
+        Fetch completed/failed task counts per stat_date, as column arrays
+        sorted by day. With ``since``, only days updated after it are returned.
+        """
         try:
             con = self.get_connection()
-            query = f"""
-                SELECT COALESCE(SUM(failed_tasks), 0) as total_failed
+            query = """
+                SELECT
+                    stat_date as bucket_date,
+                    SUM(completed_tasks)::BIGINT as completed_tasks,
+                    SUM(failed_tasks)::BIGINT as failed_tasks
                 FROM daily_task_stats
-                WHERE EXTRACT(YEAR FROM created_at) = EXTRACT(YEAR FROM (CURRENT_DATE - INTERVAL '{months_ago} month'))
-                AND EXTRACT(MONTH FROM created_at) = EXTRACT(MONTH FROM (CURRENT_DATE - INTERVAL '{months_ago} month'))
+                WHERE stat_date IS NOT NULL
+                AND (CAST(? AS TIMESTAMP) IS NULL OR last_updated > CAST(? AS TIMESTAMP))
+                GROUP BY stat_date
+                ORDER BY stat_date
             """
-            result = con.execute(query).fetchone()
-            return int(result[0]) if result[0] else 0
+            result = con.execute(query, [since, since]).fetchnumpy()
+            return {
+                "bucket_date": result["bucket_date"].astype("datetime64[D]"),
+                "completed_tasks": np.nan_to_num(result["completed_tasks"]).astype(np.int64),
+                "failed_tasks": np.nan_to_num(result["failed_tasks"]).astype(np.int64),
+            }
+
         except Exception as e:
-            print(f"Error fetching monthly failed tasks: {e}")
-            return 0
+            print(f"Error fetching task buckets: {e}")
+            return {
+                "bucket_date": np.array([], dtype="datetime64[D]"),
+                "completed_tasks": np.array([], dtype=np.int64),
+                "failed_tasks": np.array([], dtype=np.int64),
+            }
 
-    def get_monthly_completed_tasks(self, months_ago: int = 0) -> int:
-        """Get total completed tasks for a specific month based on created_at."""
+    def get_revenue_buckets(self, since: Any = None) -> Dict[str, np.ndarray]:
+        """
+        Fetch order revenue per order_date, as column arrays sorted by day.
+        With ``since``, only days with an order updated after it are returned,
+        each with its full revenue.
+        """
         try:
             con = self.get_connection()
-            query = f"""
-                SELECT COALESCE(SUM(completed_tasks), 0) as total_completed
-                FROM daily_task_stats
-                WHERE EXTRACT(YEAR FROM created_at) = EXTRACT(YEAR FROM (CURRENT_DATE - INTERVAL '{months_ago} month'))
-                AND EXTRACT(MONTH FROM created_at) = EXTRACT(MONTH FROM (CURRENT_DATE - INTERVAL '{months_ago} month'))
+            query = """
+                SELECT
+                    order_date as bucket_date,
+                    COALESCE(SUM(revenue), 0)::DOUBLE as revenue
+                FROM orders
+                WHERE order_date IS NOT NULL
+                AND (
+                    CAST(? AS TIMESTAMP) IS NULL
+                    OR order_date IN (
+                        SELECT DISTINCT order_date FROM orders
+                        WHERE updated_at > CAST(? AS TIMESTAMP)
+                    )
+                )
+                GROUP BY order_date
+                ORDER BY order_date
             """
-            result = con.execute(query).fetchone()
-            return int(result[0]) if result[0] else 0
+            result = con.execute(query, [since, since]).fetchnumpy()
+            return {
+                "bucket_date": result["bucket_date"].astype("datetime64[D]"),
+                "revenue": np.asarray(result["revenue"], dtype=np.float64),
+            }
+
         except Exception as e:
-            print(f"Error fetching monthly completed tasks: {e}")
-            return 0
+            print(f"Error fetching revenue buckets: {e}")
+            return {
+                "bucket_date": np.array([], dtype="datetime64[D]"),
+                "revenue": np.array([], dtype=np.float64),
+            }
 
     def get_non_existing_codes(self) -> List[Dict[str, Any]]:
         """
@@ -327,9 +597,9 @@ class DatabaseService:
         """
         try:
             con = self.get_connection()
-            query = """
+            query = f"""
                 SELECT
-                    ROW_NUMBER() OVER (ORDER BY product_code) as id,
+                    {PRODUCT_CODES_ID_SQL} as id,
                     product_code as "product_code"
                 FROM non_existing_codes
                 WHERE product_code IS NOT NULL AND product_code != ''
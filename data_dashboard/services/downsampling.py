@@ -0,0 +1,33 @@
+from typing import Sequence
+
+import numpy as np
+
+
+def minmax_indices(series: Sequence[np.ndarray], max_points: int) -> np.ndarray:
+    """
+    Pick at most ``max_points`` indices of a set of aligned series.
+
+    The range is split into equal buckets and, for every series given, the
+    minimum and the maximum of each bucket are kept, so spikes and drops
+    survive downsampling. The first and last points are always kept.
+    Returns sorted indices; all of them when nothing needs to be dropped.
+    """
+    n = len(series[0]) if series else 0
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+
+    per_bucket = 2 * len(series)
+    n_buckets = max((max_points - 2) // per_bucket, 1)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+    offsets = np.arange(n_buckets) * size
+
+    keep = [np.array([0, n - 1])]
+    for values in series:
+        values = np.asarray(values, dtype=np.float64)
+        highs = np.pad(values, (0, pad), constant_values=-np.inf).reshape(n_buckets, size)
+        lows = np.pad(values, (0, pad), constant_values=np.inf).reshape(n_buckets, size)
+        keep.append(offsets + highs.argmax(axis=1))
+        keep.append(offsets + lows.argmin(axis=1))
+    return np.unique(np.concatenate(keep))
@@ -0,0 +1,43 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from data_dashboard.services.database_service import db_service
+from data_dashboard.services.orders_query import ERROR_CODES_TOP_N
+
+
+class ErrorCodeStatsCache:
+    """
+    Error-code counts shared by every session, keyed by data version and
+    window, so the panel and the API count the failed lines once per change.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._stats: "OrderedDict[Tuple[str, Optional[str], int], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, version: str, start_date: Optional[str], limit: int = ERROR_CODES_TOP_N
+    ) -> Dict[str, Any]:
+        """Stats of the failed lines since ``start_date`` at ``version``."""
+        if not version:
+            return db_service.get_error_code_stats(start_date, limit)
+        key = (version, start_date, limit)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                self._stats.move_to_end(key)
+                return stats
+
+        stats = db_service.get_error_code_stats(start_date, limit)
+        if stats:
+            with self._lock:
+                self._stats[key] = stats
+                while len(self._stats) > self.max_entries:
+                    self._stats.popitem(last=False)
+        return stats
+
+
+# Global error-code stats cache
+error_code_stats = ErrorCodeStatsCache()
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export when its job has been cancelled."""
+
+
+def artifact_key(parts: Dict[str, Any]) -> str:
+    """
+    Key an export artifact by everything that determines its content:
+    dataset version, filter, sort, selection, columns and format.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ExportJob:
+    """An export running on the worker pool."""
+
+    def __init__(self, key: str, filename: str, version: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.filename = filename
+        # Data version the key was taken at, and whether the export read a later one.
+        self.version = version
+        self.version_moved = False
+        self.status = "queued"  # queued, running, done, failed, cancelled
+        self.url: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        # Last time a session submitted or watched the job.
+        self.last_seen = self.created_at
+        # Sessions waiting on the job; it is cancelled once the last one leaves.
+        self.subscribers: Set[str] = set()
+        self._progress = 0.0
+        self._progress_source: Optional[Callable[[], float]] = None
+        self._interrupt: Optional[Callable[[], None]] = None
+        self._cancelled = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the export written so far, between 0 and 1."""
+        if self.status == "done":
+            return 1.0
+        if self._progress_source is not None:
+            try:
+                self._progress = max(self._progress, min(self._progress_source(), 1.0))
+            except Exception:
+                pass
+        return self._progress
+
+    def report(self, fraction: float):
+        """Record progress from inside the export."""
+        self._progress = max(self._progress, min(fraction, 1.0))
+
+    def track(
+        self,
+        progress: Optional[Callable[[], float]] = None,
+        interrupt: Optional[Callable[[], None]] = None,
+    ):
+        """Attach a progress probe and an interrupt hook for a blocking step."""
+        self._progress_source = progress
+        self._interrupt = interrupt
+        if interrupt is not None and self._cancelled.is_set():
+            interrupt()
+
+    def check_cancelled(self):
+        """Abort the export if the job has been cancelled."""
+        if self._cancelled.is_set():
+            raise ExportCancelled()
+
+    def cancel(self):
+        """Ask the export to stop as soon as possible."""
+        self._cancelled.set()
+        if self._interrupt is not None:
+            try:
+                self._interrupt()
+            except Exception:
+                pass
+
+
+class ExportJobManager:
+    """Runs exports on a worker pool and serves repeated requests from disk."""
+
+    def __init__(self, max_workers: int = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv("EXPORT_WORKERS", "2")),
+            thread_name_prefix="export",
+        )
+        self._jobs: Dict[str, ExportJob] = {}
+        self._running: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        key: str,
+        filename: str,
+        run: Callable[[ExportJob], str],
+        lookup: Callable[[str, str], Optional[str]],
+        on_finish: Callable[[], None] = None,
+        version: Optional[str] = None,
+        subscriber: str = "",
+    ) -> ExportJob:
+        """
+        Start an export, or reuse an identical one, on behalf of the session
+        ``subscriber``.
+
+        ``lookup(key, filename)`` returns the URL of a cached artifact, and
+        ``run(job)`` builds the artifact and returns its URL. ``version`` is
+        the data version ``key`` was taken at.
+        """
+        with self._lock:
+            self._forget_old_jobs()
+            running = self._running.get(key)
+            if (
+                running is not None
+                and not running.finished
+                and not running._cancelled.is_set()
+            ):
+                running.subscribers.add(subscriber)
+                running.last_seen = time.time()
+                return running
+
+            job = ExportJob(key, filename, version)
+            job.subscribers.add(subscriber)
+            self._jobs[job.id] = job
+            cached_url = lookup(key, filename)
+            if cached_url is not None:
+                job.url = cached_url
+                job.status = "done"
+                return job
+
+            self._running[key] = job
+        self._executor.submit(self._run, job, run, on_finish)
+        return job
+
+    def _run(self, job: ExportJob, run: Callable[[ExportJob], str], on_finish):
+        try:
+            job.check_cancelled()
+            job.status = "running"
+            job.url = run(job)
+            job.status = "done"
+        except ExportCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            # Interrupting DuckDB surfaces as a generic error.
+            if job._cancelled.is_set():
+                job.status = "cancelled"
+            else:
+                print(f"Error running export {job.filename}: {e}")
+                job.error = str(e)
+                job.status = "failed"
+        finally:
+            with self._lock:
+                if self._running.get(job.key) is job:
+                    del self._running[job.key]
+            if on_finish is not None:
+                try:
+                    on_finish()
+                except Exception as e:
+                    print(f"Error after export {job.filename}: {e}")
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Look up a job by id."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.last_seen = time.time()
+        return job
+
+    def cancel(self, job_id: str, subscriber: str = ""):
+        """
+        Stop waiting on a job for the session ``subscriber``. The export
+        itself stops only when no other session waits on it.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return
+            job.subscribers.discard(subscriber)
+            if not job.subscribers:
+                job.cancel()
+
+    def _forget_old_jobs(self, max_age: float = 3600.0):
+        """
+        Drop cancelled jobs once they stopped, and jobs nobody has asked
+        about for a while, stopping those still running for no one.
+        """
+        cutoff = time.time() - max_age
+        for job_id, job in list(self._jobs.items()):
+            if job.status == "cancelled":
+                del self._jobs[job_id]
+            elif job.last_seen < cutoff:
+                if not job.finished:
+                    job.cancel()
+                del self._jobs[job_id]
+
+
+# Global export job manager instance
+export_jobs = ExportJobManager()
@@ -0,0 +1,436 @@
+import csv
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pyarrow import ipc
+
+from data_dashboard.models.order import OrdersFilter, OrdersSelection
+from data_dashboard.services.database_service import db_service
+from data_dashboard.services.export_jobs import ExportJob
+from data_dashboard.services.orders_query import (
+    ORDER_ERRORS_EXPORT_COLUMNS,
+    ORDERS_EXPORT_COLUMNS,
+    PRODUCT_CODES_EXPORT_COLUMNS,
+    field_columns,
+    order_errors_export_query,
+    orders_export_query,
+    product_codes_export_query,
+)
+from data_dashboard.services.xlsx_writer import batched, write_xlsx
+
+EXPORT_URL_PREFIX = "/_exports"
+
+# Rows fetched from DuckDB per batch when streaming into a writer.
+EXPORT_BATCH_SIZE = 10_000
+
+# Formats a query can be exported to. Columnar formats keep the record
+# field names and DuckDB's native types; the others use display headers.
+EXPORT_FORMATS = ("csv", "xlsx", "parquet", "arrow")
+COLUMNAR_EXPORT_FORMATS = ("parquet", "arrow")
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _export_columns(columns: Dict[str, str], export_format: str) -> Dict[str, str]:
+    if export_format in COLUMNAR_EXPORT_FORMATS:
+        return field_columns(columns)
+    return columns
+
+
+class ExportService:
+    """
+    Writes exports straight from DuckDB into files served by the export route.
+    Each export is stored under its artifact key, so identical requests can
+    be served from disk until the artifact is garbage-collected.
+    """
+
+    def __init__(
+        self,
+        export_dir: str = None,
+        max_bytes: int = None,
+        max_age_seconds: float = None,
+    ):
+        self.export_dir = Path(
+            export_dir
+            or os.getenv(
+                "EXPORT_DIR",
+                str(Path(tempfile.gettempdir()) / "data_dashboard_exports"),
+            )
+        )
+        self.max_bytes = max_bytes or int(
+            os.getenv("EXPORT_CACHE_MAX_BYTES", str(2 * 1024**3))
+        )
+        self.max_age_seconds = max_age_seconds or float(
+            os.getenv("EXPORT_CACHE_MAX_AGE_SECONDS", str(24 * 3600))
+        )
+
+    def resolve(self, key: str, filename: str) -> Optional[Path]:
+        """Map a download URL back to a finished export file, if it exists."""
+        if not _KEY_PATTERN.match(key) or "/" in filename or "\\" in filename:
+            return None
+        path = self.export_dir / key / filename
+        return path if path.is_file() else None
+
+    def lookup(self, key: str, filename: str) -> Optional[str]:
+        """URL of a cached artifact, refreshing its age so it is kept longer."""
+        path = self.resolve(key, filename)
+        if path is None:
+            return None
+        os.utime(path.parent)
+        return f"{EXPORT_URL_PREFIX}/{key}/{filename}"
+
+    def collect_garbage(self):
+        """Delete artifacts older than the age limit, then the oldest ones over the size limit."""
+        if not self.export_dir.is_dir():
+            return
+        now = time.time()
+        artifacts = []
+        for entry in self.export_dir.iterdir():
+            if not entry.is_dir():
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+                size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+            except OSError:
+                continue
+            if now - mtime > self.max_age_seconds:
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                artifacts.append((mtime, size, entry))
+
+        total = sum(size for _, size, _ in artifacts)
+        for _, size, entry in sorted(artifacts, key=lambda artifact: artifact[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def _snapshot_cursor(self, job: Optional[ExportJob] = None):
+        """
+        Cursor reading a single snapshot of the database. The data version is
+        read first, which pins the snapshot, so the job learns whether the
+        rows it exports are still those of the version its key was taken at.
+        """
+        con = db_service.get_connection().cursor()
+        con.execute("BEGIN TRANSACTION")
+        version = db_service.get_data_version(con)
+        if job is not None and job.version is not None:
+            job.version_moved = version != job.version
+        return con
+
+    def _write_file(
+        self,
+        key: str,
+        filename: str,
+        write: Callable[[Path], None],
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """
+        Let ``write`` produce the export at a temporary path, then publish it.
+        An export that read newer data than its key was taken at is published
+        under a one-off key, so the key never serves rows of another version.
+        Returns the URL path the file is served from.
+        """
+        target_dir = self.export_dir / key
+        target_dir.mkdir(parents=True, exist_ok=True)
+        partial = target_dir / f".{filename}.part"
+        try:
+            write(partial)
+            if job is not None and job.version_moved:
+                key = uuid.uuid4().hex
+                (self.export_dir / key).mkdir(parents=True, exist_ok=True)
+            partial.replace(self.export_dir / key / filename)
+        finally:
+            partial.unlink(missing_ok=True)
+            try:
+                # Only succeeds when a failed or cancelled export left nothing behind.
+                target_dir.rmdir()
+            except OSError:
+                pass
+        return f"{EXPORT_URL_PREFIX}/{key}/{filename}"
+
+    def _copy_to_file(
+        self,
+        query: str,
+        params: list,
+        key: str,
+        filename: str,
+        options: str,
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """Run ``COPY (query) TO file`` so DuckDB streams rows to disk."""
+
+        def write(path: Path):
+            con = self._snapshot_cursor(job)
+            try:
+                if job is not None:
+                    con.execute("SET enable_progress_bar = true")
+                    con.execute("SET enable_progress_bar_print = false")
+                    job.track(
+                        progress=lambda: con.query_progress() / 100,
+                        interrupt=con.interrupt,
+                    )
+                path_literal = str(path).replace("'", "''")
+                con.execute(f"COPY ({query}) TO '{path_literal}' ({options})", params)
+            finally:
+                if job is not None:
+                    job.track()
+                con.close()
+            if job is not None:
+                job.check_cancelled()
+
+        return self._write_file(key, filename, write, job)
+
+    def _query_to_xlsx(
+        self,
+        query: str,
+        params: list,
+        key: str,
+        filename: str,
+        sheet_name: str,
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """Stream a query result into an XLSX file batch by batch."""
+
+        def write(path: Path):
+            con = self._snapshot_cursor(job)
+            try:
+                total = con.execute(
+                    f"SELECT COUNT(*) FROM ({query})", params
+                ).fetchone()[0]
+                con.execute(query, params)
+                headers = [column[0] for column in con.description]
+
+                def batches():
+                    while True:
+                        if job is not None:
+                            job.check_cancelled()
+                        batch = con.fetchmany(EXPORT_BATCH_SIZE)
+                        if not batch:
+                            return
+                        yield batch
+
+                write_xlsx(
+                    str(path),
+                    headers,
+                    batches(),
+                    sheet_name=sheet_name,
+                    on_batch=(
+                        (lambda written: job.report(written / total))
+                        if job is not None and total
+                        else None
+                    ),
+                )
+            finally:
+                con.close()
+
+        return self._write_file(key, filename, write, job)
+
+    def _query_to_arrow(
+        self,
+        query: str,
+        params: list,
+        key: str,
+        filename: str,
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """Stream a query result into an Arrow IPC file as record batches."""
+
+        def write(path: Path):
+            con = self._snapshot_cursor(job)
+            try:
+                total = con.execute(
+                    f"SELECT COUNT(*) FROM ({query})", params
+                ).fetchone()[0]
+                reader = con.execute(query, params).fetch_record_batch(
+                    EXPORT_BATCH_SIZE
+                )
+                written = 0
+                with ipc.new_file(str(path), reader.schema) as writer:
+                    for batch in reader:
+                        if job is not None:
+                            job.check_cancelled()
+                        writer.write_batch(batch)
+                        written += batch.num_rows
+                        if job is not None and total:
+                            job.report(written / total)
+            finally:
+                con.close()
+
+        return self._write_file(key, filename, write, job)
+
+    def export_query(
+        self,
+        key: str,
+        query: str,
+        params: list,
+        filename: str,
+        export_format: str,
+        sheet_name: str = "Sheet1",
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """
+        Export a query result in one of EXPORT_FORMATS.
+        Column aliases of the query become the file's column names.
+        """
+        if export_format == "csv":
+            return self._copy_to_file(
+                query, params, key, filename, "FORMAT CSV, HEADER, DELIMITER ','", job
+            )
+        if export_format == "parquet":
+            return self._copy_to_file(
+                query, params, key, filename, "FORMAT PARQUET, COMPRESSION ZSTD", job
+            )
+        if export_format == "arrow":
+            return self._query_to_arrow(query, params, key, filename, job)
+        if export_format == "xlsx":
+            return self._query_to_xlsx(query, params, key, filename, sheet_name, job)
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    def export_orders(
+        self,
+        key: str,
+        export_format: str,
+        filters: OrdersFilter,
+        sort_column: Optional[str],
+        ascending: bool,
+        selection: Optional[OrdersSelection] = None,
+        filename: str = None,
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """
+        Export orders matching the filters (or the selection).
+        Peak memory does not depend on the export size.
+        """
+        query, params = orders_export_query(
+            filters,
+            sort_column,
+            ascending,
+            selection,
+            _export_columns(ORDERS_EXPORT_COLUMNS, export_format),
+        )
+        return self.export_query(
+            key,
+            query,
+            params,
+            filename or f"orders_export.{export_format}",
+            export_format,
+            sheet_name="Orders",
+            job=job,
+        )
+
+    def export_order_errors(
+        self,
+        key: str,
+        export_format: str,
+        search: str,
+        sort_column: Optional[str],
+        ascending: bool,
+        selected_ids: Optional[List[int]] = None,
+        filename: str = None,
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """Export order errors matching the search (or the selected ids)."""
+        query, params = order_errors_export_query(
+            search,
+            sort_column,
+            ascending,
+            selected_ids,
+            _export_columns(ORDER_ERRORS_EXPORT_COLUMNS, export_format),
+        )
+        return self.export_query(
+            key,
+            query,
+            params,
+            filename or f"order_errors_export.{export_format}",
+            export_format,
+            sheet_name="Order errors",
+            job=job,
+        )
+
+    def export_product_codes(
+        self,
+        key: str,
+        export_format: str,
+        filename: str = None,
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """Export the non-existing product codes."""
+        query, params = product_codes_export_query(
+            _export_columns(PRODUCT_CODES_EXPORT_COLUMNS, export_format)
+        )
+        return self.export_query(
+            key,
+            query,
+            params,
+            filename or f"product_codes_export.{export_format}",
+            export_format,
+            sheet_name="Product codes",
+            job=job,
+        )
+
+    def export_rows_csv(
+        self,
+        key: str,
+        headers: List[str],
+        rows: Sequence[Sequence[Any]],
+        filename: str,
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """Export rows that are already in memory as CSV."""
+
+        def write(path: Path):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(headers)
+                for index, batch in enumerate(batched(rows), start=1):
+                    if job is not None:
+                        job.check_cancelled()
+                    writer.writerows(batch)
+                    if job is not None:
+                        job.report(min(index * EXPORT_BATCH_SIZE, len(rows)) / len(rows))
+
+        return self._write_file(key, filename, write)
+
+    def export_rows_xlsx(
+        self,
+        key: str,
+        headers: List[str],
+        rows: Sequence[Sequence[Any]],
+        filename: str,
+        sheet_name: str = "Sheet1",
+        job: Optional[ExportJob] = None,
+    ) -> str:
+        """Export rows that are already in memory as XLSX."""
+
+        def batches():
+            for batch in batched(rows):
+                if job is not None:
+                    job.check_cancelled()
+                yield batch
+
+        return self._write_file(
+            key,
+            filename,
+            lambda path: write_xlsx(
+                str(path),
+                headers,
+                batches(),
+                sheet_name=sheet_name,
+                on_batch=(
+                    (lambda written: job.report(written / len(rows)))
+                    if job is not None and rows
+                    else None
+                ),
+            ),
+        )
+
+
+# Global export service instance
+export_service = ExportService()
@@ -0,0 +1,53 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from data_dashboard.models.order import FacetCount, OrdersFilter
+from data_dashboard.services.database_service import db_service
+
+
+def facet_list(counts: Dict[str, int]) -> List[FacetCount]:
+    """
+    Facet values in alphabetical order with their counts; values that would
+    match nothing under the other filters go last.
+    """
+    return [
+        {"value": value, "count": counts[value]}
+        for value in sorted(counts, key=lambda value: (counts[value] == 0, value))
+    ]
+
+
+class FacetCountsCache:
+    """
+    Facet counts shared by every session, keyed by data version and filter
+    state, so switching back and forth between filters does not recount.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[Tuple[str, str], Dict[str, Dict[str, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: str, filters: OrdersFilter) -> Dict[str, Dict[str, int]]:
+        """Counts per facet field and value for ``filters`` at ``version``."""
+        if not version:
+            return db_service.get_orders_facet_counts(filters)
+        key = (version, json.dumps(filters, sort_keys=True, default=str))
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is not None:
+                self._counts.move_to_end(key)
+                return counts
+
+        counts = db_service.get_orders_facet_counts(filters)
+        if counts:
+            with self._lock:
+                self._counts[key] = counts
+                while len(self._counts) > self.max_entries:
+                    self._counts.popitem(last=False)
+        return counts
+
+
+# Global orders facet counts cache
+orders_facets = FacetCountsCache()
@@ -0,0 +1,450 @@
+import bisect
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import reflex as rx
+from reflex.middleware import Middleware
+from reflex.utils import console
+from reflex.utils.exec import is_prod_mode
+from reflex.utils.format import json_dumps
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") in ("1", "true", "True")
+
+# Largest serialized size (bytes) one state var may have in a delta; 0 disables
+# the check. Oversized vars fail the event in dev mode and are logged in prod.
+STATE_VAR_MAX_BYTES = int(os.getenv("STATE_VAR_MAX_BYTES", str(256 * 1024)))
+
+# Seconds between two stack samples while profiling an event.
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.002"))
+
+
+class _Timing:
+    """Call count, latency histogram and payload size of one name."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total_bytes = 0
+        self.max_bytes = 0
+
+    def add(self, seconds: float, size: Optional[int]):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if size is not None:
+            self.total_bytes += size
+            self.max_bytes = max(self.max_bytes, size)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS, self.buckets):
+            seen += hits
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class _Size:
+    """How often one state var was sent, and how large it was."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_bytes = 0
+        self.max_bytes = 0
+
+    def add(self, size: int):
+        self.count += 1
+        self.total_bytes += size
+        self.max_bytes = max(self.max_bytes, size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_bytes": self.total_bytes,
+            "mean_bytes": self.total_bytes / self.count if self.count else 0.0,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class StateSizeError(ValueError):
+    """A state var is too large to be sent to the browser."""
+
+
+class MetricsRegistry:
+    """Per-name timings of event handlers and computed vars, for this process."""
+
+    KINDS = ("event", "computed_var")
+
+    def __init__(self):
+        self._timings: Dict[str, Dict[str, _Timing]] = {kind: {} for kind in self.KINDS}
+        self._sizes: Dict[str, _Size] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, name: str, seconds: float, size: Optional[int] = None):
+        with self._lock:
+            timing = self._timings[kind].get(name)
+            if timing is None:
+                timing = self._timings[kind][name] = _Timing()
+            timing.add(seconds, size)
+
+    def observe_size(self, name: str, size: int):
+        with self._lock:
+            stat = self._sizes.get(name)
+            if stat is None:
+                stat = self._sizes[name] = _Size()
+            stat.add(size)
+
+    def reset(self):
+        with self._lock:
+            self._timings = {kind: {} for kind in self.KINDS}
+            self._sizes = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """All timings and state var sizes as plain dicts, largest first."""
+        with self._lock:
+            snapshot = {
+                kind: {
+                    name: timing.to_dict()
+                    for name, timing in sorted(
+                        timings.items(), key=lambda item: -item[1].total_seconds
+                    )
+                }
+                for kind, timings in self._timings.items()
+            }
+            snapshot["state_var_bytes"] = {
+                name: stat.to_dict()
+                for name, stat in sorted(
+                    self._sizes.items(), key=lambda item: -item[1].total_bytes
+                )
+            }
+            return snapshot
+
+    def prometheus_text(self) -> str:
+        """All timings in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for kind, timings in self._timings.items():
+                metric = f"dashboard_{kind}_seconds"
+                lines.append(f"# HELP {metric} Latency of {kind.replace('_', ' ')}s.")
+                lines.append(f"# TYPE {metric} histogram")
+                for name, timing in timings.items():
+                    label = json.dumps(name)
+                    cumulative = 0
+                    for bound, hits in zip(LATENCY_BUCKETS, timing.buckets):
+                        cumulative += hits
+                        lines.append(f'{metric}_bucket{{name={label},le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{name={label},le="+Inf"}} {timing.count}')
+                    lines.append(f"{metric}_sum{{name={label}}} {timing.total_seconds}")
+                    lines.append(f"{metric}_count{{name={label}}} {timing.count}")
+
+            metric = "dashboard_event_delta_bytes"
+            lines.append(f"# HELP {metric} Serialized size of the state deltas sent per event.")
+            lines.append(f"# TYPE {metric} summary")
+            for name, timing in self._timings["event"].items():
+                label = json.dumps(name)
+                lines.append(f"{metric}_sum{{name={label}}} {timing.total_bytes}")
+                lines.append(f"{metric}_count{{name={label}}} {timing.count}")
+
+            metric = "dashboard_state_var_bytes"
+            lines.append(f"# HELP {metric} Serialized size of each state var sent to the browser.")
+            lines.append(f"# TYPE {metric} summary")
+            for name, stat in self._sizes.items():
+                label = json.dumps(name)
+                lines.append(f"{metric}_sum{{name={label}}} {stat.total_bytes}")
+                lines.append(f"{metric}_count{{name={label}}} {stat.count}")
+            lines.append(f"# HELP {metric}_max Largest serialized size of each state var.")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for name, stat in self._sizes.items():
+                lines.append(f"{metric}_max{{name={json.dumps(name)}}} {stat.max_bytes}")
+        return "\n".join(lines) + "\n"
+
+
+class StackSampler:
+    """
+    Opt-in sampling profiler for one slow event.
+
+    While armed, every event is sampled (one at a time) by periodically
+    walking the event loop thread's stack. The first event slower than the
+    threshold is saved in the folded-stack format read by flamegraph.pl and
+    speedscope, and the sampler disarms itself.
+
+    The loop thread runs every in-flight event, so a sample is only kept
+    while the sampled event is the only one in flight; the others are
+    counted as skipped.
+    """
+
+    def __init__(self, profile_dir: str = None, interval: float = None):
+        self.profile_dir = Path(
+            profile_dir
+            or os.getenv(
+                "PROFILE_DIR",
+                str(Path(tempfile.gettempdir()) / "data_dashboard_profiles"),
+            )
+        )
+        self.interval = interval or PROFILE_SAMPLE_INTERVAL
+        self.threshold_seconds = 0.5
+        self.armed = False
+        self.last_profile: Optional[Path] = None
+        self.last_skipped_samples = 0
+        self._stacks: Counter = Counter()
+        self._skipped = 0
+        self._active = None
+        self._in_flight: Set[Any] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def arm(self, threshold_seconds: float = None):
+        """Capture the next event slower than ``threshold_seconds``."""
+        if threshold_seconds is not None:
+            self.threshold_seconds = threshold_seconds
+        self.armed = True
+
+    def disarm(self):
+        self.armed = False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "armed": self.armed,
+            "threshold_seconds": self.threshold_seconds,
+            "last_profile": str(self.last_profile) if self.last_profile else None,
+            "last_skipped_samples": self.last_skipped_samples,
+        }
+
+    def start(self, key: Any) -> bool:
+        """
+        Note an event starting, and sample the calling thread for it if
+        armed and idle.
+        """
+        with self._lock:
+            self._in_flight.add(key)
+            if not self.armed or self._active is not None:
+                return False
+            self._active = key
+        self._stacks = Counter()
+        self._skipped = 0
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, args=(threading.get_ident(),), daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self, key: Any, name: str, seconds: float):
+        """Note an event ending; if it was sampled, keep it if it was slow enough."""
+        with self._lock:
+            self._in_flight.discard(key)
+        if self._active != key:
+            return
+        self._stop.set()
+        self._thread.join()
+        if self.armed and seconds >= self.threshold_seconds and self._stacks:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            path = self.profile_dir / f"{time.strftime('%Y%m%d-%H%M%S')}_{name}.folded"
+            path.write_text(
+                "".join(f"{stack} {hits}\n" for stack, hits in self._stacks.items()),
+                encoding="utf-8",
+            )
+            self.last_profile = path
+            self.last_skipped_samples = self._skipped
+            self.armed = False
+        with self._lock:
+            self._active = None
+
+    def _sample(self, thread_id: int):
+        while not self._stop.wait(self.interval):
+            if len(self._in_flight) != 1:
+                self._skipped += 1
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+
+
+def _event_key(event) -> Tuple[str, str]:
+    """
+    Identity of an in-flight event: a session runs its events one at a
+    time, so no two in flight share a token and handler.
+    """
+    return (event.token, event.name)
+
+
+def _event_name(event) -> str:
+    return event.name.rsplit(".", 1)[-1]
+
+
+def _is_background(state, event) -> bool:
+    """Whether an event runs a background handler (or names no handler at all)."""
+    path, _, name = event.name.rpartition(".")
+    try:
+        handler = type(state).get_class_substate(path).event_handlers[name]
+    except (KeyError, ValueError):
+        return True
+    return handler.is_background
+
+
+def _var_name(field: str) -> str:
+    """Var name of a delta field (deltas suffix fields with their state)."""
+    return field.split("_rx_state_")[0]
+
+
+class StateSizeMiddleware(Middleware):
+    """
+    Checks the serialized size of each state var an event sends. Vars over
+    ``max_var_bytes`` fail the event in dev mode and are logged in prod.
+    """
+
+    def __init__(self, max_var_bytes: int = None):
+        self.max_var_bytes = STATE_VAR_MAX_BYTES if max_var_bytes is None else max_var_bytes
+
+    async def preprocess(self, app, state, event):
+        return None
+
+    def _observe_size(self, name: str, size: int):
+        """Hook for subclasses that record every var size."""
+
+    def _measure(self, event, delta: Dict[str, Dict[str, Any]]) -> int:
+        total = 0
+        oversized = []
+        for fields in delta.values():
+            for field, value in fields.items():
+                name = _var_name(field)
+                size = len(json_dumps(value))
+                total += size
+                self._observe_size(name, size)
+                if self.max_var_bytes and size > self.max_var_bytes:
+                    oversized.append(f"{name} ({size:,} bytes)")
+        if oversized:
+            message = (
+                f"Event {_event_name(event)} sent state vars over "
+                f"{self.max_var_bytes:,} bytes: {', '.join(oversized)}"
+            )
+            if not is_prod_mode():
+                raise StateSizeError(message)
+            console.warn(message)
+        return total
+
+    async def postprocess(self, app, state, event, update):
+        if self.max_var_bytes:
+            self._measure(event, update.delta)
+        return update
+
+
+class EventMetricsMiddleware(StateSizeMiddleware):
+    """
+    Times every foreground event from preprocess to its final delta and
+    records the serialized size of each state var the event sent, on top
+    of the size check. Background events return before postprocess and
+    are not timed.
+    """
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        sampler: "StackSampler" = None,
+        max_var_bytes: int = None,
+    ):
+        super().__init__(max_var_bytes)
+        self.registry = registry
+        self.sampler = sampler
+        self._pending: Dict[Tuple[str, str], List[float]] = {}
+
+    async def preprocess(self, app, state, event):
+        if _is_background(state, event):
+            return None
+        key = _event_key(event)
+        self._pending[key] = [time.perf_counter(), 0]
+        if self.sampler is not None:
+            self.sampler.start(key)
+        return None
+
+    def _observe_size(self, name: str, size: int):
+        self.registry.observe_size(name, size)
+
+    async def postprocess(self, app, state, event, update):
+        key = _event_key(event)
+        pending = self._pending.get(key)
+        if pending is None:
+            return update
+        try:
+            pending[1] += self._measure(event, update.delta)
+        finally:
+            if update.final:
+                del self._pending[key]
+                seconds = time.perf_counter() - pending[0]
+                name = _event_name(event)
+                self.registry.observe("event", name, seconds, pending[1])
+                if self.sampler is not None:
+                    self.sampler.stop(key, name, seconds)
+        return update
+
+
+def timed_rx_var(fget: Callable = None, **kwargs):
+    """
+    ``rx.var`` that also times the getter into ``metrics`` when metrics are
+    enabled. Use it in place of ``@rx.var``, bare or with rx.var's arguments.
+
+    Reflex reads a var's dependencies from its getter's bytecode and unboxes
+    ``.func`` as it does for functools.partial, so the timing wrapper points
+    it at the original getter.
+    """
+    if fget is None:
+        return functools.partial(timed_rx_var, **kwargs)
+    if not METRICS_ENABLED:
+        return rx.var(fget, **kwargs)
+    metric_name = fget.__qualname__
+
+    @functools.wraps(fget)
+    def timed(state):
+        start = time.perf_counter()
+        try:
+            return fget(state)
+        finally:
+            metrics.observe("computed_var", metric_name, time.perf_counter() - start)
+
+    timed.func = fget
+    return rx.var(timed, **kwargs)
+
+
+# Global metrics registry and profiler instances
+metrics = MetricsRegistry()
+profiler = StackSampler()
@@ -0,0 +1,107 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional, Set
+
+from data_dashboard.services.database_service import data_version, db_service
+from data_dashboard.services.error_codes import error_code_stats
+from data_dashboard.services.facets import orders_facets
+from data_dashboard.services.orders_query import (
+    ERROR_CODES_DEFAULT_WINDOW,
+    empty_orders_filter,
+    error_code_window_start,
+)
+from data_dashboard.services.timeseries_service import timeseries_service
+
+# Seconds between two checks of the change watermarks.
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL_SECONDS", "5"))
+
+ORDERS_WATERMARKS = ("orders_count", "orders_updated_at")
+
+
+class LiveUpdatePoller:
+    """
+    Polls the change watermarks once per process and pushes what changed to
+    every subscribed session.
+
+    The changed aggregates are computed once per change, on the shared
+    services, and each session only re-slices them into its own view, so
+    the database cost does not grow with the number of open dashboards.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or LIVE_POLL_INTERVAL
+        self._subscribers: Set[str] = set()
+        self._watermarks: Optional[Dict[str, Any]] = None
+
+    def subscribe(self, token: str):
+        """Push future updates to the session of a client token."""
+        if token:
+            self._subscribers.add(token)
+
+    def unsubscribe(self, token: str):
+        self._subscribers.discard(token)
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """
+        Compare the watermarks with the previous poll and, if they moved,
+        bring the shared aggregates up to date.
+        Returns the update to push, or None when nothing changed.
+        """
+        current = db_service.get_watermarks()
+        if not current:
+            return None
+        # Keep identifier lookups off the first request after a change.
+        db_service.sync_order_identifiers(current)
+        previous, self._watermarks = self._watermarks, current
+        if previous is None or current == previous:
+            return None
+
+        update: Dict[str, Any] = {
+            "version": timeseries_service.apply_changes(previous, current)
+        }
+        if any(current[name] != previous[name] for name in ORDERS_WATERMARKS):
+            update["orders_status_summary"] = db_service.get_orders_status_summary()
+        # Sessions reloading at the new version open on the unfiltered view
+        # and the default error-code window; count them now rather than on
+        # the first of them.
+        version = data_version(current)
+        orders_facets.get(version, empty_orders_filter())
+        error_code_stats.get(version, error_code_window_start(ERROR_CODES_DEFAULT_WINDOW))
+        return update
+
+    async def push(self, app, state_cls, update: Dict[str, Any]):
+        """Apply an update to every subscribed session that is still connected."""
+        namespace = app.event_namespace
+        connected = namespace.token_to_sid if namespace is not None else {}
+        for token in list(self._subscribers):
+            if token not in connected:
+                self._subscribers.discard(token)
+                continue
+            try:
+                async with app.modify_state(
+                    f"{token}_{state_cls.get_full_name()}"
+                ) as root:
+                    state = await root.get_state(state_cls)
+                    state.apply_live_update(update)
+            except Exception as e:
+                print(f"Error pushing live update: {e}")
+
+    async def run(self, app, state_cls):
+        """Poll until cancelled; meant to run as an app lifespan task."""
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                # Shutdown: end quietly instead of surfacing the cancellation.
+                return
+            try:
+                update = await asyncio.to_thread(self.poll)
+            except Exception as e:
+                print(f"Error polling for live updates: {e}")
+                continue
+            if update and self._subscribers:
+                await self.push(app, state_cls, update)
+
+
+# Global live update poller instance
+live_updates = LiveUpdatePoller()
@@ -0,0 +1,739 @@
+import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from data_dashboard.models.order import OrdersFilter, OrdersSelection
+from data_dashboard.services.search_index import (
+    IDENTIFIER_FIELDS,
+    ORDERS_SEARCH_FIELDS,
+    normalize_identifier,
+    normalize_text,
+    search_text,
+)
+
+# Orders table headers mapped to the record fields they sort on.
+ORDERS_SORT_KEYS: Dict[str, str] = {
+    "Ngày Ct": "order_date",
+    "Mã Ct": "document_type",
+    "Số Ct": "document_number",
+    "Mã bộ phận": "department_code",
+    "Mã đơn hàng": "order_id",
+    "Tên khách hàng": "customer_name",
+    "Số điện thoại": "phone_number",
+    "Tỉnh thành": "province",
+    "Quận huyện": "district",
+    "Phường xã": "ward",
+    "Địa chỉ": "address",
+    "Mã hàng": "product_code",
+    "Tên hàng": "product_name",
+    "Imei": "imei",
+    "Số lượng": "quantity",
+    "Doanh thu": "revenue",
+    "Ghi chú": "error_code",
+}
+
+ORDERS_NUMERIC_FIELDS = ("revenue", "quantity")
+
+# Columns the orders table loads for every line: what it shows and what its
+# search and filters read. The others are fetched per line for the detail panel.
+ORDERS_LIST_COLUMNS = (
+    "order_date",
+    "document_number",
+    "order_id",
+    "customer_name",
+    "phone_number",
+    "product_code",
+    "product_name",
+    "imei",
+    "revenue",
+    "error_code",
+    "source_type",
+)
+
+# Labels of every orders column, in the order the detail panel lists them.
+ORDER_DETAIL_LABELS: Dict[str, str] = {
+    "order_id": "Mã đơn hàng",
+    "order_date": "Ngày Ct",
+    "document_type": "Mã Ct",
+    "document_number": "Số Ct",
+    "department_code": "Mã bộ phận",
+    "customer_name": "Tên khách hàng",
+    "phone_number": "Số điện thoại",
+    "province": "Tỉnh thành",
+    "district": "Quận huyện",
+    "ward": "Phường xã",
+    "address": "Địa chỉ",
+    "product_code": "Mã hàng",
+    "product_name": "Tên hàng",
+    "imei": "Imei",
+    "quantity": "Số lượng",
+    "revenue": "Doanh thu",
+    "source_type": "Nguồn",
+    "status": "Trạng thái",
+    "error_code": "Ghi chú",
+    "created_at": "Ngày tạo",
+    "updated_at": "Ngày cập nhật",
+}
+
+# Fields the orders filter dropdowns count rows for, mapped to their filter key.
+ORDERS_FACET_FIELDS: Dict[str, str] = {
+    "source_type": "types",
+    "product_name": "products",
+}
+
+# Columns written by orders exports, mapped to their Vietnamese headers.
+ORDERS_EXPORT_COLUMNS: Dict[str, str] = {
+    "order_date": "Ngày Ct",
+    "document_type": "Mã Ct",
+    "document_number": "Số Ct",
+    "department_code": "Mã bộ phận",
+    "order_id": "Mã đơn hàng",
+    "customer_name": "Tên khách hàng",
+    "phone_number": "Số điện thoại",
+    "district": "Quận huyện",
+    "ward": "Phường xã",
+    "address": "Địa chỉ",
+    "product_code": "Mã hàng",
+    "product_name": "Tên hàng",
+    "imei": "Imei",
+    "quantity": "Số lượng",
+    "revenue": "Doanh thu",
+    "error_code": "Ghi chú",
+}
+
+# Columns written by order-error exports, mapped to their Vietnamese headers.
+ORDER_ERRORS_EXPORT_COLUMNS: Dict[str, str] = {
+    "order_id": "Mã đơn hàng",
+    "error_code": "Thông báo lỗi",
+}
+
+# Order-error table headers mapped to the record fields they sort on.
+ORDER_ERRORS_SORT_KEYS: Dict[str, str] = {
+    "Mã đơn hàng": "order_id",
+    "Thông báo lỗi": "error_code",
+}
+
+# Headers of the order-grouped tables mapped to the per-order aggregate
+# they sort on.
+ORDER_GROUPS_SORT_KEYS: Dict[str, str] = {
+    "Mã đơn hàng": "order_id",
+    "Ngày Ct": "order_date",
+    "Tên khách hàng": "customer_name",
+    "Số dòng": "line_count",
+    "Số lượng": "total_quantity",
+    "Doanh thu": "total_revenue",
+    "Ghi chú": "error_codes",
+    "Thông báo lỗi": "error_codes",
+}
+
+# Columns of the lines shown under an expanded order.
+ORDER_GROUP_LINE_COLUMNS = (
+    "order_date",
+    "product_code",
+    "product_name",
+    "imei",
+    "quantity",
+    "revenue",
+    "error_code",
+)
+
+# Time windows of the error-code panel: days back from today, mapped to
+# their labels ("" covers all time).
+ERROR_CODE_WINDOWS: Dict[str, str] = {
+    "7": "7 ngày",
+    "30": "30 ngày",
+    "90": "90 ngày",
+    "365": "1 năm",
+    "": "Tất cả",
+}
+ERROR_CODES_DEFAULT_WINDOW = "30"
+ERROR_CODES_TOP_N = 10
+
+# Columns written by product-code exports, mapped to their Vietnamese headers.
+PRODUCT_CODES_EXPORT_COLUMNS: Dict[str, str] = {
+    "product_code": "Mã hàng",
+    "order_id": "Mã đơn hàng",
+    "detected_at": "Ngày phát hiện",
+}
+
+# Row ids handed to the UI: a hash of the order line's natural key, so a
+# line keeps its id across reloads, inserts and updates (DuckDB moves a row
+# to a new rowid when an indexed column such as status changes). Exact
+# duplicate lines are told apart by their position among themselves. The
+# id is cut to 53 bits to survive JavaScript numbers.
+ORDERS_ID_SQL = (
+    "CAST(hash(order_id, product_code, imei, ROW_NUMBER() OVER "
+    "(PARTITION BY order_id, product_code, imei ORDER BY rowid)) "
+    "& 9007199254740991 AS BIGINT)"
+)
+ORDERS_LOAD_ORDER_SQL = "order_date DESC, id"
+# Error rows are order lines too, so they share the ids of the orders table.
+ORDER_ERRORS_ID_SQL = ORDERS_ID_SQL
+ORDER_ERRORS_LOAD_ORDER_SQL = "order_id, id"
+PRODUCT_CODES_ID_SQL = "CAST(hash(product_code) & 9007199254740991 AS BIGINT)"
+
+
+def empty_orders_filter() -> OrdersFilter:
+    """Return a filter snapshot that matches every row."""
+    return {
+        "search_customer": "",
+        "search_mode": "",
+        "types": [],
+        "products": [],
+        "min_revenue": None,
+        "max_revenue": None,
+        "start_date": None,
+        "end_date": None,
+        "error_code": "",
+    }
+
+
+def merge_orders(
+    rows: List[Dict[str, Any]], changes: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Fold changed and new order lines into loaded rows by id, keeping the
+    load order (newest order date first, then id).
+    """
+    changed = {item["id"]: item for item in changes}
+    merged = [changed.pop(item["id"], item) for item in rows]
+    merged.extend(changed.values())
+    merged.sort(key=lambda item: item["id"])
+    merged.sort(key=lambda item: item["order_date"] or "", reverse=True)
+    return merged
+
+
+def order_errors_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The order-errors table rows of loaded order lines, in its load order."""
+    errors = [
+        {"id": item["id"], "order_id": item["order_id"], "error_code": item["error_code"]}
+        for item in rows
+        if item["order_id"]
+    ]
+    errors.sort(key=lambda item: (item["order_id"], item["id"]))
+    return errors
+
+
+def order_group_rows(
+    groups: List[Dict[str, Any]], lines: Dict[str, List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    Table rows of a grouped page: each order (kind "order"), followed by
+    its lines (kind "line") when it is expanded.
+    """
+    rows: List[Dict[str, Any]] = []
+    for group in groups:
+        children = lines.get(group["order_id"])
+        rows.append({**group, "kind": "order", "expanded": children is not None})
+        for line in children or []:
+            rows.append({**line, "kind": "line", "order_id": group["order_id"]})
+    return rows
+
+
+def orders_filter_predicate(filters: OrdersFilter) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Build a row predicate for the given filter snapshot.
+    Only the active filters are checked, so every row is visited once.
+    """
+    checks: List[Callable[[Dict[str, Any]], bool]] = []
+
+    search_mode = filters.get("search_mode")
+    if search_mode in IDENTIFIER_FIELDS:
+        identifier = normalize_identifier(search_mode, filters.get("search_customer"))
+        if identifier:
+            checks.append(
+                lambda item: normalize_identifier(search_mode, item[search_mode]) == identifier
+            )
+    else:
+        search = normalize_text(filters.get("search_customer"))
+        if search:
+            checks.append(lambda item: search in search_text(item))
+
+    types = set(filters.get("types") or [])
+    if types:
+        checks.append(lambda item: item["source_type"] in types)
+
+    products = set(filters.get("products") or [])
+    if products:
+        checks.append(lambda item: item["product_name"] in products)
+
+    min_revenue = filters.get("min_revenue")
+    if min_revenue is not None:
+        checks.append(lambda item: float(item["revenue"] or 0) >= min_revenue)
+
+    max_revenue = filters.get("max_revenue")
+    if max_revenue is not None:
+        checks.append(lambda item: float(item["revenue"] or 0) <= max_revenue)
+
+    start_date = filters.get("start_date")
+    if start_date is not None:
+        checks.append(
+            lambda item: bool(item["order_date"]) and item["order_date"] >= start_date
+        )
+
+    end_date = filters.get("end_date")
+    if end_date is not None:
+        checks.append(
+            lambda item: bool(item["order_date"]) and item["order_date"] <= end_date
+        )
+
+    error_code = filters.get("error_code")
+    if error_code:
+        checks.append(lambda item: item["error_code"] == error_code)
+
+    if not checks:
+        return lambda item: True
+    return lambda item: all(check(item) for check in checks)
+
+
+def selection_predicate(selection: OrdersSelection) -> Callable[[Dict[str, Any]], bool]:
+    """Build a row predicate that tells whether a row is part of the selection."""
+    included = set(selection["included"])
+    excluded = set(selection["excluded"])
+
+    if not selection["all_matching"]:
+        return lambda item: item["id"] in included
+
+    matches = orders_filter_predicate(selection["filters"])
+
+    def is_selected(item: Dict[str, Any]) -> bool:
+        if item["id"] in excluded:
+            return False
+        return item["id"] in included or matches(item)
+
+    return is_selected
+
+
+def orders_sort_key(sort_column: Optional[str]) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """Key function for sorting orders records by a table header, if it sorts."""
+    internal_key = ORDERS_SORT_KEYS.get(sort_column) if sort_column else None
+    if not internal_key:
+        return None
+    if internal_key in ORDERS_NUMERIC_FIELDS:
+
+        def key_func(item):
+            return float(item[internal_key] or 0)
+    else:
+
+        def key_func(item):
+            return item[internal_key] or ""
+
+    return key_func
+
+
+def orders_page_order(
+    sort_column: Optional[str], ascending: bool = True
+) -> Tuple[Callable[[Dict[str, Any]], Any], bool]:
+    """
+    Sort value and direction the orders table lists its rows by, ties
+    aside: the sorted column, or the order date (newest first) of the
+    load order.
+    """
+    key_func = orders_sort_key(sort_column)
+    if key_func is None:
+        return (lambda item: item["order_date"] or ""), False
+    return key_func, ascending
+
+
+def sort_orders(
+    data: List[Dict[str, Any]],
+    sort_column: Optional[str],
+    ascending: bool = True,
+) -> List[Dict[str, Any]]:
+    """Sort orders records by a table header, keeping the load order for ties."""
+    key_func = orders_sort_key(sort_column)
+    if key_func is None:
+        return data
+    try:
+        return sorted(data, key=key_func, reverse=not ascending)
+    except (KeyError, ValueError):
+        return data
+
+
+def normalized_sql(column: str) -> str:
+    """SQL twin of normalize_text; strip_accents leaves "đ" alone too."""
+    return f"replace(strip_accents(lower(COALESCE(CAST({column} AS VARCHAR), ''))), 'đ', 'd')"
+
+
+def identifier_sql(field: str) -> str:
+    """SQL twin of normalize_identifier."""
+    sql = f"regexp_replace({normalized_sql(field)}, '[^0-9a-z]', '', 'g')"
+    if field == "phone_number":
+        sql = f"regexp_replace({sql}, '^84([0-9]{{9}})$', '0\\1')"
+    return sql
+
+
+def identifier_key(field: str, identifier: str) -> str:
+    """Key of a normalized identifier in the lookup.order_identifiers table."""
+    return f"{field}:{identifier}"
+
+
+def order_identifiers_query(updated_since: Any = None) -> Tuple[str, List[Any]]:
+    """
+    Select the (identifier, order_id) rows of lookup.order_identifiers:
+    one per distinct normalized identifier of an order, for every order or
+    only for the orders with a line updated after ``updated_since``.
+    """
+    where, params = "", []
+    if updated_since is not None:
+        # The whole order is re-indexed, so its unchanged lines keep their keys.
+        where = "WHERE order_id IN (SELECT order_id FROM orders WHERE updated_at > ?)"
+        params.append(updated_since)
+    values = "\n            UNION ALL\n            ".join(
+        f"SELECT '{field}' as field, {identifier_sql(field)} as value, order_id FROM lines"
+        for field in IDENTIFIER_FIELDS
+    )
+    # Keys are spelled like identifier_key.
+    query = f"""
+        WITH lines AS (SELECT * FROM orders {where})
+        SELECT DISTINCT field || ':' || value as identifier, order_id FROM (
+            {values}
+        )
+        WHERE value <> ''
+    """
+    return query, params
+
+
+def orders_filter_sql(filters: OrdersFilter) -> Tuple[str, List[Any]]:
+    """
+    Translate a filter snapshot into a SQL predicate over the orders table.
+    Mirrors orders_filter_predicate so both engines select the same rows.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+
+    search_mode = filters.get("search_mode")
+    search = normalize_text(filters.get("search_customer"))
+    if search_mode in IDENTIFIER_FIELDS:
+        identifier = normalize_identifier(search_mode, search)
+        if identifier:
+            clauses.append(f"{identifier_sql(search_mode)} = ?")
+            params.append(identifier)
+    elif search:
+        clauses.append(
+            "("
+            + " OR ".join(
+                f"contains({normalized_sql(field)}, ?)" for field in ORDERS_SEARCH_FIELDS
+            )
+            + ")"
+        )
+        params.extend([search] * len(ORDERS_SEARCH_FIELDS))
+
+    types = filters.get("types") or []
+    if types:
+        clauses.append(f"source_type IN ({', '.join('?' for _ in types)})")
+        params.extend(types)
+
+    products = filters.get("products") or []
+    if products:
+        clauses.append(f"product_name IN ({', '.join('?' for _ in products)})")
+        params.extend(products)
+
+    if filters.get("min_revenue") is not None:
+        clauses.append("COALESCE(revenue, 0) >= ?")
+        params.append(filters["min_revenue"])
+
+    if filters.get("max_revenue") is not None:
+        clauses.append("COALESCE(revenue, 0) <= ?")
+        params.append(filters["max_revenue"])
+
+    if filters.get("start_date") is not None:
+        clauses.append("order_date >= CAST(? AS DATE)")
+        params.append(filters["start_date"])
+
+    if filters.get("end_date") is not None:
+        clauses.append("order_date <= CAST(? AS DATE)")
+        params.append(filters["end_date"])
+
+    if filters.get("error_code"):
+        clauses.append("error_code = ?")
+        params.append(filters["error_code"])
+
+    return (" AND ".join(clauses) or "TRUE"), params
+
+
+def selection_sql(selection: OrdersSelection) -> Tuple[str, List[Any]]:
+    """Translate a selection into a SQL predicate; it needs the ``id`` column."""
+    if not selection["all_matching"]:
+        return "list_contains(?::BIGINT[], id)", [selection["included"]]
+
+    where, params = orders_filter_sql(selection["filters"])
+    return (
+        f"(list_contains(?::BIGINT[], id) OR "
+        f"(NOT list_contains(?::BIGINT[], id) AND {where}))",
+        [selection["included"], selection["excluded"], *params],
+    )
+
+
+def orders_order_by_sql(sort_column: Optional[str], ascending: bool = True) -> str:
+    """Translate the table sort into an ORDER BY list matching sort_orders."""
+    internal_key = ORDERS_SORT_KEYS.get(sort_column) if sort_column else None
+    if not internal_key:
+        return ORDERS_LOAD_ORDER_SQL
+    if internal_key in ORDERS_NUMERIC_FIELDS:
+        key_sql = f"COALESCE({internal_key}, 0)"
+    else:
+        key_sql = f"COALESCE(CAST({internal_key} AS VARCHAR), '')"
+    direction = "ASC" if ascending else "DESC"
+    return f"{key_sql} {direction}, {ORDERS_LOAD_ORDER_SQL}"
+
+
+def orders_export_query(
+    filters: OrdersFilter,
+    sort_column: Optional[str],
+    ascending: bool,
+    selection: Optional[OrdersSelection] = None,
+    columns: Optional[Dict[str, str]] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Build the SELECT for an orders export: every row matching ``filters``,
+    narrowed to the selection when given, so selected rows the filters hide
+    stay out as they do in the table.
+    """
+    columns = columns or ORDERS_EXPORT_COLUMNS
+    where, params = orders_filter_sql(filters)
+    if selection is not None:
+        selected, selected_params = selection_sql(selection)
+        where, params = f"{where} AND {selected}", [*params, *selected_params]
+    source = f"SELECT *, {ORDERS_ID_SQL} AS id FROM orders"
+
+    query = f"""
+SELECT
+    {_projection_sql(columns)}
+FROM ({source}) AS o
+WHERE {where}
+ORDER BY {orders_order_by_sql(sort_column, ascending)}
+"""
+    return query, params
+
+
+def field_columns(columns: Dict[str, str]) -> Dict[str, str]:
+    """Keep the record field names as column names, for typed columnar exports."""
+    return {field: field for field in columns}
+
+
+def _projection_sql(columns: Dict[str, str]) -> str:
+    return ",\n    ".join(f'{field} AS "{header}"' for field, header in columns.items())
+
+
+def order_errors_search_sql(search: str) -> Tuple[str, List[Any]]:
+    """SQL predicate for the order-error rows whose order id contains ``search``."""
+    needle = normalize_text(search)
+    if not needle:
+        return "order_id IS NOT NULL", []
+    return f"order_id IS NOT NULL AND contains({normalized_sql('order_id')}, ?)", [needle]
+
+
+def order_groups_query(
+    predicate: Tuple[str, List[Any]],
+    sort_column: Optional[str],
+    ascending: bool,
+    limit: int,
+    offset: int,
+) -> Tuple[str, List[Any]]:
+    """
+    Build the SELECT for one page of orders, aggregated over their lines
+    matching ``predicate``. Every row also carries the number of orders on
+    all pages; a page past the end is a single row of NULLs with that count.
+    """
+    where, params = predicate
+    internal_key = ORDER_GROUPS_SORT_KEYS.get(sort_column) if sort_column else None
+    if internal_key:
+        direction = "ASC" if ascending else "DESC"
+        order_by = f"{internal_key} {direction} NULLS LAST, order_id"
+    else:
+        order_by = "order_date DESC NULLS LAST, order_id"
+
+    query = f"""
+WITH groups AS (
+    SELECT
+        order_id,
+        MAX(order_date) AS order_date,
+        MIN(customer_name) AS customer_name,
+        COUNT(*) AS line_count,
+        COALESCE(SUM(quantity), 0) AS total_quantity,
+        COALESCE(SUM(revenue), 0) AS total_revenue,
+        -- list_distinct over list() is several times cheaper than string_agg(DISTINCT)
+        COALESCE(array_to_string(list_sort(list_distinct(list(NULLIF(error_code, '')))), ', '), '') AS error_codes,
+        COUNT(NULLIF(error_code, '')) AS error_lines
+    FROM orders
+    WHERE {where}
+    GROUP BY order_id
+)
+SELECT
+    g.order_id,
+    CAST(g.order_date AS VARCHAR) AS order_date,
+    g.customer_name,
+    g.line_count,
+    g.total_quantity,
+    g.total_revenue,
+    g.error_codes,
+    g.error_lines,
+    t.total_orders
+FROM (SELECT COUNT(*) AS total_orders FROM groups) AS t
+LEFT JOIN (
+    SELECT * FROM groups ORDER BY {order_by} LIMIT ? OFFSET ?
+) AS g ON TRUE
+ORDER BY {", ".join("g." + term for term in order_by.split(", "))}
+"""
+    return query, [*params, limit, offset]
+
+
+def order_group_lines_query(
+    predicate: Tuple[str, List[Any]], order_id: str
+) -> Tuple[str, List[Any]]:
+    """
+    Build the SELECT for the lines of one order matching ``predicate``,
+    read through the order_id index. Ids are assigned within the order,
+    which gives the same ids as over the whole table.
+    """
+    where, params = predicate
+    columns = ",\n    ".join(
+        f"COALESCE(CAST({column} AS VARCHAR), '') AS {column}"
+        for column in ORDER_GROUP_LINE_COLUMNS
+    )
+    query = f"""
+SELECT
+    id,
+    {columns}
+FROM (
+    SELECT *, {ORDERS_ID_SQL} AS id FROM orders WHERE order_id = ?
+) AS o
+WHERE {where}
+ORDER BY {ORDERS_LOAD_ORDER_SQL}
+"""
+    return query, [order_id, *params]
+
+
+def order_errors_export_query(
+    search: str,
+    sort_column: Optional[str],
+    ascending: bool,
+    selected_ids: Optional[List[int]] = None,
+    columns: Optional[Dict[str, str]] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Build the SELECT for an order-error export.
+    Exports the selected ids when given, otherwise every row matching ``search``.
+    """
+    columns = columns or ORDER_ERRORS_EXPORT_COLUMNS
+    clauses: List[str] = []
+    params: List[Any] = []
+    if selected_ids is not None:
+        clauses.append("list_contains(?::BIGINT[], id)")
+        params.append(selected_ids)
+    elif normalize_text(search):
+        where, search_params = order_errors_search_sql(search)
+        clauses.append(where)
+        params.extend(search_params)
+
+    # Ties keep the load order, like the stable sort of the table.
+    internal_key = ORDER_ERRORS_SORT_KEYS.get(sort_column) if sort_column else None
+    order_by = ORDER_ERRORS_LOAD_ORDER_SQL
+    if internal_key:
+        direction = "ASC" if ascending else "DESC"
+        order_by = f"COALESCE({internal_key}, '') {direction}, {ORDER_ERRORS_LOAD_ORDER_SQL}"
+
+    query = f"""
+SELECT
+    {_projection_sql(columns)}
+FROM (
+    SELECT *, {ORDER_ERRORS_ID_SQL} AS id FROM orders WHERE order_id IS NOT NULL
+) AS e
+WHERE {" AND ".join(clauses) or "TRUE"}
+ORDER BY {order_by}
+"""
+    return query, params
+
+
+def orders_facets_query(filters: OrdersFilter) -> Tuple[str, List[Any]]:
+    """
+    Build one GROUPING SETS query counting the rows per value of every facet
+    field. Each facet is counted under all the other filters but not its
+    own, so a dropdown shows what ticking one more value would add. Every
+    filter is evaluated once per row, and the counts use FILTER clauses
+    rather than WHERE, so every value is listed, with 0 when nothing matches.
+    """
+    base, params = orders_filter_sql(
+        {**filters, **{filter_key: [] for filter_key in ORDERS_FACET_FIELDS.values()}}
+    )
+    checks = [f"{base} AS base_ok"]
+    for field, filter_key in ORDERS_FACET_FIELDS.items():
+        where, where_params = orders_filter_sql(
+            {**empty_orders_filter(), filter_key: filters.get(filter_key) or []}
+        )
+        checks.append(f"{where} AS {field}_ok")
+        params.extend(where_params)
+
+    counts = [
+        "COUNT(*) FILTER (WHERE "
+        + " AND ".join(["base_ok"] + [f"{other}_ok" for other in ORDERS_FACET_FIELDS if other != field])
+        + f") AS {field}_count"
+        for field in ORDERS_FACET_FIELDS
+    ]
+    query = f"""
+SELECT
+    {", ".join(ORDERS_FACET_FIELDS)},
+    {", ".join(f"GROUPING({field}) = 0 AS is_{field}" for field in ORDERS_FACET_FIELDS)},
+    {", ".join(counts)}
+FROM (
+    SELECT {", ".join(ORDERS_FACET_FIELDS)}, {", ".join(checks)} FROM orders
+) AS o
+GROUP BY GROUPING SETS ({", ".join(f"({field})" for field in ORDERS_FACET_FIELDS)})
+"""
+    return query, params
+
+
+def error_code_window_start(
+    window: str, today: Optional[datetime.date] = None
+) -> Optional[str]:
+    """First order date of an error-code window, or None for all time."""
+    if not window.isdigit():
+        return None
+    today = today or datetime.date.today()
+    return (today - datetime.timedelta(days=int(window) - 1)).isoformat()
+
+
+def error_code_stats_query(
+    start_date: Optional[str], limit: int = ERROR_CODES_TOP_N
+) -> Tuple[str, List[Any]]:
+    """
+    Build one GROUPING SETS query over the failed lines since
+    ``start_date``: the ``limit`` most frequent error codes, most frequent
+    first, after a first row of totals over every code (error_code NULL).
+    """
+    where = "NULLIF(error_code, '') IS NOT NULL"
+    params: List[Any] = []
+    if start_date is not None:
+        where += " AND order_date >= CAST(? AS DATE)"
+        params.append(start_date)
+
+    query = f"""
+SELECT
+    error_code,
+    COUNT(*) AS lines,
+    COUNT(DISTINCT order_id) AS orders,
+    COALESCE(SUM(revenue), 0) AS revenue,
+    COALESCE(CAST(MIN(order_date) AS VARCHAR), '') AS first_seen,
+    COALESCE(CAST(MAX(order_date) AS VARCHAR), '') AS last_seen
+FROM orders
+WHERE {where}
+GROUP BY GROUPING SETS ((error_code), ())
+ORDER BY GROUPING(error_code) DESC, lines DESC, error_code
+LIMIT ?
+"""
+    return query, [*params, limit + 1]
+
+
+def product_codes_export_query(
+    columns: Optional[Dict[str, str]] = None,
+) -> Tuple[str, List[Any]]:
+    """Build the SELECT for a product-code export, in table order."""
+    columns = columns or PRODUCT_CODES_EXPORT_COLUMNS
+    query = f"""
+SELECT
+    {_projection_sql(columns)}
+FROM non_existing_codes
+WHERE product_code IS NOT NULL AND product_code != ''
+ORDER BY product_code
+"""
+    return query, []
@@ -0,0 +1,75 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Sort value of a row, in the order a table lists its rows.
+SortValue = Callable[[Dict[str, Any]], Any]
+
+
+def encode_cursor(row: Dict[str, Any], sort_spec: Sequence[Any], sort_value: SortValue) -> str:
+    """
+    Opaque cursor pointing at ``row`` as the first row of a page: the sort
+    it was taken under, the row's sort value and its stable id.
+    """
+    payload = json.dumps(
+        [list(sort_spec), sort_value(row), row["id"]],
+        ensure_ascii=False,
+        default=str,
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Optional[List[Any]]:
+    """[sort spec, sort value, row id] of a cursor, or None if it is not one."""
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if not isinstance(decoded, list) or len(decoded) != 3:
+        return None
+    return decoded
+
+
+def row_positions(rows: Sequence[Dict[str, Any]]) -> Dict[int, int]:
+    """Position of every row in a sorted list, by id."""
+    return {row["id"]: position for position, row in enumerate(rows)}
+
+
+def cursor_position(
+    cursor: str,
+    rows: Sequence[Dict[str, Any]],
+    positions: Dict[int, int],
+    sort_spec: Sequence[Any],
+    sort_value: SortValue,
+    ascending: bool,
+) -> int:
+    """
+    Position in ``rows`` where the page of ``cursor`` starts.
+
+    The page starts at the cursor's row wherever that row is now, so rows
+    inserted or removed elsewhere do not shift it. If the row itself is
+    gone, the page starts at the first row sorting at or after its value.
+    A cursor taken under another sort starts over at the top.
+    """
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded is None or decoded[0] != list(sort_spec):
+        return 0
+    _, value, row_id = decoded
+    position = positions.get(row_id)
+    if position is not None:
+        return position
+
+    low, high = 0, len(rows)
+    while low < high:
+        middle = (low + high) // 2
+        current = sort_value(rows[middle])
+        try:
+            before = current < value if ascending else current > value
+        except TypeError:
+            return 0
+        if before:
+            low = middle + 1
+        else:
+            high = middle
+    return low
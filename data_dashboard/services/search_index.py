@@ -0,0 +1,313 @@
+import bisect
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Fields the orders search box matches against.
+ORDERS_SEARCH_FIELDS = ("customer_name", "phone_number", "order_id")
+
+# Fields the order errors search box matches against.
+ORDER_ERRORS_SEARCH_FIELDS = ("order_id",)
+
+# Fields the product picker matches against.
+PRODUCT_SEARCH_FIELDS = ("product_name", "product_codes")
+
+# Fields looked up by exact value; each one is a search mode of the orders table.
+IDENTIFIER_FIELDS = ("phone_number", "imei", "order_id", "document_number")
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]")
+
+# Separates fields (and rows) in the indexed text, so no trigram spans two.
+_SEPARATOR = "\x00"
+
+
+def normalize_text(value: Any) -> str:
+    """
+    Lower-case ``value`` and strip Vietnamese diacritics, so "Đặng Văn Hùng"
+    and "dang van hung" compare equal. "đ" has no decomposition and is
+    mapped by hand.
+    """
+    if value is None:
+        return ""
+    text = str(value).lower().replace("đ", "d")
+    if text.isascii():
+        return text
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFD", text)
+        if not unicodedata.combining(char)
+    )
+
+
+def search_text(row: Dict[str, Any], fields: Sequence[str] = ORDERS_SEARCH_FIELDS) -> str:
+    """Normalized text of the searchable fields of a row."""
+    return _SEPARATOR.join(normalize_text(row.get(field)) for field in fields)
+
+
+def normalize_identifier(field: str, value: Any) -> str:
+    """
+    Canonical spelling of an identifier: lower case without spaces, dots or
+    dashes, so "DH-0001" finds "dh0001". Phone numbers written with the
+    country code ("+84 912...") are brought back to the local "0912..." form.
+    """
+    text = normalize_text(value)
+    if not (text.isascii() and text.isalnum()):
+        text = _NON_ALPHANUMERIC.sub("", text)
+    if field == "phone_number" and len(text) == 11 and text.startswith("84"):
+        return "0" + text[2:]
+    return text
+
+
+def _trigram_keys(codes: np.ndarray) -> np.ndarray:
+    """Pack each run of three code points into one integer (21 bits each)."""
+    codes = codes.astype(np.uint64)
+    return (codes[:-2] << np.uint64(42)) | (codes[1:-1] << np.uint64(21)) | codes[2:]
+
+
+def _codes(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+class TrigramIndex:
+    """
+    Diacritic-insensitive substring search over some fields of a row list.
+
+    Every row's normalized fields are cut into trigrams and each trigram
+    keeps the sorted positions of the rows containing it. A query intersects
+    the posting lists of its trigrams and checks the few remaining rows for
+    the full substring. Queries shorter than a trigram scan the normalized
+    text instead, which is still cheaper than normalizing rows on the fly.
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], fields: Sequence[str] = ORDERS_SEARCH_FIELDS):
+        self.fields = tuple(fields)
+        self._texts: List[str] = [search_text(row, self.fields) for row in rows]
+
+        if not self._texts:
+            self._keys = np.array([], dtype=np.uint64)
+            self._starts = np.array([0], dtype=np.int64)
+            self._rows = np.array([], dtype=np.int32)
+            return
+
+        codes = _codes(_SEPARATOR.join(self._texts) + _SEPARATOR)
+        lengths = np.fromiter((len(text) + 1 for text in self._texts), dtype=np.int64, count=len(self._texts))
+        owners = np.repeat(np.arange(len(self._texts), dtype=np.int32), lengths)
+
+        keys = _trigram_keys(codes)
+        valid = (codes[:-2] != 0) & (codes[1:-1] != 0) & (codes[2:] != 0)
+        keys, owners = keys[valid], owners[:-2][valid]
+
+        # One (trigram, row) pair per occurrence; sort and drop repeats.
+        order = np.lexsort((owners, keys))
+        keys, owners = keys[order], owners[order]
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = (keys[1:] != keys[:-1]) | (owners[1:] != owners[:-1])
+        keys, owners = keys[distinct], owners[distinct]
+
+        self._keys, first = np.unique(keys, return_index=True)
+        self._starts = np.append(first, len(keys))
+        self._rows = owners
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _postings(self, key: np.uint64) -> np.ndarray:
+        position = int(np.searchsorted(self._keys, key))
+        if position == len(self._keys) or self._keys[position] != key:
+            return self._rows[:0]
+        return self._rows[self._starts[position]:self._starts[position + 1]]
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted positions of the rows whose fields contain ``query``."""
+        needle = normalize_text(query)
+        if not needle:
+            return np.arange(len(self._texts))
+        if len(needle) < 3:
+            return np.array(
+                [position for position, text in enumerate(self._texts) if needle in text],
+                dtype=np.int64,
+            )
+
+        postings = sorted(
+            (self._postings(key) for key in np.unique(_trigram_keys(_codes(needle)))),
+            key=len,
+        )
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return np.array(
+            [position for position in candidates.tolist() if needle in self._texts[position]],
+            dtype=np.int64,
+        )
+
+
+class IdentifierIndex:
+    """
+    Exact-match lookups on identifier fields: one hash map per field from the
+    normalized value to the positions of the rows carrying it.
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], fields: Sequence[str] = IDENTIFIER_FIELDS):
+        self.fields = tuple(fields)
+        self._size = len(rows)
+        # Most identifiers are unique, so each value keeps a single position
+        # and only repeated values (the lines of one order) get a list.
+        self._single: Dict[str, Dict[str, int]] = {}
+        self._repeated: Dict[str, Dict[str, List[int]]] = {}
+        for field in self.fields:
+            keys = [normalize_identifier(field, row.get(field)) for row in rows]
+            repeated: Dict[str, List[int]] = {
+                key: [] for key, count in Counter(keys).items() if count > 1
+            }
+            if repeated:
+                for position, key in enumerate(keys):
+                    if key in repeated:
+                        repeated[key].append(position)
+            self._single[field] = dict(zip(keys, range(len(keys))))
+            self._repeated[field] = repeated
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, field: str, value: str) -> List[int]:
+        """Sorted positions of the rows whose ``field`` equals ``value``."""
+        key = normalize_identifier(field, value)
+        if not key or field not in self._single:
+            return []
+        if key in self._repeated[field]:
+            return self._repeated[field][key]
+        position = self._single[field].get(key)
+        return [] if position is None else [position]
+
+
+class ProductIndex:
+    """
+    The distinct product names of the orders, searchable by name or by any
+    of their product codes. Names starting with the query come first, found
+    by binary search over the sorted normalized names, then the names or
+    codes containing it anywhere, through a trigram index.
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], fields: Sequence[str] = PRODUCT_SEARCH_FIELDS):
+        self._size = len(rows)
+        codes: Dict[str, set] = {}
+        for row in rows:
+            name = row.get("product_name")
+            if name:
+                codes.setdefault(name, set()).add(row.get("product_code") or "")
+        self.names: List[str] = sorted(codes)
+
+        keys = [normalize_text(name) for name in self.names]
+        self._prefix_order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._sorted_keys = [keys[position] for position in self._prefix_order]
+        self._trigrams = TrigramIndex(
+            [
+                {"product_name": name, "product_codes": _SEPARATOR.join(sorted(codes[name]))}
+                for name in self.names
+            ],
+            fields,
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def search(self, query: str) -> List[str]:
+        """Product names matching ``query``, prefix matches first."""
+        needle = normalize_text(query)
+        if not needle:
+            return list(self.names)
+        start = bisect.bisect_left(self._sorted_keys, needle)
+        end = bisect.bisect_left(self._sorted_keys, needle + "\U0010ffff")
+        prefix = sorted(self._prefix_order[start:end])
+        seen = set(prefix)
+        rest = [
+            position
+            for position in self._trigrams.search(needle).tolist()
+            if position not in seen
+        ]
+        return [self.names[position] for position in prefix + rest]
+
+
+class SearchIndexCache:
+    """
+    Indexes shared by every session that loaded the same data version, so
+    each version is indexed once per process. Indexes are built outside the
+    lock; a session asking for a version being built waits for that build.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str] = ORDERS_SEARCH_FIELDS,
+        max_versions: int = 2,
+        index_cls: Callable[..., Any] = TrigramIndex,
+    ):
+        self.fields = tuple(fields)
+        self.max_versions = max_versions
+        self.index_cls = index_cls
+        self._indexes: "OrderedDict[str, Any]" = OrderedDict()
+        # Builds in flight, by version
+        self._building: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: str, rows: Sequence[Dict[str, Any]]) -> Optional[Any]:
+        """
+        Index of ``rows`` loaded at ``version``, built on first use.
+        Returns None without a version, since the rows cannot be shared then.
+        """
+        if not version:
+            return None
+        with self._lock:
+            index = self._indexes.get(version)
+            if index is not None and len(index) == len(rows):
+                self._indexes.move_to_end(version)
+                return index
+            building = self._building.get(version)
+            is_builder = building is None
+            if is_builder:
+                building = self._building[version] = Future()
+
+        if not is_builder:
+            index = building.result()
+            return index if len(index) == len(rows) else self.index_cls(rows, self.fields)
+
+        try:
+            index = self.index_cls(rows, self.fields)
+        except BaseException as e:
+            with self._lock:
+                del self._building[version]
+            building.set_exception(e)
+            raise
+        with self._lock:
+            self._indexes[version] = index
+            self._indexes.move_to_end(version)
+            while len(self._indexes) > self.max_versions:
+                self._indexes.popitem(last=False)
+            del self._building[version]
+        building.set_result(index)
+        return index
+
+    def warm(self, version: str, rows: Sequence[Dict[str, Any]]):
+        """
+        Build the index of ``rows`` at ``version`` on a background thread,
+        so the first search at a new version does not wait for it.
+        """
+        if not version:
+            return
+        with self._lock:
+            if version in self._indexes or version in self._building:
+                return
+        threading.Thread(target=self.get, args=(version, rows), daemon=True).start()
+
+
+# Global search index caches
+orders_search_index = SearchIndexCache()
+order_errors_search_index = SearchIndexCache(ORDER_ERRORS_SEARCH_FIELDS)
+orders_identifier_index = SearchIndexCache(IDENTIFIER_FIELDS, index_cls=IdentifierIndex)
+orders_product_index = SearchIndexCache(PRODUCT_SEARCH_FIELDS, index_cls=ProductIndex)
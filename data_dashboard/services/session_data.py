@@ -0,0 +1,177 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+from reflex.middleware import Middleware
+from reflex.state import _substate_key
+
+# Sessions idle for longer than this lose their loaded tables.
+SESSION_DATA_TTL_SECONDS = float(os.getenv("SESSION_DATA_TTL_SECONDS", "1800"))
+
+# Estimated bytes all sessions' tables may take together; least recently
+# used sessions are evicted first when it is exceeded. 0 disables the cap.
+SESSION_DATA_MAX_BYTES = int(os.getenv("SESSION_DATA_MAX_BYTES", str(1024**3)))
+
+# Seconds between two sweeps for idle sessions.
+SESSION_EVICT_INTERVAL_SECONDS = float(os.getenv("SESSION_EVICT_INTERVAL_SECONDS", "60"))
+
+_SAMPLE_ROWS = 64
+
+
+def estimate_rows_bytes(rows: Sequence[dict]) -> int:
+    """Approximate memory held by a list of flat row dicts, from a sample."""
+    if not rows:
+        return 0
+    step = max(len(rows) // _SAMPLE_ROWS, 1)
+    sample = rows[::step][:_SAMPLE_ROWS]
+    sampled = sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+        for row in sample
+    )
+    return sys.getsizeof(rows) + sampled * len(rows) // len(sample)
+
+
+class SessionDataRegistry:
+    """
+    Tracks which sessions hold loaded tables, how large they are and when
+    each session was last active, in least recently used order.
+    """
+
+    def __init__(self, ttl_seconds: float = None, max_bytes: int = None):
+        self.ttl_seconds = ttl_seconds or SESSION_DATA_TTL_SECONDS
+        self.max_bytes = SESSION_DATA_MAX_BYTES if max_bytes is None else max_bytes
+        self._last_active: "OrderedDict[str, float]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, token: str):
+        """Mark a session as just active."""
+        with self._lock:
+            self._last_active[token] = time.monotonic()
+            self._last_active.move_to_end(token)
+
+    def loaded(self, token: str, size: int):
+        """Record that a session (re)loaded its tables."""
+        if not token:
+            return
+        with self._lock:
+            self._sizes[token] = size
+            self._last_active[token] = time.monotonic()
+            self._last_active.move_to_end(token)
+
+    def evicted(self, token: str):
+        with self._lock:
+            self._sizes.pop(token, None)
+            self._last_active.pop(token, None)
+
+    def idle_tokens(self) -> List[str]:
+        """
+        Sessions holding tables that were not active within the TTL.
+        Idle sessions without tables are forgotten.
+        """
+        cutoff = time.monotonic() - self.ttl_seconds
+        with self._lock:
+            idle = [
+                token
+                for token, last_active in self._last_active.items()
+                if last_active < cutoff
+            ]
+            for token in idle:
+                if token not in self._sizes:
+                    del self._last_active[token]
+            return [token for token in idle if token in self._sizes]
+
+    def over_cap_tokens(self, keep: str = None) -> List[str]:
+        """Least recently used sessions to evict to get back under the cap."""
+        if not self.max_bytes:
+            return []
+        with self._lock:
+            excess = sum(self._sizes.values()) - self.max_bytes
+            victims = []
+            for token in self._last_active:
+                if excess <= 0:
+                    break
+                if token == keep or token not in self._sizes:
+                    continue
+                victims.append(token)
+                excess -= self._sizes[token]
+            return victims
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": len(self._sizes), "bytes": sum(self._sizes.values())}
+
+
+async def evict_sessions(app, state_cls, tokens: List[str]):
+    """
+    Drop the loaded tables of some sessions. The state manager is used
+    directly, so nothing is sent to those browsers; their data is loaded
+    again on their next event.
+    """
+    for token in tokens:
+        try:
+            async with app.state_manager.modify_state(
+                _substate_key(token, state_cls)
+            ) as root:
+                state = await root.get_state(state_cls)
+                state.evict_session_data()
+                # Taking the delta marks the computed vars that read the
+                # evicted tables dirty, dropping their cached values; the
+                # delta itself is not sent anywhere.
+                root.get_delta()
+                root._clean()
+        except Exception as e:
+            print(f"Error evicting session data: {e}")
+        session_data.evicted(token)
+
+
+async def evict_idle_sessions(app, state_cls, interval: float = None):
+    """Sweep for idle sessions until cancelled; meant to run as an app lifespan task."""
+    while True:
+        try:
+            await asyncio.sleep(interval or SESSION_EVICT_INTERVAL_SECONDS)
+        except asyncio.CancelledError:
+            return
+        await evict_sessions(app, state_cls, session_data.idle_tokens())
+
+
+class SessionDataMiddleware(Middleware):
+    """
+    Marks sessions active on every event and reloads tables evicted while
+    the session was idle before its handler runs. Once an event is done,
+    least recently used sessions are evicted if the memory cap is exceeded.
+    """
+
+    def __init__(self, state_cls):
+        self.state_cls = state_cls
+        self._tasks = set()
+
+    async def preprocess(self, app, state, event):
+        session_data.touch(event.token)
+        try:
+            substate = await state.get_state(self.state_cls)
+        except Exception:
+            return None
+        substate.rehydrate_session_data()
+        return None
+
+    async def postprocess(self, app, state, event, update):
+        if update.final:
+            victims = session_data.over_cap_tokens(keep=event.token)
+            if victims:
+                # Evict once this event releases its session's lock, so two
+                # sessions never wait on each other's.
+                task = asyncio.create_task(
+                    evict_sessions(app, self.state_cls, victims)
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        return update
+
+
+# Global session data registry instance
+session_data = SessionDataRegistry()
@@ -0,0 +1,268 @@
+import datetime
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data_dashboard.services.database_service import data_version, db_service
+from data_dashboard.services.downsampling import minmax_indices
+
+GRANULARITIES = ("day", "week", "month")
+
+SERIES_FIELDS = ("completed_tasks", "failed_tasks", "revenue")
+
+# Horizontal pixels per chart point; ranges with more buckets than the chart
+# width allows are downsampled before being sent to the browser.
+CHART_PIXELS_PER_POINT = int(os.getenv("CHART_PIXELS_PER_POINT", "2"))
+CHART_MIN_POINTS = 60
+
+# Series whose spikes must survive downsampling.
+SPIKE_FIELDS = ("failed_tasks",)
+
+# Fields of each bucket query, and the watermark telling when its rows changed.
+TASK_FIELDS = ("completed_tasks", "failed_tasks")
+REVENUE_FIELDS = ("revenue",)
+
+# The calendar always covers at least this many days back from today, so
+# fixed timeframes are drawn in full even before the data reaches back that far.
+MIN_HISTORY_DAYS = 366
+
+
+def chart_point_budget(pixel_width: int) -> int:
+    """Most points worth drawing on a chart ``pixel_width`` pixels wide."""
+    return max(pixel_width // CHART_PIXELS_PER_POINT, CHART_MIN_POINTS)
+
+
+def _week_start(days: np.ndarray) -> np.ndarray:
+    """Monday of the ISO week of each day (1970-01-01 was a Thursday)."""
+    offsets = (days.astype(np.int64) + 3) % 7
+    return days - offsets.astype("timedelta64[D]")
+
+
+def _month_start(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[M]").astype("datetime64[D]")
+
+
+def _roll_up(daily: Dict[str, np.ndarray], starts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Sum contiguous days that share a bucket start."""
+    bucket_starts, first_index = np.unique(starts, return_index=True)
+    buckets = {"bucket_date": bucket_starts}
+    for field in SERIES_FIELDS:
+        buckets[field] = np.add.reduceat(daily[field], first_index)
+    return buckets
+
+
+class TimeSeriesService:
+    """
+    Serves the chart series at day, week and month granularity.
+
+    Daily buckets are loaded once per data version and zero-filled up to
+    today; week and month buckets and running totals are derived from them
+    at the same time. Serving a range is then a binary search plus a slice,
+    and never touches the database: only refresh() does.
+    """
+
+    def __init__(self):
+        self._version: Optional[str] = None
+        self._buckets: Dict[str, Dict[str, np.ndarray]] = {}
+        self._prefix_sums: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _build(self) -> Dict[str, Dict[str, np.ndarray]]:
+        tasks = db_service.get_task_buckets()
+        revenue = db_service.get_revenue_buckets()
+        known = np.concatenate((tasks["bucket_date"], revenue["bucket_date"]))
+        today = np.datetime64(datetime.date.today(), "D")
+        first = today - np.timedelta64(MIN_HISTORY_DAYS - 1, "D")
+        last = today
+        if len(known):
+            first = min(first, known.min())
+            last = max(last, known.max())
+
+        days = np.arange(first, last + np.timedelta64(1, "D"), dtype="datetime64[D]")
+        daily = {"bucket_date": days}
+        for raw, fields in ((tasks, TASK_FIELDS), (revenue, REVENUE_FIELDS)):
+            positions = (raw["bucket_date"] - first).astype(np.int64)
+            for field in fields:
+                values = np.zeros(len(days), dtype=raw[field].dtype)
+                values[positions] = raw[field]
+                daily[field] = values
+        return self._derive(daily)
+
+    @staticmethod
+    def _derive(daily: Dict[str, np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+        days = daily["bucket_date"]
+        return {
+            "day": daily,
+            "week": _roll_up(daily, _week_start(days)),
+            "month": _roll_up(daily, _month_start(days)),
+        }
+
+    def _publish(self, buckets: Dict[str, Dict[str, np.ndarray]], version: str):
+        self._prefix_sums = {
+            field: np.concatenate(([0], np.cumsum(buckets["day"][field])))
+            for field in SERIES_FIELDS
+        }
+        self._buckets = buckets
+        self._version = version
+
+    def refresh(self, force: bool = False) -> str:
+        """
+        Rebuild the buckets if the data version changed since the last build.
+        Returns the data version the buckets now reflect.
+        """
+        version = db_service.get_data_version()
+        with self._lock:
+            if not force and version == self._version and self._buckets:
+                return version
+            self._publish(self._build(), version)
+            return version
+
+    def apply_changes(
+        self, previous: Dict[str, Any], current: Dict[str, Any]
+    ) -> str:
+        """
+        Bring the buckets from the ``previous`` watermarks to ``current`` ones
+        by re-reading only the days whose rows changed in between.
+
+        Falls back to a full rebuild when the buckets were not built at
+        ``previous``, when rows were deleted (which leaves no watermark) or
+        when a changed day lies outside the calendar.
+        Returns the data version the buckets now reflect.
+        """
+        version = data_version(current)
+        with self._lock:
+            if version == self._version and self._buckets:
+                return version
+            if (
+                not self._buckets
+                or self._version != data_version(previous)
+                or (current["orders_count"] or 0) < (previous["orders_count"] or 0)
+                or (current["tasks_count"] or 0) < (previous["tasks_count"] or 0)
+            ):
+                self._publish(self._build(), version)
+                return version
+
+            daily = dict(self._buckets["day"])
+            days = daily["bucket_date"]
+            changes = []
+            if current["tasks_last_updated"] != previous["tasks_last_updated"]:
+                changes.append(
+                    (db_service.get_task_buckets(previous["tasks_last_updated"]), TASK_FIELDS)
+                )
+            if current["orders_updated_at"] != previous["orders_updated_at"]:
+                changes.append(
+                    (db_service.get_revenue_buckets(previous["orders_updated_at"]), REVENUE_FIELDS)
+                )
+
+            for raw, fields in changes:
+                if not len(raw["bucket_date"]):
+                    continue
+                if raw["bucket_date"][0] < days[0] or raw["bucket_date"][-1] > days[-1]:
+                    self._publish(self._build(), version)
+                    return version
+                positions = (raw["bucket_date"] - days[0]).astype(np.int64)
+                for field in fields:
+                    # Copy so series already handed out are not changed underneath.
+                    values = daily[field].copy()
+                    values[positions] = raw[field]
+                    daily[field] = values
+
+            self._publish(self._derive(daily), version)
+            return version
+
+    def get_buckets(self, granularity: str = "day") -> Dict[str, np.ndarray]:
+        """All buckets of one granularity, as of the last refresh."""
+        if not self._buckets:
+            self.refresh()
+        return self._buckets[granularity]
+
+    @staticmethod
+    def _bounds(
+        dates: np.ndarray,
+        start: Optional[datetime.date],
+        end: Optional[datetime.date],
+    ) -> Tuple[int, int]:
+        """Index range of the buckets overlapping [start, end]."""
+        lo = 0
+        if start is not None:
+            # Keep the bucket that contains ``start``.
+            lo = max(int(np.searchsorted(dates, np.datetime64(start, "D"), "right")) - 1, 0)
+        hi = len(dates)
+        if end is not None:
+            hi = int(np.searchsorted(dates, np.datetime64(end, "D"), "right"))
+        return lo, max(hi, lo)
+
+    def get_series(
+        self,
+        granularity: str = "day",
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        max_points: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Chart points for buckets overlapping [start, end] (inclusive).
+        ``None`` bounds mean the start of history and today. With
+        ``max_points``, longer ranges are thinned by min/max bucketing.
+        """
+        buckets = self.get_buckets(granularity)
+        lo, hi = self._bounds(buckets["bucket_date"], start, end)
+        keep = minmax_indices(
+            [buckets[field][lo:hi] for field in SPIKE_FIELDS], max_points or 0
+        ) + lo
+        return self._to_points(buckets, keep, granularity)
+
+    def get_totals(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> Dict[str, float]:
+        """Sum of each series over the days in [start, end], from prefix sums."""
+        days = self.get_buckets("day")["bucket_date"]
+        lo, hi = self._bounds(days, start, end)
+        return {
+            field: (prefix[hi] - prefix[lo]).item()
+            for field, prefix in self._prefix_sums.items()
+        }
+
+    def get_month_totals(self, months_ago: int = 0) -> Dict[str, float]:
+        """Sum of each series over a calendar month (0 = current month)."""
+        buckets = self.get_buckets("month")
+        month = (
+            np.datetime64(datetime.date.today(), "M") - months_ago
+        ).astype("datetime64[D]")
+        index = int(np.searchsorted(buckets["bucket_date"], month))
+        if index == len(buckets["bucket_date"]) or buckets["bucket_date"][index] != month:
+            return {field: 0 for field in SERIES_FIELDS}
+        return {field: buckets[field][index].item() for field in SERIES_FIELDS}
+
+    @staticmethod
+    def _to_points(
+        buckets: Dict[str, np.ndarray], keep: np.ndarray, granularity: str
+    ) -> List[Dict[str, Any]]:
+        dates = buckets["bucket_date"][keep].tolist()
+        if granularity == "month":
+            label_format = "%b %Y"
+        elif dates and (dates[-1] - dates[0]).days > 366:
+            label_format = "%b %d %Y"
+        else:
+            label_format = "%b %d"
+        return [
+            {
+                "date": day.strftime(label_format),
+                "series1": failed,
+                "series2": completed,
+                "revenue": revenue,
+            }
+            for day, failed, completed, revenue in zip(
+                dates,
+                buckets["failed_tasks"][keep].tolist(),
+                buckets["completed_tasks"][keep].tolist(),
+                buckets["revenue"][keep].tolist(),
+            )
+        ]
+
+
+# Global time-series service instance
+timeseries_service = TimeSeriesService()
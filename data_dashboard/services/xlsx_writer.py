@@ -0,0 +1,97 @@
+import datetime
+import math
+from decimal import Decimal
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import xlsxwriter
+
+# Excel's hard limit per worksheet, header row included.
+EXCEL_MAX_ROWS = 1_048_576
+# Excel limits sheet names to 31 characters.
+_SHEET_NAME_LIMIT = 31
+
+
+def _sheet_name(base: str, index: int) -> str:
+    """Name of the ``index``-th sheet of a split export."""
+    if index == 0:
+        return base[:_SHEET_NAME_LIMIT]
+    suffix = f" ({index + 1})"
+    return base[: _SHEET_NAME_LIMIT - len(suffix)] + suffix
+
+
+def write_xlsx(
+    path: str,
+    headers: List[str],
+    batches: Iterable[Sequence[Sequence]],
+    sheet_name: str = "Sheet1",
+    max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Write rows to an XLSX file in constant memory.
+
+    Rows are flushed to disk as they are written, so memory use does not
+    depend on the number of rows. A new worksheet (with the header repeated)
+    is started whenever Excel's row limit is reached. Numbers, dates and
+    booleans are written as typed cells; everything else as text.
+
+    ``on_batch`` is called with the running row count after each batch.
+    Returns the number of data rows written.
+    """
+    workbook = xlsxwriter.Workbook(
+        path, {"constant_memory": True, "strings_to_numbers": False}
+    )
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+    datetime_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+    header_format = workbook.add_format({"bold": True})
+
+    data_rows_per_sheet = max_rows_per_sheet - 1
+    sheet_index = 0
+    worksheet = None
+    row_in_sheet = data_rows_per_sheet
+    written = 0
+
+    def new_sheet():
+        sheet = workbook.add_worksheet(_sheet_name(sheet_name, sheet_index))
+        sheet.write_row(0, 0, headers, header_format)
+        return sheet
+
+    try:
+        for batch in batches:
+            for row in batch:
+                if row_in_sheet >= data_rows_per_sheet:
+                    worksheet = new_sheet()
+                    sheet_index += 1
+                    row_in_sheet = 0
+                row_in_sheet += 1
+                for col, value in enumerate(row):
+                    if value is None:
+                        continue
+                    if isinstance(value, bool):
+                        worksheet.write_boolean(row_in_sheet, col, value)
+                    elif isinstance(value, (int, float, Decimal)):
+                        if isinstance(value, float) and not math.isfinite(value):
+                            continue
+                        worksheet.write_number(row_in_sheet, col, value)
+                    elif isinstance(value, datetime.datetime):
+                        worksheet.write_datetime(
+                            row_in_sheet, col, value.replace(tzinfo=None), datetime_format
+                        )
+                    elif isinstance(value, datetime.date):
+                        worksheet.write_datetime(row_in_sheet, col, value, date_format)
+                    else:
+                        worksheet.write_string(row_in_sheet, col, str(value))
+                written += 1
+            if on_batch is not None:
+                on_batch(written)
+        if worksheet is None:
+            new_sheet()
+    finally:
+        workbook.close()
+    return written
+
+
+def batched(rows: Sequence[Sequence], size: int = 10_000) -> Iterable[Sequence[Sequence]]:
+    """Split rows that are already in memory into batches for write_xlsx."""
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
@@ -1,23 +1,119 @@
+import asyncio
 import datetime
-import io
 from typing import (
+    Dict,
     List,
     Optional,
     Set,
     TypedDict,
 )
 
-import pandas as pd
 import reflex as rx
 from faker import Faker
 
 from data_dashboard.models.entry import DetailEntry
-from data_dashboard.models.order import OrderEntry
-from data_dashboard.services.database_service import db_service
+from data_dashboard.models.order import (
+    ErrorCodeStat,
+    FacetCount,
+    OrderDetailField,
+    OrderEntry,
+    OrdersFilter,
+    OrdersSelection,
+)
+from data_dashboard.services.database_service import data_version, db_service
+from data_dashboard.services.error_codes import error_code_stats
+from data_dashboard.services.export_jobs import artifact_key, export_jobs
+from data_dashboard.services.export_service import export_service
+from data_dashboard.services.facets import facet_list, orders_facets
+from data_dashboard.services.instrumentation import timed_rx_var
+from data_dashboard.services.live_updates import live_updates
+from data_dashboard.services.pagination import (
+    cursor_position,
+    encode_cursor,
+    row_positions,
+)
+from data_dashboard.services.search_index import (
+    normalize_text,
+    order_errors_search_index,
+    orders_identifier_index,
+    orders_product_index,
+    orders_search_index,
+)
+from data_dashboard.services.session_data import estimate_rows_bytes, session_data
+from data_dashboard.services.orders_query import (
+    ERROR_CODE_WINDOWS,
+    ERROR_CODES_DEFAULT_WINDOW,
+    ORDER_DETAIL_LABELS,
+    ORDER_ERRORS_EXPORT_COLUMNS,
+    ORDER_ERRORS_SORT_KEYS,
+    ORDERS_EXPORT_COLUMNS,
+    PRODUCT_CODES_EXPORT_COLUMNS,
+    empty_orders_filter,
+    error_code_window_start,
+    merge_orders,
+    order_errors_rows,
+    order_errors_search_sql,
+    order_group_rows,
+    orders_filter_predicate,
+    orders_filter_sql,
+    orders_page_order,
+    selection_predicate,
+    sort_orders,
+)
+from data_dashboard.services.timeseries_service import (
+    chart_point_budget,
+    timeseries_service,
+)
 from data_dashboard.states.data import raw_data
 
 fake = Faker()
 
+# Chart timeframes mapped to the number of days they show (None = all history).
+CHART_TIMEFRAMES = {
+    "Toàn bộ": None,
+    "1 năm gần nhất": 365,
+    "3 tháng gần nhất": 90,
+    "30 ngày gần nhất": 30,
+    "7 ngày gần nhất": 7,
+}
+# Chart bucket sizes mapped to their button labels.
+CHART_GRANULARITIES = {
+    "day": "Ngày",
+    "week": "Tuần",
+    "month": "Tháng",
+}
+
+# Orders search modes mapped to their labels: "" searches by substring, the
+# others look up one identifier field by exact value.
+ORDERS_SEARCH_MODES = {
+    "": "All",
+    "phone_number": "Phone",
+    "imei": "IMEI",
+    "order_id": "Order ID",
+    "document_number": "Số Ct",
+}
+
+# Products the product filter lists at first, and adds per "load more".
+PRODUCT_PICKER_PAGE_SIZE = 50
+
+# Rows the orders scroll grid is sent at once, and how far that window
+# reaches past each edge of the viewport.
+ORDERS_WINDOW_SIZE = 60
+ORDERS_WINDOW_READ_AHEAD = 20
+# Fixed height of an orders grid row in pixels, so row positions follow
+# from the scroll offset.
+ORDERS_ROW_HEIGHT = 37
+
+# Export headers for the details table, keyed by row field.
+DETAILS_EXPORT_COLUMNS = {
+    "owner": "Owner",
+    "status": "Status",
+    "region": "Region",
+    "stability": "Stability",
+    "costs": "Costs",
+    "last_edited": "Last edited",
+}
+
 
 class Metric(TypedDict):
     title: str
@@ -32,6 +128,7 @@ class VisitorDataPoint(TypedDict):
     date: str
     series1: int
     series2: int
+    revenue: float
 
 
 class DashboardState(rx.State):
@@ -40,36 +137,38 @@ class DashboardState(rx.State):
     selected_section: str = "overview"
 
     key_metrics: List[Metric] = []
-    visitor_data: List[VisitorDataPoint] = []
     displayed_visitor_data: List[VisitorDataPoint] = []
     selected_visitor_timeframe: str = "3 tháng gần nhất"
+    chart_granularity: str = "day"
+    # Totals behind the key metrics, read from the shared daily buckets:
+    # all time, the chart's timeframe, and the current and previous month
+    _chart_totals: Dict[str, dict] = {}
+    # Width of the chart in the browser, measured on mount.
+    chart_pixel_width: int = 1200
 
     _data: List[DetailEntry] = raw_data
     _orders_data: List[OrderEntry] = []
     _orders_error_data: List[dict] = []
     _product_codes_data: List[dict] = []
+    _session_data_evicted: bool = False
+    # Data version the tables were loaded at ("" if it moved during the load).
+    _orders_data_version: str = ""
+    # Watermarks behind that version, to merge later changes from.
+    _orders_watermarks: dict = {}
     orders_status_summary: dict = {}
+    # Days back the error-code panel counts, a key of ERROR_CODE_WINDOWS
+    error_codes_window: str = ERROR_CODES_DEFAULT_WINDOW
+    # Stats of that window at the loaded version
+    _error_code_stats: dict = {}
 
     # Column names for orders table (Vietnamese headers)
     orders_column_names: List[str] = [
         "Ngày Ct",
-        "Mã Ct",
-        "Số Ct",
-        "Mã bộ phận",
         "Mã đơn hàng",
         "Tên khách hàng",
-        "Số điện thoại",
-        "Tỉnh thành",
-        "Quận huyện",
-        "Phường xã",
-        "Địa chỉ",
         "Mã hàng",
-        "Tên hàng",
-        "Imei",
-        "Số lượng",
         "Doanh thu",
         "Ghi chú",
-        "Nguồn",
         "Edit",
     ]
 
@@ -81,14 +180,24 @@ class DashboardState(rx.State):
     ]
     # Orders table state (for first table)
     orders_search_customer: str = ""
+    orders_search_mode: str = ""
     orders_selected_types: Set[str] = set()
     orders_selected_products: Set[str] = set()
     orders_min_revenue: Optional[float] = None
     orders_max_revenue: Optional[float] = None
     orders_start_date: Optional[str] = None
     orders_end_date: Optional[str] = None
+    # Set by drilling into the error-code panel ("" = any line)
+    orders_error_code: str = ""
     orders_temp_selected_types: Set[str] = set()
     orders_temp_selected_products: Set[str] = set()
+    # Rows per type and per product under the applied filters, at the loaded version
+    _orders_facet_counts: Dict[str, Dict[str, int]] = {}
+    # Product filter search; only a window of the matches is sent.
+    orders_product_query: str = ""
+    orders_product_limit: int = PRODUCT_PICKER_PAGE_SIZE
+    # Product names matching it, best first, while the picker is open
+    _orders_product_search: List[str] = []
     orders_temp_min_revenue_str: str = ""
     orders_temp_max_revenue_str: str = ""
     orders_temp_start_date: str = ""
@@ -99,10 +208,41 @@ class DashboardState(rx.State):
     show_orders_date_filter: bool = False
     orders_sort_column: Optional[str] = None
     orders_sort_ascending: bool = True
+    # Orders selection: explicit ids, or "all rows matching a filter" minus exclusions
     orders_selected_rows: Set[int] = set()
-    orders_current_page: int = 1
+    orders_excluded_rows: Set[int] = set()
+    orders_select_all_matching: bool = False
+    orders_selection_filters: OrdersFilter = empty_orders_filter()
+    # Opaque keyset cursor of the page's first row ("" = first page)
+    orders_page_cursor: str = ""
     orders_rows_per_page: int = 20
+    # The current page and the pages around it, by cursor, taken from the
+    # sorted rows once a page is served: {"view": ..., "pages": {...}}
+    _orders_page_cache: dict = {}
+    # Scroll grid instead of pages: only the window of rows around the
+    # client's viewport is held in the delta
+    orders_scroll_mode: bool = False
+    orders_window_start: int = 0
+    orders_window_size: int = ORDERS_WINDOW_SIZE
+    _orders_viewport_first: int = 0
     show_orders_export_dropdown: bool = False
+    # Order line shown in the detail panel, fetched with all its columns
+    show_orders_detail: bool = False
+    orders_detail: List[OrderDetailField] = []
+    # Orders grouped by order id, aggregated and paged in DuckDB
+    orders_group_by_order: bool = False
+    orders_group_offset: int = 0
+    orders_expanded_orders: Set[str] = set()
+    # The page shown and the lines of its expanded orders, fetched by the
+    # handlers changing them
+    _orders_group_page: dict = {"groups": [], "total": 0, "offset": 0}
+    _orders_group_lines: Dict[str, list] = {}
+
+    # Export running on the worker pool (one per session, newest wins)
+    export_job_id: str = ""
+    export_job_filename: str = ""
+    export_job_status: str = ""
+    export_job_progress: int = 0
 
     # Original data state (for secondary table)
     search_owner: str = ""
@@ -145,160 +285,202 @@ class DashboardState(rx.State):
     secondary_sort_column: Optional[str] = None
     secondary_sort_ascending: bool = True
     secondary_selected_rows: Set[int] = set()
-    secondary_current_page: int = 1
+    secondary_page_cursor: str = ""
     secondary_rows_per_page: int = 20
+    secondary_group_by_order: bool = False
+    secondary_group_offset: int = 0
+    secondary_expanded_orders: Set[str] = set()
+    _secondary_group_page: dict = {"groups": [], "total": 0, "offset": 0}
+    _secondary_group_lines: Dict[str, list] = {}
     show_secondary_export_dropdown: bool = False
 
     # Product codes table state variables
     product_codes_current_page: int = 1
     product_codes_rows_per_page: int = 15
+    show_product_codes_export_dropdown: bool = False
 
-    @rx.var
+    @timed_rx_var
     def has_status_filter(self) -> bool:
         """Check if status filter is active."""
         return len(self.selected_statuses) > 0
 
-    @rx.var
+    @timed_rx_var
     def has_region_filter(self) -> bool:
         """Check if region filter is active."""
         return len(self.selected_regions) > 0
 
-    @rx.var
+    @timed_rx_var
     def has_costs_filter(self) -> bool:
         """Check if costs filter is active."""
         return self.min_cost is not None or self.max_cost is not None
 
-    @rx.var
+    @timed_rx_var
     def unique_statuses(self) -> List[str]:
         """Get unique statuses from the data."""
         return sorted({item["status"] for item in self._data})
 
-    @rx.var
+    @timed_rx_var
     def unique_regions(self) -> List[str]:
         """Get unique regions from the data."""
         return sorted({item["region"] for item in self._data})
 
     # Orders table computed properties
-    @rx.var
-    def unique_types(self) -> List[str]:
-        """Get unique source types from orders data."""
-        return sorted(
-            {item["source_type"] for item in self._orders_data if item["source_type"]}
+    def _load_orders_facet_counts(self):
+        """Count the rows per type and per product under the applied filters."""
+        self._orders_facet_counts = (
+            orders_facets.get(self._orders_data_version, self._orders_filter_snapshot())
+            if self._orders_data
+            else {}
         )
 
-    @rx.var
-    def unique_products(self) -> List[str]:
-        """Get unique product names from orders data."""
-        return sorted(
-            {
-                item["product_name"]
-                for item in self._orders_data
-                if item["product_name"]
-            }
+    def _load_error_code_stats(self):
+        """Count the most frequent error codes of the panel's window, at the loaded version."""
+        self._error_code_stats = (
+            error_code_stats.get(
+                self._orders_data_version, error_code_window_start(self.error_codes_window)
+            )
+            if self._orders_data
+            else {}
         )
 
-    @rx.var
-    def orders_filtered_data(self) -> List[OrderEntry]:
-        """Filter the orders data based on current filter selections."""
-        data = self._orders_data
-        if self.orders_search_customer:
-            data = [
-                item
-                for item in data
-                if self.orders_search_customer.lower()
-                in item["customer_name"].lower()
-            ]
-        if self.orders_selected_types:
-            data = [
-                item
-                for item in data
-                if item["source_type"] in self.orders_selected_types
-            ]
-        if self.orders_selected_products:
-            data = [
-                item
-                for item in data
-                if item["product_name"] in self.orders_selected_products
-            ]
-        if self.orders_min_revenue is not None:
-            data = [
-                item
-                for item in data
-                if float(item["revenue"] or 0) >= self.orders_min_revenue
-            ]
-        if self.orders_max_revenue is not None:
-            data = [
-                item
-                for item in data
-                if float(item["revenue"] or 0) <= self.orders_max_revenue
-            ]
-        if self.orders_start_date is not None:
-            data = [
-                item
-                for item in data
-                if item["order_date"] and item["order_date"] >= self.orders_start_date
-            ]
-        if self.orders_end_date is not None:
-            data = [
-                item
-                for item in data
-                if item["order_date"] and item["order_date"] <= self.orders_end_date
-            ]
-        return data
+    @timed_rx_var
+    def error_code_stats(self) -> List[ErrorCodeStat]:
+        return self._error_code_stats.get("codes", [])
+
+    @timed_rx_var
+    def error_code_totals(self) -> ErrorCodeStat:
+        """Failed lines, orders and revenue over every error code of the window."""
+        return self._error_code_stats.get("total") or {
+            "error_code": "",
+            "lines": 0,
+            "orders": 0,
+            "revenue": 0.0,
+            "first_seen": "",
+            "last_seen": "",
+            "percent": 0.0,
+        }
 
-    @rx.var
-    def orders_filtered_and_sorted_data(self) -> List[OrderEntry]:
-        """Sort the orders filtered data."""
-        data_to_sort = self.orders_filtered_data
-        if self.orders_sort_column:
-            try:
-                sort_key_map = {
-                    "Ngày Ct": "order_date",
-                    "Mã Ct": "document_type",
-                    "Số Ct": "document_number",
-                    "Mã bộ phận": "department_code",
-                    "Mã đơn hàng": "order_id",
-                    "Tên khách hàng": "customer_name",
-                    "Số điện thoại": "phone_number",
-                    "Tỉnh thành": "province",
-                    "Quận huyện": "district",
-                    "Phường xã": "ward",
-                    "Địa chỉ": "address",
-                    "Mã hàng": "product_code",
-                    "Tên hàng": "product_name",
-                    "Imei": "imei",
-                    "Số lượng": "quantity",
-                    "Doanh thu": "revenue",
-                    "Ghi chú": "error_code",
-                }
-                internal_key = sort_key_map.get(self.orders_sort_column)
-                if internal_key:
-                    if internal_key in ["revenue", "quantity"]:
+    @timed_rx_var
+    def orders_type_facets(self) -> List[FacetCount]:
+        """Source types with their counts, for the type filter."""
+        return facet_list(self._orders_facet_counts.get("source_type", {}))
+
+    def _load_orders_product_search(self):
+        """
+        Match the picker search against the shared product index while the
+        picker is open; a closed picker holds no matches.
+        """
+        if not (self.show_orders_product_filter and self._orders_data):
+            self._orders_product_search = []
+            return
+        index = orders_product_index.get(self._orders_data_version, self._orders_data)
+        if index is not None:
+            self._orders_product_search = index.search(self.orders_product_query)
+        else:
+            needle = normalize_text(self.orders_product_query)
+            self._orders_product_search = sorted(
+                name
+                for name in self._orders_facet_counts.get("product_name", {})
+                if needle in normalize_text(name)
+            )
 
-                        def key_func(item):
-                            return float(item[internal_key] or 0)
-                    else:
+    @timed_rx_var
+    def _orders_product_matches(self) -> List[str]:
+        """
+        Product names matching the picker search, best matches first and
+        products without rows under the other filters last.
+        """
+        counts = self._orders_facet_counts.get("product_name", {})
+        return sorted(
+            self._orders_product_search, key=lambda name: counts.get(name, 0) == 0
+        )
 
-                        def key_func(item):
-                            return item[internal_key] or ""
+    @timed_rx_var
+    def orders_product_facets(self) -> List[FacetCount]:
+        """
+        Ticked products, then the first matches of the picker search, with
+        their counts. The full product list stays on the server.
+        """
+        counts = self._orders_facet_counts.get("product_name", {})
+        selected = sorted(self.orders_temp_selected_products)
+        window = [
+            name
+            for name in self._orders_product_matches
+            if name not in self.orders_temp_selected_products
+        ][: self.orders_product_limit]
+        return [{"value": name, "count": counts.get(name, 0)} for name in selected + window]
+
+    @timed_rx_var
+    def orders_product_has_more(self) -> bool:
+        """Whether the picker search matches more products than are shown."""
+        unselected = sum(
+            1
+            for name in self._orders_product_matches
+            if name not in self.orders_temp_selected_products
+        )
+        return unselected > self.orders_product_limit
+
+    def _orders_filter_snapshot(self) -> OrdersFilter:
+        """Capture the currently applied orders filters."""
+        return {
+            "search_customer": self.orders_search_customer,
+            "search_mode": self.orders_search_mode,
+            "types": sorted(self.orders_selected_types),
+            "products": sorted(self.orders_selected_products),
+            "min_revenue": self.orders_min_revenue,
+            "max_revenue": self.orders_max_revenue,
+            "start_date": self.orders_start_date,
+            "end_date": self.orders_end_date,
+            "error_code": self.orders_error_code,
+        }
 
-                    data_to_sort = sorted(
-                        data_to_sort,
-                        key=key_func,
-                        reverse=not self.orders_sort_ascending,
-                    )
-                else:
-                    pass
-            except (KeyError, ValueError):
-                pass
-        return data_to_sort
+    def _orders_selection(self) -> OrdersSelection:
+        """Capture the current orders selection."""
+        return {
+            "all_matching": self.orders_select_all_matching,
+            "filters": self.orders_selection_filters,
+            "included": sorted(self.orders_selected_rows),
+            "excluded": sorted(self.orders_excluded_rows),
+        }
 
-    @rx.var
+    @timed_rx_var
+    def _orders_filtered_data(self) -> List[OrderEntry]:
+        """Filter the orders data based on current filter selections."""
+        filters = self._orders_filter_snapshot()
+        search, mode = filters["search_customer"], filters["search_mode"]
+        if not search:
+            positions = None
+        elif mode:
+            index = orders_identifier_index.get(self._orders_data_version, self._orders_data)
+            positions = index.lookup(mode, search) if index is not None else None
+        else:
+            index = orders_search_index.get(self._orders_data_version, self._orders_data)
+            positions = index.search(search).tolist() if index is not None else None
+        if positions is None:
+            matches = orders_filter_predicate(filters)
+            return [item for item in self._orders_data if matches(item)]
+
+        # The search narrows the rows through the shared index; the other
+        # filters only check what it found.
+        matches = orders_filter_predicate({**filters, "search_customer": ""})
+        rows = self._orders_data
+        return [rows[position] for position in positions if matches(rows[position])]
+
+    @timed_rx_var
+    def _orders_filtered_and_sorted_data(self) -> List[OrderEntry]:
+        """Sort the orders filtered data."""
+        return sort_orders(
+            self._orders_filtered_data,
+            self.orders_sort_column,
+            self.orders_sort_ascending,
+        )
+
+    @timed_rx_var
     def orders_total_rows(self) -> int:
         """Total number of rows after filtering for orders table."""
-        return len(self.orders_filtered_and_sorted_data)
+        return len(self._orders_filtered_and_sorted_data)
 
-    @rx.var
+    @timed_rx_var
     def orders_total_pages(self) -> int:
         """Total number of pages for orders table."""
         if self.orders_rows_per_page <= 0:
@@ -310,111 +492,296 @@ class DashboardState(rx.State):
             else 1
         )
 
-    @rx.var
+    @timed_rx_var
+    def _orders_row_positions(self) -> Dict[int, int]:
+        """Position of each filtered and sorted row, by id."""
+        return row_positions(self._orders_filtered_and_sorted_data)
+
+    def _orders_sort_spec(self) -> list:
+        return [self.orders_sort_column, self.orders_sort_ascending]
+
+    def _orders_page_view(self) -> list:
+        """What the cached pages depend on besides the loaded rows."""
+        return [
+            self._orders_filter_snapshot(),
+            self._orders_sort_spec(),
+            self.orders_rows_per_page,
+        ]
+
+    def _orders_cached_page(self) -> Optional[dict]:
+        """The current page from the page cache, if it was taken for the current view."""
+        cache = self._orders_page_cache
+        if self.orders_scroll_mode or cache.get("view") != self._orders_page_view():
+            return None
+        return cache["pages"].get(self.orders_page_cursor)
+
+    def _orders_pages_around(self, rows: list, start: int) -> dict:
+        """Page cache of the page at ``start`` of the sorted ``rows`` and the pages next to it."""
+        size = self.orders_rows_per_page
+        pages = {}
+        for page_start in (max(start - size, 0), start, start + size):
+            if page_start and page_start >= len(rows):
+                continue
+            pages[self._orders_cursor_at(page_start, rows)] = {
+                "start": page_start,
+                "rows": rows[page_start : page_start + size],
+                "previous": (
+                    self._orders_cursor_at(page_start - size, rows) if page_start > 0 else None
+                ),
+                "next": (
+                    self._orders_cursor_at(page_start + size, rows)
+                    if page_start + size < len(rows)
+                    else None
+                ),
+            }
+        return {"view": self._orders_page_view(), "pages": pages}
+
+    def _orders_page_size(self) -> int:
+        if self.orders_scroll_mode:
+            return self.orders_window_size
+        return self.orders_rows_per_page
+
+    @timed_rx_var
+    def _orders_page_start(self) -> int:
+        """Where the current page (or scroll window) starts in the sorted rows."""
+        if self.orders_scroll_mode:
+            return max(
+                min(self.orders_window_start, self.orders_total_rows - self.orders_window_size),
+                0,
+            )
+        page = self._orders_cached_page()
+        if page is not None:
+            return page["start"]
+        sort_value, ascending = orders_page_order(
+            self.orders_sort_column, self.orders_sort_ascending
+        )
+        return cursor_position(
+            self.orders_page_cursor,
+            self._orders_filtered_and_sorted_data,
+            self._orders_row_positions,
+            self._orders_sort_spec(),
+            sort_value,
+            ascending,
+        )
+
+    def _orders_cursor_at(self, position: int, rows: Optional[list] = None) -> str:
+        """Cursor of the page starting at ``position`` of the sorted rows."""
+        if rows is None:
+            rows = self._orders_filtered_and_sorted_data
+        if position <= 0 or not rows:
+            return ""
+        sort_value, _ = orders_page_order(
+            self.orders_sort_column, self.orders_sort_ascending
+        )
+        return encode_cursor(
+            rows[min(position, len(rows) - 1)], self._orders_sort_spec(), sort_value
+        )
+
+    @timed_rx_var
     def orders_paginated_data(self) -> List[OrderEntry]:
         """Get the data for the current page of orders table."""
-        start_index = (self.orders_current_page - 1) * self.orders_rows_per_page
-        end_index = start_index + self.orders_rows_per_page
-        return self.orders_filtered_and_sorted_data[start_index:end_index]
+        page = self._orders_cached_page()
+        if page is not None:
+            return page["rows"]
+        start_index = self._orders_page_start
+        end_index = start_index + self._orders_page_size()
+        return self._orders_filtered_and_sorted_data[start_index:end_index]
+
+    @timed_rx_var
+    def orders_has_previous_page(self) -> bool:
+        return self._orders_page_start > 0
+
+    @timed_rx_var
+    def orders_has_next_page(self) -> bool:
+        return self._orders_page_start + self._orders_page_size() < self.orders_total_rows
+
+    @timed_rx_var
+    def orders_window_rows_before(self) -> int:
+        """Rows of the scroll grid above the served window."""
+        return self._orders_page_start if self.orders_scroll_mode else 0
+
+    @timed_rx_var
+    def orders_window_rows_after(self) -> int:
+        """Rows of the scroll grid below the served window."""
+        if not self.orders_scroll_mode:
+            return 0
+        return max(
+            self.orders_total_rows - self._orders_page_start - self.orders_window_size,
+            0,
+        )
 
-    @rx.var
+    @timed_rx_var
     def orders_current_rows_display(self) -> str:
         """Display string for current rows in orders table."""
         if self.orders_total_rows == 0:
             return "0"
-        start = (self.orders_current_page - 1) * self.orders_rows_per_page + 1
+        start = self._orders_page_start + 1
         end = min(
-            self.orders_current_page * self.orders_rows_per_page,
+            self._orders_page_start + self._orders_page_size(),
             self.orders_total_rows,
         )
         return f"{start}-{end}"
 
-    @rx.var
-    def orders_page_item_ids(self) -> Set[int]:
+    def _order_group_page(
+        self,
+        predicate,
+        sort_column: Optional[str],
+        ascending: bool,
+        offset: int,
+        rows_per_page: int,
+    ) -> dict:
+        """
+        One page of orders aggregated over the lines matching ``predicate``.
+        A page left past the end (rows deleted since) falls back to the last one.
+        """
+        groups, total = db_service.get_order_groups(
+            predicate, sort_column, ascending, rows_per_page, offset
+        )
+        if not groups and total and offset:
+            offset = (total - 1) // rows_per_page * rows_per_page
+            groups, total = db_service.get_order_groups(
+                predicate, sort_column, ascending, rows_per_page, offset
+            )
+        return {"groups": groups, "total": total, "offset": offset}
+
+    def _order_group_lines(self, predicate, page: dict, expanded: Set[str]) -> Dict[str, list]:
+        """Lines of the expanded orders on ``page``, fetched per order."""
+        return {
+            group["order_id"]: db_service.get_order_group_lines(predicate, group["order_id"])
+            for group in page["groups"]
+            if group["order_id"] in expanded
+        }
+
+    def _load_orders_group_page(self, offset: int = 0):
+        """
+        Fetch the page of orders at ``offset`` the grouped orders table shows
+        under the current filters and sort, with its expanded orders' lines.
+        """
+        self.orders_group_offset = offset
+        if not self.orders_group_by_order or not self._orders_data:
+            self._orders_group_page = {"groups": [], "total": 0, "offset": 0}
+            self._orders_group_lines = {}
+            return
+        predicate = orders_filter_sql(self._orders_filter_snapshot())
+        page = self._order_group_page(
+            predicate,
+            self.orders_sort_column,
+            self.orders_sort_ascending,
+            offset,
+            self.orders_rows_per_page,
+        )
+        self._orders_group_page = page
+        self._orders_group_lines = self._order_group_lines(
+            predicate, page, self.orders_expanded_orders
+        )
+
+    @timed_rx_var
+    def orders_group_rows(self) -> List[dict]:
+        return order_group_rows(self._orders_group_page["groups"], self._orders_group_lines)
+
+    @timed_rx_var
+    def orders_group_total(self) -> int:
+        """Number of orders matching the filters, on all pages."""
+        return self._orders_group_page["total"]
+
+    @timed_rx_var
+    def orders_group_has_previous_page(self) -> bool:
+        return self._orders_group_page["offset"] > 0
+
+    @timed_rx_var
+    def orders_group_has_next_page(self) -> bool:
+        page = self._orders_group_page
+        return page["offset"] + self.orders_rows_per_page < page["total"]
+
+    @timed_rx_var
+    def orders_group_rows_display(self) -> str:
+        page = self._orders_group_page
+        if not page["groups"]:
+            return "0"
+        return f"{page['offset'] + 1}-{page['offset'] + len(page['groups'])}"
+
+    @timed_rx_var
+    def _orders_page_item_ids(self) -> Set[int]:
         """Get the set of IDs for items on the current page of orders table."""
         return {item["id"] for item in self.orders_paginated_data}
 
-    @rx.var
+    @timed_rx_var
+    def orders_page_selected_ids(self) -> List[int]:
+        """Get the IDs of selected items on the current page of orders table."""
+        is_selected = selection_predicate(self._orders_selection())
+        return [item["id"] for item in self.orders_paginated_data if is_selected(item)]
+
+    @timed_rx_var
     def orders_all_rows_on_page_selected(self) -> bool:
         """Check if all rows on the current page are selected in orders table."""
         if not self.orders_paginated_data:
             return False
-        return self.orders_page_item_ids.issubset(self.orders_selected_rows)
+        return len(self.orders_page_selected_ids) == len(self.orders_paginated_data)
+
+    @timed_rx_var
+    def orders_selected_count(self) -> int:
+        """Number of selected rows in orders table, without materializing them."""
+        if not self.orders_select_all_matching:
+            return len(self.orders_selected_rows)
+        if self.orders_selection_filters == self._orders_filter_snapshot():
+            matching = self.orders_total_rows
+        else:
+            matches = orders_filter_predicate(self.orders_selection_filters)
+            matching = sum(1 for item in self._orders_data if matches(item))
+        # Exclusions only ever hold matching rows, inclusions only non-matching ones.
+        return matching - len(self.orders_excluded_rows) + len(self.orders_selected_rows)
+
+    @timed_rx_var
+    def orders_has_selection(self) -> bool:
+        """Check if any row is selected in orders table."""
+        return self.orders_select_all_matching or len(self.orders_selected_rows) > 0
+
+    def _chart_total(self, period: str, field: str) -> float:
+        """A total loaded by _load_chart_totals, 0 before the chart is loaded."""
+        return self._chart_totals.get(period, {}).get(field, 0)
 
-    @rx.var
+    @timed_rx_var
     def total_revenue(self) -> float:
-        """Calculate total revenue from orders data."""
-        if not self._orders_data:
-            return 0.0
-        return sum(
-            float(item.get("revenue", 0) or 0) for item in self._orders_data
-        )
+        """Total revenue of all orders, from the shared daily buckets."""
+        return float(self._chart_total("all", "revenue"))
 
-    @rx.var
+    @timed_rx_var
     def total_failed_tasks(self) -> int:
-        """Calculate total failed tasks from daily_task_stats."""
-        if not self.visitor_data:
-            return 0
-        return sum(item.get("series1", 0) for item in self.visitor_data)
+        """Total failed tasks from daily_task_stats over the chart timeframe."""
+        return int(self._chart_total("timeframe", "failed_tasks"))
 
-    @rx.var
+    @timed_rx_var
     def total_completed_tasks(self) -> int:
-        """Calculate total completed tasks from daily_task_stats."""
-        if not self.visitor_data:
-            return 0
-        return sum(item.get("series2", 0) for item in self.visitor_data)
+        """Total completed tasks from daily_task_stats over the chart timeframe."""
+        return int(self._chart_total("timeframe", "completed_tasks"))
+
+    def _month_change(self, field: str) -> tuple[float, str]:
+        """Change of a series between the current and the previous month."""
+        current = self._chart_total("current_month", field)
+        previous = self._chart_total("previous_month", field)
+        if previous == 0:
+            return (0.0, "neutral")
+        change = ((current - previous) / previous) * 100
+        direction = "up" if change > 0 else "down" if change < 0 else "neutral"
+        return (change, direction)
 
-    @rx.var
+    @timed_rx_var
     def revenue_change_percent(self) -> tuple[float, str]:
         """Calculate revenue change between current and previous month."""
-        try:
-            # Get current and previous month data from database
-            current_month_revenue = db_service.get_monthly_revenue(0)  # Current month
-            previous_month_revenue = db_service.get_monthly_revenue(1)  # Previous month
+        return self._month_change("revenue")
 
-            if previous_month_revenue == 0:
-                return (0.0, "neutral")
-
-            change = ((current_month_revenue - previous_month_revenue) / previous_month_revenue) * 100
-            direction = "up" if change > 0 else "down" if change < 0 else "neutral"
-            return (change, direction)
-        except Exception:
-            return (0.0, "neutral")
-
-    @rx.var
+    @timed_rx_var
     def failed_tasks_change_percent(self) -> tuple[float, str]:
         """Calculate failed tasks change between current and previous month."""
-        try:
-            current_month_failed = db_service.get_monthly_failed_tasks(0)  # Current month
-            previous_month_failed = db_service.get_monthly_failed_tasks(1)  # Previous month
-
-            if previous_month_failed == 0:
-                return (0.0, "neutral")
+        return self._month_change("failed_tasks")
 
-            change = ((current_month_failed - previous_month_failed) / previous_month_failed) * 100
-            direction = "up" if change > 0 else "down" if change < 0 else "neutral"
-            return (change, direction)
-        except Exception:
-            return (0.0, "neutral")
-
-    @rx.var
+    @timed_rx_var
     def completed_tasks_change_percent(self) -> tuple[float, str]:
         """Calculate completed tasks change between current and previous month."""
-        try:
-            current_month_completed = db_service.get_monthly_completed_tasks(0)  # Current month
-            previous_month_completed = db_service.get_monthly_completed_tasks(1)  # Previous month
-
-            if previous_month_completed == 0:
-                return (0.0, "neutral")
-
-            change = ((current_month_completed - previous_month_completed) / previous_month_completed) * 100
-            direction = "up" if change > 0 else "down" if change < 0 else "neutral"
-            return (change, direction)
-        except Exception:
-            return (0.0, "neutral")
+        return self._month_change("completed_tasks")
 
-    @rx.var
-    def filtered_data(self) -> List[DetailEntry]:
+    @timed_rx_var
+    def _filtered_data(self) -> List[DetailEntry]:
         """Filter the data based on current filter selections."""
         data = self._data
         if self.search_owner:
@@ -460,10 +827,10 @@ class DashboardState(rx.State):
         except (ValueError, IndexError):
             return "1900-01-01"  # Fallback date
 
-    @rx.var
-    def filtered_and_sorted_data(self) -> List[DetailEntry]:
+    @timed_rx_var
+    def _filtered_and_sorted_data(self) -> List[DetailEntry]:
         """Sort the filtered data."""
-        data_to_sort = self.filtered_data
+        data_to_sort = self._filtered_data
         if self.sort_column:
             try:
                 sort_key_map = {
@@ -501,12 +868,12 @@ class DashboardState(rx.State):
                 pass
         return data_to_sort
 
-    @rx.var
+    @timed_rx_var
     def total_rows(self) -> int:
         """Total number of rows after filtering."""
-        return len(self.filtered_and_sorted_data)
+        return len(self._filtered_and_sorted_data)
 
-    @rx.var
+    @timed_rx_var
     def total_pages(self) -> int:
         """Total number of pages."""
         if self.rows_per_page <= 0:
@@ -517,14 +884,14 @@ class DashboardState(rx.State):
             else 1
         )
 
-    @rx.var
+    @timed_rx_var
     def paginated_data(self) -> List[DetailEntry]:
         """Get the data for the current page."""
         start_index = (self.current_page - 1) * self.rows_per_page
         end_index = start_index + self.rows_per_page
-        return self.filtered_and_sorted_data[start_index:end_index]
+        return self._filtered_and_sorted_data[start_index:end_index]
 
-    @rx.var
+    @timed_rx_var
     def current_rows_display(self) -> str:
         """Display string for current rows."""
         if self.total_rows == 0:
@@ -536,67 +903,61 @@ class DashboardState(rx.State):
         )
         return f"{start}-{end}"
 
-    @rx.var
-    def page_item_ids(self) -> Set[int]:
+    @timed_rx_var
+    def _page_item_ids(self) -> Set[int]:
         """Get the set of IDs for items on the current page."""
         return {item["id"] for item in self.paginated_data}
 
-    @rx.var
+    @timed_rx_var
     def all_rows_on_page_selected(self) -> bool:
         """Check if all rows on the current page are selected."""
         if not self.paginated_data:
             return False
-        return self.page_item_ids.issubset(self.selected_rows)
+        return self._page_item_ids.issubset(self.selected_rows)
 
     # Secondary table computed properties
-    @rx.var
-    def secondary_filtered_data(self) -> List[dict]:
+    @timed_rx_var
+    def _secondary_filtered_data(self) -> List[dict]:
         """Filter the secondary data based on current filter selections."""
         data = self._orders_error_data
-        if self.secondary_search_owner:
-            data = [
-                item
-                for item in data
-                if self.secondary_search_owner.lower()
-                in item["order_id"].lower()
-            ]
-        return data
-
-    @rx.var
-    def secondary_filtered_and_sorted_data(self) -> List[dict]:
+        if not self.secondary_search_owner:
+            return data
+        index = order_errors_search_index.get(self._orders_data_version, data)
+        if index is None:
+            needle = normalize_text(self.secondary_search_owner)
+            return [item for item in data if needle in normalize_text(item["order_id"])]
+        return [data[position] for position in index.search(self.secondary_search_owner).tolist()]
+
+    def _secondary_page_order(self):
+        """Sort value and direction of the secondary table, ties aside."""
+        internal_key = ORDER_ERRORS_SORT_KEYS.get(self.secondary_sort_column or "")
+        if not internal_key:
+            # Load order: order id, then id.
+            return (lambda item: item["order_id"] or ""), True
+
+        def key_func(item):
+            return item[internal_key] or ""
+
+        return key_func, self.secondary_sort_ascending
+
+    @timed_rx_var
+    def _secondary_filtered_and_sorted_data(self) -> List[dict]:
         """Sort the secondary filtered data."""
-        data_to_sort = self.secondary_filtered_data
-        if self.secondary_sort_column:
+        data_to_sort = self._secondary_filtered_data
+        if ORDER_ERRORS_SORT_KEYS.get(self.secondary_sort_column or ""):
+            key_func, ascending = self._secondary_page_order()
             try:
-                sort_key_map = {
-                    "Mã đơn hàng": "order_id",
-                    "Thông báo lỗi": "error_code",
-                }
-                internal_key = sort_key_map.get(self.secondary_sort_column)
-                if internal_key:
-
-                    def key_func(item):
-                        return item[internal_key] or ""
-
-                    data_to_sort = sorted(
-                        data_to_sort,
-                        key=key_func,
-                        reverse=not self.secondary_sort_ascending,
-                    )
-                else:
-                    pass
-            except KeyError:
-                pass
-            except ValueError:
+                data_to_sort = sorted(data_to_sort, key=key_func, reverse=not ascending)
+            except (KeyError, ValueError):
                 pass
         return data_to_sort
 
-    @rx.var
+    @timed_rx_var
     def secondary_total_rows(self) -> int:
         """Total number of rows after filtering for secondary table."""
-        return len(self.secondary_filtered_and_sorted_data)
+        return len(self._secondary_filtered_and_sorted_data)
 
-    @rx.var
+    @timed_rx_var
     def secondary_total_pages(self) -> int:
         """Total number of pages for secondary table."""
         if self.secondary_rows_per_page <= 0:
@@ -608,50 +969,138 @@ class DashboardState(rx.State):
             else 1
         )
 
-    @rx.var
+    @timed_rx_var
+    def _secondary_row_positions(self) -> Dict[int, int]:
+        """Position of each filtered and sorted row, by id."""
+        return row_positions(self._secondary_filtered_and_sorted_data)
+
+    def _secondary_sort_spec(self) -> list:
+        return [self.secondary_sort_column, self.secondary_sort_ascending]
+
+    @timed_rx_var
+    def _secondary_page_start(self) -> int:
+        """Where the page of the current cursor starts in the sorted rows."""
+        sort_value, ascending = self._secondary_page_order()
+        return cursor_position(
+            self.secondary_page_cursor,
+            self._secondary_filtered_and_sorted_data,
+            self._secondary_row_positions,
+            self._secondary_sort_spec(),
+            sort_value,
+            ascending,
+        )
+
+    def _secondary_cursor_at(self, position: int) -> str:
+        """Cursor of the page starting at ``position`` of the sorted rows."""
+        rows = self._secondary_filtered_and_sorted_data
+        if position <= 0 or not rows:
+            return ""
+        sort_value, _ = self._secondary_page_order()
+        return encode_cursor(
+            rows[min(position, len(rows) - 1)], self._secondary_sort_spec(), sort_value
+        )
+
+    @timed_rx_var
     def secondary_paginated_data(self) -> List[dict]:
         """Get the data for the current page of secondary table."""
-        start_index = (
-            self.secondary_current_page - 1
-        ) * self.secondary_rows_per_page
+        start_index = self._secondary_page_start
         end_index = start_index + self.secondary_rows_per_page
-        return self.secondary_filtered_and_sorted_data[start_index:end_index]
+        return self._secondary_filtered_and_sorted_data[start_index:end_index]
 
-    @rx.var
+    @timed_rx_var
+    def secondary_has_previous_page(self) -> bool:
+        return self._secondary_page_start > 0
+
+    @timed_rx_var
+    def secondary_has_next_page(self) -> bool:
+        return (
+            self._secondary_page_start + self.secondary_rows_per_page
+            < self.secondary_total_rows
+        )
+
+    @timed_rx_var
     def secondary_current_rows_display(self) -> str:
         """Display string for current rows in secondary table."""
         if self.secondary_total_rows == 0:
             return "0"
-        start = (
-            self.secondary_current_page - 1
-        ) * self.secondary_rows_per_page + 1
+        start = self._secondary_page_start + 1
         end = min(
-            self.secondary_current_page * self.secondary_rows_per_page,
+            self._secondary_page_start + self.secondary_rows_per_page,
             self.secondary_total_rows,
         )
         return f"{start}-{end}"
 
-    @rx.var
-    def secondary_page_item_ids(self) -> Set[int]:
+    def _load_secondary_group_page(self, offset: int = 0):
+        """
+        Fetch the page of orders at ``offset`` the grouped order errors table
+        shows under the current search and sort, with its expanded orders' lines.
+        """
+        self.secondary_group_offset = offset
+        if not self.secondary_group_by_order or not self._orders_error_data:
+            self._secondary_group_page = {"groups": [], "total": 0, "offset": 0}
+            self._secondary_group_lines = {}
+            return
+        predicate = order_errors_search_sql(self.secondary_search_owner)
+        page = self._order_group_page(
+            predicate,
+            self.secondary_sort_column,
+            self.secondary_sort_ascending,
+            offset,
+            self.secondary_rows_per_page,
+        )
+        self._secondary_group_page = page
+        self._secondary_group_lines = self._order_group_lines(
+            predicate, page, self.secondary_expanded_orders
+        )
+
+    @timed_rx_var
+    def secondary_group_rows(self) -> List[dict]:
+        return order_group_rows(
+            self._secondary_group_page["groups"], self._secondary_group_lines
+        )
+
+    @timed_rx_var
+    def secondary_group_total(self) -> int:
+        """Number of orders matching the search, on all pages."""
+        return self._secondary_group_page["total"]
+
+    @timed_rx_var
+    def secondary_group_has_previous_page(self) -> bool:
+        return self._secondary_group_page["offset"] > 0
+
+    @timed_rx_var
+    def secondary_group_has_next_page(self) -> bool:
+        page = self._secondary_group_page
+        return page["offset"] + self.secondary_rows_per_page < page["total"]
+
+    @timed_rx_var
+    def secondary_group_rows_display(self) -> str:
+        page = self._secondary_group_page
+        if not page["groups"]:
+            return "0"
+        return f"{page['offset'] + 1}-{page['offset'] + len(page['groups'])}"
+
+    @timed_rx_var
+    def _secondary_page_item_ids(self) -> Set[int]:
         """Get the set of IDs for items on the current page of secondary table."""
         return {item["id"] for item in self.secondary_paginated_data}
 
-    @rx.var
+    @timed_rx_var
     def secondary_all_rows_on_page_selected(self) -> bool:
         """Check if all rows on the current page are selected in secondary table."""
         if not self.secondary_paginated_data:
             return False
-        return self.secondary_page_item_ids.issubset(
+        return self._secondary_page_item_ids.issubset(
             self.secondary_selected_rows
         )
 
     # Product codes table computed properties
-    @rx.var
+    @timed_rx_var
     def product_codes_total_rows(self) -> int:
         """Total number of product codes."""
         return len(self._product_codes_data)
 
-    @rx.var
+    @timed_rx_var
     def product_codes_total_pages(self) -> int:
         """Total number of pages for product codes table."""
         if self.product_codes_rows_per_page <= 0:
@@ -663,7 +1112,7 @@ class DashboardState(rx.State):
             else 1
         )
 
-    @rx.var
+    @timed_rx_var
     def product_codes_paginated_data(self) -> List[dict]:
         """Get the data for the current page of product codes table."""
         start_index = (self.product_codes_current_page - 1) * self.product_codes_rows_per_page
@@ -703,41 +1152,105 @@ class DashboardState(rx.State):
             },
         ]
 
+    def _chart_start(self, timeframe: str) -> Optional[datetime.date]:
+        days = CHART_TIMEFRAMES.get(timeframe)
+        if days is None:
+            return None
+        return datetime.date.today() - datetime.timedelta(days=days - 1)
+
+    def _load_chart_totals(self):
+        """Read the key metrics' totals from the shared daily buckets."""
+        self._chart_totals = {
+            "all": timeseries_service.get_totals(),
+            "timeframe": timeseries_service.get_totals(
+                self._chart_start(self.selected_visitor_timeframe)
+            ),
+            "current_month": timeseries_service.get_month_totals(0),
+            "previous_month": timeseries_service.get_month_totals(1),
+        }
+
+    def _chart_series(self, timeframe: str, granularity: str) -> List[VisitorDataPoint]:
+        return timeseries_service.get_series(
+            granularity,
+            self._chart_start(timeframe),
+            max_points=chart_point_budget(self.chart_pixel_width),
+        )
+
     def load_chart_data(self):
         """Load chart data from daily_task_stats table."""
         try:
-            # Load real data from daily_task_stats
-            self.visitor_data = db_service.get_daily_task_stats(90)
-            self.displayed_visitor_data = self.visitor_data
+            timeseries_service.refresh()
+            self._load_chart_totals()
+            self.displayed_visitor_data = self._chart_series(
+                self.selected_visitor_timeframe, self.chart_granularity
+            )
         except Exception as e:
             print(f"Error loading chart data: {e}")
             # Fallback to empty data
+            self._chart_totals = {}
             today = datetime.date.today()
-            self.visitor_data = []
-            for i in range(90):
-                date = today - datetime.timedelta(days=i)
-                self.visitor_data.append(
-                    {
-                        "date": date.strftime("%b %d"),
-                        "series1": 0,
-                        "series2": 0,
-                    }
-                )
-            self.visitor_data.reverse()
-            self.displayed_visitor_data = self.visitor_data
+            self.displayed_visitor_data = [
+                {
+                    "date": (today - datetime.timedelta(days=i)).strftime("%b %d"),
+                    "series1": 0,
+                    "series2": 0,
+                    "revenue": 0,
+                }
+                for i in reversed(range(90))
+            ]
+
+    def _orders_loaded(self, watermarks: dict):
+        """Record the watermarks the tables were read at, if they held still."""
+        stable = bool(watermarks) and db_service.get_watermarks() == watermarks
+        self._orders_watermarks = watermarks if stable else {}
+        self._orders_data_version = data_version(watermarks) if stable else ""
+        # Unfiltered and unsorted, the sorted rows are the rows as loaded, so
+        # the default first pages are cached without reading the sorted view.
+        if self.orders_sort_column is None and (
+            self._orders_filter_snapshot() == empty_orders_filter()
+        ):
+            self._orders_page_cache = self._orders_pages_around(self._orders_data, 0)
+        else:
+            self._orders_page_cache = {}
+        self._load_orders_facet_counts()
+        self._load_error_code_stats()
+        self._load_orders_group_page(self.orders_group_offset)
+        self._load_secondary_group_page(self.secondary_group_offset)
+        orders_search_index.warm(self._orders_data_version, self._orders_data)
+        orders_identifier_index.warm(self._orders_data_version, self._orders_data)
+        orders_product_index.warm(self._orders_data_version, self._orders_data)
+        self._load_orders_product_search()
+        order_errors_search_index.warm(self._orders_data_version, self._orders_error_data)
+        self._session_data_evicted = False
+        session_data.loaded(
+            self.router.session.client_token,
+            estimate_rows_bytes(self._orders_data)
+            + estimate_rows_bytes(self._orders_error_data)
+            + estimate_rows_bytes(self._product_codes_data),
+        )
 
     def load_orders_data(self):
         """Load orders data from DuckDB."""
         try:
+            watermarks = db_service.get_watermarks()
             self._orders_data = db_service.get_orders_data()
             self._orders_error_data = db_service.get_orders_error_data()
             self._product_codes_data = db_service.get_non_existing_codes()
             self.orders_status_summary = db_service.get_orders_status_summary()
+            self._orders_loaded(watermarks)
         except Exception as e:
             print(f"Error loading orders data: {e}")
             self._orders_data = []
             self._orders_error_data = []
             self._product_codes_data = []
+            self._orders_page_cache = {}
+            self._orders_watermarks = {}
+            self._orders_data_version = ""
+            self._load_orders_facet_counts()
+            self._load_orders_product_search()
+            self._load_error_code_stats()
+            self._load_orders_group_page(self.orders_group_offset)
+            self._load_secondary_group_page(self.secondary_group_offset)
             self.orders_status_summary = {
                 "total_orders": 0,
                 "online_orders": 0,
@@ -746,15 +1259,96 @@ class DashboardState(rx.State):
                 "offline_percent": 0.0
             }
 
+    def merge_orders_changes(self) -> bool:
+        """
+        Bring the loaded tables up to date with only the order lines
+        inserted or updated since they were read, merged in by id.
+        Returns False when that is not possible (nothing loaded, or rows
+        were deleted or re-keyed) and a full reload is needed.
+        """
+        previous = self._orders_watermarks
+        if not previous or not self._orders_data:
+            return False
+        try:
+            current = db_service.get_watermarks()
+            if not current or current["orders_count"] < previous["orders_count"]:
+                return False
+            if current == previous:
+                return True
+            merged = merge_orders(
+                self._orders_data,
+                db_service.get_orders_data(updated_since=previous["orders_updated_at"]),
+            )
+            if len(merged) != current["orders_count"]:
+                return False
+            self._orders_data = merged
+            self._orders_error_data = order_errors_rows(merged)
+            if (current["codes_count"], current["codes_detected_at"]) != (
+                previous["codes_count"],
+                previous["codes_detected_at"],
+            ):
+                self._product_codes_data = db_service.get_non_existing_codes()
+            self.orders_status_summary = db_service.get_orders_status_summary()
+            self._orders_loaded(current)
+            return True
+        except Exception as e:
+            print(f"Error merging orders changes: {e}")
+            return False
+
+    def _prune_orders_selection(self):
+        """Forget selected ids whose rows are gone."""
+        if not (self.orders_selected_rows or self.orders_excluded_rows):
+            return
+        ids = {item["id"] for item in self._orders_data}
+        self.orders_selected_rows = self.orders_selected_rows & ids
+        self.orders_excluded_rows = self.orders_excluded_rows & ids
+
+    def evict_session_data(self):
+        """
+        Drop the loaded tables. Computed vars cached from them are marked
+        dirty through their dependencies once the state's delta is taken.
+        """
+        self._orders_data = []
+        self._orders_error_data = []
+        self._product_codes_data = []
+        self._orders_page_cache = {}
+        # Emptied along with the tables, without querying.
+        self._load_orders_facet_counts()
+        self._load_orders_product_search()
+        self._load_error_code_stats()
+        self._load_orders_group_page(self.orders_group_offset)
+        self._load_secondary_group_page(self.secondary_group_offset)
+        self._session_data_evicted = True
+
+    def rehydrate_session_data(self) -> bool:
+        """Reload tables evicted while the session was idle. Returns whether it did."""
+        if not self._session_data_evicted:
+            return False
+        self.load_orders_data()
+        return True
+
     @rx.event
     def load_initial_data(self):
         """Load initial data and orders data if not already loaded."""
         if not self._orders_data:
             self.load_orders_data()
-        if not self.visitor_data:
+        if not self.displayed_visitor_data:
             self.load_chart_data()
         if not self.key_metrics:
             self._generate_fake_data()
+        live_updates.subscribe(self.router.session.client_token)
+
+    def apply_live_update(self, update: dict):
+        """Show a change pushed by the live update poller, without querying."""
+        self._load_chart_totals()
+        if "orders_status_summary" in update:
+            self.orders_status_summary = update["orders_status_summary"]
+        if self.displayed_visitor_data:
+            self.displayed_visitor_data = self._chart_series(
+                self.selected_visitor_timeframe, self.chart_granularity
+            )
+        if self.key_metrics:
+            self._generate_fake_data()
 
     @rx.event
     def set_selected_section(self, section: str):
@@ -763,36 +1357,38 @@ class DashboardState(rx.State):
 
     @rx.event
     def set_visitor_timeframe(self, timeframe: str):
+        """Show the chart for one of CHART_TIMEFRAMES."""
+        if timeframe not in CHART_TIMEFRAMES:
+            return
         self.selected_visitor_timeframe = timeframe
+        self._load_chart_totals()
+        self.displayed_visitor_data = self._chart_series(
+            timeframe, self.chart_granularity
+        )
 
-        if timeframe == "3 tháng gần nhất":
-            try:
-                self.visitor_data = db_service.get_daily_task_stats(90)
-                self.displayed_visitor_data = self.visitor_data
-            except Exception:
-                self.displayed_visitor_data = self.visitor_data
-
-        if timeframe == "30 ngày gần nhất":
-            try:
-                self.visitor_data = db_service.get_daily_task_stats(30)
-                self.displayed_visitor_data = self.visitor_data
-            except Exception:
-                self.displayed_visitor_data = (
-                    self.visitor_data[-30:]
-                    if len(self.visitor_data) >= 30
-                    else self.visitor_data
-                )
+    @rx.event
+    def set_chart_pixel_width(self, width: int):
+        """Size the chart's point budget to its width in the browser."""
+        try:
+            width = int(width)
+        except (TypeError, ValueError):
+            return
+        if width <= 0 or width == self.chart_pixel_width:
+            return
+        self.chart_pixel_width = width
+        self.displayed_visitor_data = self._chart_series(
+            self.selected_visitor_timeframe, self.chart_granularity
+        )
 
-        if timeframe == "7 ngày gần nhất":
-            try:
-                self.visitor_data = db_service.get_daily_task_stats(7)
-                self.displayed_visitor_data = self.visitor_data
-            except Exception:
-                self.displayed_visitor_data = (
-                    self.visitor_data[-7:]
-                    if len(self.visitor_data) >= 7
-                    else self.visitor_data
-                )
+    @rx.event
+    def set_chart_granularity(self, granularity: str):
+        """Bucket the chart by day, week or month."""
+        if granularity not in CHART_GRANULARITIES:
+            return
+        self.chart_granularity = granularity
+        self.displayed_visitor_data = self._chart_series(
+            self.selected_visitor_timeframe, granularity
+        )
 
     @rx.event
     def refresh_all_data(self):
@@ -840,7 +1436,7 @@ class DashboardState(rx.State):
 
     def toggle_select_all_on_page(self):
         """Select or deselect all rows on the current page."""
-        page_ids = self.page_item_ids
+        page_ids = self._page_item_ids
         if self.all_rows_on_page_selected:
             self.selected_rows -= page_ids
         else:
@@ -1017,92 +1613,147 @@ class DashboardState(rx.State):
         # Close other export dropdowns first
         self.show_orders_export_dropdown = False
         self.show_secondary_export_dropdown = False
+        self.show_product_codes_export_dropdown = False
         # Toggle this dropdown
         self.show_export_dropdown = not self.show_export_dropdown
 
+    def _download_export(self, url_path: Optional[str], filename: str):
+        """Hand a finished export file to the browser by URL."""
+        if url_path is None:
+            return rx.toast.error("Export failed")
+        return rx.download(
+            url=rx.Var.create(f"{rx.config.get_config().api_url}{url_path}"),
+            filename=filename,
+        )
+
+    def _start_export(self, key_parts: dict, filename: str, run):
+        """
+        Queue an export on the worker pool and watch it from this session.
+        ``key_parts`` must describe everything the file content depends on;
+        ``run(job)`` writes the file under ``job.key`` and returns its URL.
+        """
+        job = export_jobs.submit(
+            artifact_key({**key_parts, "filename": filename}),
+            filename,
+            run,
+            export_service.lookup,
+            on_finish=export_service.collect_garbage,
+            version=key_parts.get("version"),
+            subscriber=self.router.session.client_token,
+        )
+        self.export_job_id = job.id
+        self.export_job_filename = filename
+        self.export_job_status = job.status
+        self.export_job_progress = round(job.progress * 100)
+        self.show_export_dropdown = False
+        self.show_secondary_export_dropdown = False
+        self.show_orders_export_dropdown = False
+        self.show_product_codes_export_dropdown = False
+        return DashboardState.watch_export_job
+
+    @rx.event(background=True)
+    async def watch_export_job(self):
+        """Mirror the current export job's progress, then download the file."""
+        async with self:
+            job_id = self.export_job_id
+        while True:
+            job = export_jobs.get(job_id)
+            async with self:
+                if self.export_job_id != job_id:
+                    # A newer export took over the progress bar.
+                    return
+                self.export_job_status = job.status if job is not None else "failed"
+                self.export_job_progress = (
+                    round(job.progress * 100) if job is not None else 0
+                )
+            if job is None or job.finished:
+                break
+            await asyncio.sleep(0.5)
+
+        if job is not None and job.status == "done":
+            yield self._download_export(job.url, job.filename)
+        elif job is None or job.status == "failed":
+            yield rx.toast.error("Export failed")
+
     @rx.event
-    def download_csv(self):
-        """Download the data as CSV - selected rows if any are selected, otherwise all filtered data."""
-        # If rows are selected, export only selected rows, otherwise export all filtered data
+    def cancel_export_job(self):
+        """
+        Stop waiting on the export shown in the progress bar. Other sessions
+        waiting on the same export keep it running.
+        """
+        export_jobs.cancel(self.export_job_id, self.router.session.client_token)
+        self.export_job_id = ""
+        self.export_job_status = "cancelled"
+
+    def _details_rows_to_export(self) -> List[list]:
+        """Selected rows if any are selected, otherwise all filtered data."""
         if self.selected_rows:
             data_to_export = [
-                item for item in self.filtered_and_sorted_data
+                item for item in self._filtered_and_sorted_data
                 if item["id"] in self.selected_rows
             ]
         else:
-            data_to_export = self.filtered_and_sorted_data
-
-        df = pd.DataFrame(data_to_export)
-        display_columns = [
-            col.lower().replace(" ", "_")
-            for col in self.column_names
-            if col != "Edit"
-        ]
-        if "last_edited" not in df.columns and "last_edited" in display_columns:
-            display_columns.remove("last_edited")
-        if "costs" in df.columns and "costs" in display_columns:
-            pass
-        column_mapping = {
-            "owner": "Owner",
-            "status": "Status",
-            "region": "Region",
-            "stability": "Stability",
-            "costs": "Costs",
-            "last_edited": "Last edited",
+            data_to_export = self._filtered_and_sorted_data
+        return [[item[key] for key in DETAILS_EXPORT_COLUMNS] for item in data_to_export]
+
+    def _details_export_key(self, export_format: str) -> dict:
+        return {
+            "table": "details",
+            "version": "static",
+            "filters": [
+                self.search_owner,
+                sorted(self.selected_statuses),
+                sorted(self.selected_regions),
+                self.min_cost,
+                self.max_cost,
+                self.start_date,
+                self.end_date,
+            ],
+            "sort": [self.sort_column, self.sort_ascending],
+            "selection": sorted(self.selected_rows),
+            "columns": DETAILS_EXPORT_COLUMNS,
+            "format": export_format,
         }
-        df_display = df[[key for key in column_mapping if key in df.columns]]
-        df_display.columns = [column_mapping[col] for col in df_display.columns]
-        stream = io.StringIO()
-        df_display.to_csv(stream, index=False)
-        return rx.download(
-            data=stream.getvalue(),
-            filename="details_export.csv",
+
+    @rx.event
+    def download_csv(self):
+        """Download the data as CSV - selected rows if any are selected, otherwise all filtered data."""
+        rows = self._details_rows_to_export()
+        return self._start_export(
+            self._details_export_key("csv"),
+            "details_export.csv",
+            lambda job: export_service.export_rows_csv(
+                job.key,
+                list(DETAILS_EXPORT_COLUMNS.values()),
+                rows,
+                "details_export.csv",
+                job=job,
+            ),
         )
 
     @rx.event
     def download_xlsx(self):
         """Download the data as XLSX - selected rows if any are selected, otherwise all filtered data."""
-        # If rows are selected, export only selected rows, otherwise export all filtered data
-        if self.selected_rows:
-            data_to_export = [
-                item for item in self.filtered_and_sorted_data
-                if item["id"] in self.selected_rows
-            ]
-        else:
-            data_to_export = self.filtered_and_sorted_data
-
-        df = pd.DataFrame(data_to_export)
-        display_columns = [
-            col.lower().replace(" ", "_")
-            for col in self.column_names
-            if col != "Edit"
-        ]
-        if "last_edited" not in df.columns and "last_edited" in display_columns:
-            display_columns.remove("last_edited")
-        if "costs" in df.columns and "costs" in display_columns:
-            pass
-        column_mapping = {
-            "owner": "Owner",
-            "status": "Status",
-            "region": "Region",
-            "stability": "Stability",
-            "costs": "Costs",
-            "last_edited": "Last edited",
-        }
-        df_display = df[[key for key in column_mapping if key in df.columns]]
-        df_display.columns = [column_mapping[col] for col in df_display.columns]
-        stream = io.BytesIO()
-        df_display.to_excel(stream, index=False, engine='openpyxl')
-        return rx.download(
-            data=stream.getvalue(),
-            filename="details_export.xlsx",
+        rows = self._details_rows_to_export()
+        return self._start_export(
+            self._details_export_key("xlsx"),
+            "details_export.xlsx",
+            lambda job: export_service.export_rows_xlsx(
+                job.key,
+                list(DETAILS_EXPORT_COLUMNS.values()),
+                rows,
+                "details_export.xlsx",
+                sheet_name="Details",
+                job=job,
+            ),
         )
 
     # Secondary table methods
     def set_secondary_search_owner(self, value: str):
         """Update the secondary search owner filter."""
         self.secondary_search_owner = value
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def toggle_secondary_sort(self, column_name: str):
         """Toggle sorting for a column in secondary table."""
@@ -1111,21 +1762,62 @@ class DashboardState(rx.State):
         else:
             self.secondary_sort_column = column_name
             self.secondary_sort_ascending = True
+        self._load_secondary_group_page()
 
     def secondary_go_to_page(self, page_number: int):
         """Navigate to a specific page in secondary table."""
         if 1 <= page_number <= self.secondary_total_pages:
-            self.secondary_current_page = page_number
+            self.secondary_page_cursor = self._secondary_cursor_at(
+                (page_number - 1) * self.secondary_rows_per_page
+            )
 
     def secondary_next_page(self):
         """Go to the next page in secondary table."""
-        if self.secondary_current_page < self.secondary_total_pages:
-            self.secondary_current_page += 1
+        if self.secondary_has_next_page:
+            self.secondary_page_cursor = self._secondary_cursor_at(
+                self._secondary_page_start + self.secondary_rows_per_page
+            )
 
     def secondary_previous_page(self):
         """Go to the previous page in secondary table."""
-        if self.secondary_current_page > 1:
-            self.secondary_current_page -= 1
+        if self.secondary_has_previous_page:
+            self.secondary_page_cursor = self._secondary_cursor_at(
+                self._secondary_page_start - self.secondary_rows_per_page
+            )
+
+    def toggle_secondary_group_view(self):
+        """Switch the order errors table between lines and orders."""
+        self.secondary_group_by_order = not self.secondary_group_by_order
+        self.secondary_expanded_orders = set()
+        self._load_secondary_group_page()
+
+    def toggle_secondary_group(self, order_id: str):
+        """Show or hide the lines of one order in the grouped errors table."""
+        if order_id in self.secondary_expanded_orders:
+            self.secondary_expanded_orders.discard(order_id)
+        else:
+            self.secondary_expanded_orders.add(order_id)
+        self._secondary_group_lines = self._order_group_lines(
+            order_errors_search_sql(self.secondary_search_owner),
+            self._secondary_group_page,
+            {order_id} & self.secondary_expanded_orders,
+        ) | {
+            expanded: lines
+            for expanded, lines in self._secondary_group_lines.items()
+            if expanded != order_id
+        }
+
+    def secondary_group_next_page(self):
+        if self.secondary_group_has_next_page:
+            self._load_secondary_group_page(
+                self._secondary_group_page["offset"] + self.secondary_rows_per_page
+            )
+
+    def secondary_group_previous_page(self):
+        if self.secondary_group_has_previous_page:
+            self._load_secondary_group_page(
+                max(self._secondary_group_page["offset"] - self.secondary_rows_per_page, 0)
+            )
 
     def toggle_secondary_row_selection(self, row_id: int):
         """Toggle selection state for a single row using its ID in secondary table."""
@@ -1136,7 +1828,7 @@ class DashboardState(rx.State):
 
     def toggle_secondary_select_all_on_page(self):
         """Select or deselect all rows on the current page in secondary table."""
-        page_ids = self.secondary_page_item_ids
+        page_ids = self._secondary_page_item_ids
         if self.secondary_all_rows_on_page_selected:
             self.secondary_selected_rows -= page_ids
         else:
@@ -1202,14 +1894,16 @@ class DashboardState(rx.State):
             self.secondary_temp_selected_statuses.copy()
         )
         self.show_secondary_status_filter = False
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def apply_secondary_region_filter(self):
         self.secondary_selected_regions = (
             self.secondary_temp_selected_regions.copy()
         )
         self.show_secondary_region_filter = False
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def apply_secondary_costs_filter(self):
         new_min_cost = None
@@ -1227,19 +1921,22 @@ class DashboardState(rx.State):
         self.secondary_min_cost = new_min_cost
         self.secondary_max_cost = new_max_cost
         self.show_secondary_costs_filter = False
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def reset_secondary_status_filter(self):
         self.secondary_temp_selected_statuses = set()
         self.secondary_selected_statuses = set()
         self.show_secondary_status_filter = False
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def reset_secondary_region_filter(self):
         self.secondary_temp_selected_regions = set()
         self.secondary_selected_regions = set()
         self.show_secondary_region_filter = False
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def reset_secondary_costs_filter(self):
         self.secondary_temp_min_cost_str = ""
@@ -1247,7 +1944,8 @@ class DashboardState(rx.State):
         self.secondary_min_cost = None
         self.secondary_max_cost = None
         self.show_secondary_costs_filter = False
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def reset_all_secondary_filters(self):
         """Reset all secondary filters and search."""
@@ -1263,99 +1961,93 @@ class DashboardState(rx.State):
         self.show_secondary_status_filter = False
         self.show_secondary_region_filter = False
         self.show_secondary_costs_filter = False
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
         self.secondary_selected_rows = set()
         self.secondary_sort_column = None
         self.secondary_sort_ascending = True
+        self._load_secondary_group_page()
 
     def refresh_secondary_data(self):
         """Refresh secondary data - regenerate metrics and reload table data."""
         self.secondary_selected_rows = set()
-        self.secondary_current_page = 1
+        self.secondary_page_cursor = ""
+        self._load_secondary_group_page()
 
     def toggle_secondary_export_dropdown(self):
         """Toggle the export dropdown for secondary table."""
         # Close other export dropdowns first
         self.show_export_dropdown = False
         self.show_orders_export_dropdown = False
+        self.show_product_codes_export_dropdown = False
         # Toggle this dropdown
         self.show_secondary_export_dropdown = not self.show_secondary_export_dropdown
 
+    def _start_secondary_export(self, export_format: str):
+        """Export the secondary table - selected rows if any are selected, otherwise all filtered data."""
+        search = self.secondary_search_owner
+        sort_column, ascending = self.secondary_sort_column, self.secondary_sort_ascending
+        selected_ids = (
+            sorted(self.secondary_selected_rows) if self.secondary_selected_rows else None
+        )
+        filename = f"secondary_details_export.{export_format}"
+        return self._start_export(
+            {
+                "table": "order_errors",
+                "version": db_service.get_data_version(),
+                "filters": [search],
+                "sort": [sort_column, ascending],
+                "selection": selected_ids,
+                "columns": ORDER_ERRORS_EXPORT_COLUMNS,
+                "format": export_format,
+            },
+            filename,
+            lambda job: export_service.export_order_errors(
+                job.key,
+                export_format,
+                search,
+                sort_column,
+                ascending,
+                selected_ids,
+                filename=filename,
+                job=job,
+            ),
+        )
+
     @rx.event
     def download_secondary_csv(self):
         """Download the secondary data as CSV - selected rows if any are selected, otherwise all filtered data."""
-        # If rows are selected, export only selected rows, otherwise export all filtered data
-        if self.secondary_selected_rows:
-            data_to_export = [
-                item for item in self.secondary_filtered_and_sorted_data
-                if item["id"] in self.secondary_selected_rows
-            ]
-        else:
-            data_to_export = self.secondary_filtered_and_sorted_data
-
-        df = pd.DataFrame(data_to_export)
-        display_columns = [
-            col.lower().replace(" ", "_")
-            for col in self.column_names
-            if col != "Edit"
-        ]
-        if "last_edited" not in df.columns and "last_edited" in display_columns:
-            display_columns.remove("last_edited")
-        if "costs" in df.columns and "costs" in display_columns:
-            pass
-        column_mapping = {
-            "order_id": "Mã đơn hàng",
-            "error_code": "Thông báo lỗi",
-        }
-        df_display = df[[key for key in column_mapping if key in df.columns]]
-        df_display.columns = [column_mapping[col] for col in df_display.columns]
-        stream = io.StringIO()
-        df_display.to_csv(stream, index=False)
-        return rx.download(
-            data=stream.getvalue(),
-            filename="secondary_details_export.csv",
-        )
+        return self._start_secondary_export("csv")
 
     @rx.event
     def download_secondary_xlsx(self):
         """Download the secondary data as XLSX - selected rows if any are selected, otherwise all filtered data."""
-        # If rows are selected, export only selected rows, otherwise export all filtered data
-        if self.secondary_selected_rows:
-            data_to_export = [
-                item for item in self.secondary_filtered_and_sorted_data
-                if item["id"] in self.secondary_selected_rows
-            ]
-        else:
-            data_to_export = self.secondary_filtered_and_sorted_data
+        return self._start_secondary_export("xlsx")
 
-        df = pd.DataFrame(data_to_export)
-        display_columns = [
-            col.lower().replace(" ", "_")
-            for col in self.column_names
-            if col != "Edit"
-        ]
-        if "last_edited" not in df.columns and "last_edited" in display_columns:
-            display_columns.remove("last_edited")
-        if "costs" in df.columns and "costs" in display_columns:
-            pass
-        column_mapping = {
-            "order_id": "Mã đơn hàng",
-            "error_code": "Thông báo lỗi",
-        }
-        df_display = df[[key for key in column_mapping if key in df.columns]]
-        df_display.columns = [column_mapping[col] for col in df_display.columns]
-        stream = io.BytesIO()
-        df_display.to_excel(stream, index=False, engine='openpyxl')
-        return rx.download(
-            data=stream.getvalue(),
-            filename="secondary_details_export.xlsx",
-        )
+    @rx.event
+    def download_secondary_parquet(self):
+        """Download the secondary data as Parquet - selected rows if any are selected, otherwise all filtered data."""
+        return self._start_secondary_export("parquet")
+
+    @rx.event
+    def download_secondary_arrow(self):
+        """Download the secondary data as Arrow IPC - selected rows if any are selected, otherwise all filtered data."""
+        return self._start_secondary_export("arrow")
 
     # Orders table methods
     def set_orders_search_customer(self, value: str):
         """Update the orders search customer filter."""
         self.orders_search_customer = value
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
+
+    def set_orders_search_mode(self, mode: str):
+        """Switch between substring search and an exact identifier lookup."""
+        if mode in ORDERS_SEARCH_MODES:
+            self.orders_search_mode = mode
+            self.orders_page_cursor = ""
+            self._load_orders_facet_counts()
+            self._load_orders_group_page()
 
     def toggle_orders_sort(self, column_name: str):
         """Toggle sorting for a column in orders table."""
@@ -1364,36 +2056,198 @@ class DashboardState(rx.State):
         else:
             self.orders_sort_column = column_name
             self.orders_sort_ascending = True
+        self._load_orders_group_page()
 
     def orders_go_to_page(self, page_number: int):
         """Navigate to a specific page in orders table."""
         if 1 <= page_number <= self.orders_total_pages:
-            self.orders_current_page = page_number
+            self.orders_page_cursor = self._orders_cursor_at(
+                (page_number - 1) * self.orders_rows_per_page
+            )
+        return DashboardState.prefetch_orders_pages
 
     def orders_next_page(self):
         """Go to the next page in orders table."""
-        if self.orders_current_page < self.orders_total_pages:
-            self.orders_current_page += 1
+        if self.orders_has_next_page:
+            page = self._orders_cached_page()
+            self.orders_page_cursor = (
+                page["next"]
+                if page is not None
+                else self._orders_cursor_at(
+                    self._orders_page_start + self.orders_rows_per_page
+                )
+            )
+        return DashboardState.prefetch_orders_pages
 
     def orders_previous_page(self):
         """Go to the previous page in orders table."""
-        if self.orders_current_page > 1:
-            self.orders_current_page -= 1
+        if self.orders_has_previous_page:
+            page = self._orders_cached_page()
+            self.orders_page_cursor = (
+                page["previous"]
+                if page is not None
+                else self._orders_cursor_at(
+                    self._orders_page_start - self.orders_rows_per_page
+                )
+            )
+        return DashboardState.prefetch_orders_pages
+
+    def prefetch_orders_pages(self):
+        """
+        Cache the pages before and after the current one, after the current
+        page was sent, so turning to them does not read the sorted rows.
+        """
+        if self.orders_scroll_mode:
+            return
+        page = self._orders_cached_page()
+        if page is not None and all(
+            cursor is None or cursor in self._orders_page_cache["pages"]
+            for cursor in (page["previous"], page["next"])
+        ):
+            return
+        self._orders_page_cache = self._orders_pages_around(
+            self._orders_filtered_and_sorted_data, self._orders_page_start
+        )
+
+    def set_orders_viewport(self, viewport: List[int]):
+        """
+        Serve the scroll grid the window around its viewport, given as the
+        [first, last) visible rows. Scrolling within the served window keeps
+        it, so a fast scroll only fetches rows when it nears a window edge.
+        """
+        try:
+            first, last = int(viewport[0]), int(viewport[1])
+        except (IndexError, TypeError, ValueError):
+            return
+        self._orders_viewport_first = max(first, 0)
+        start = self._orders_page_start
+        margin = ORDERS_WINDOW_READ_AHEAD // 2
+        if start <= max(first - margin, 0) and (
+            min(last + margin, self.orders_total_rows) <= start + self.orders_window_size
+        ):
+            return
+        self.orders_window_size = max(
+            ORDERS_WINDOW_SIZE, last - first + 2 * ORDERS_WINDOW_READ_AHEAD
+        )
+        self.orders_window_start = max(first - ORDERS_WINDOW_READ_AHEAD, 0)
+
+    def toggle_orders_group_view(self):
+        """Switch the orders table between lines and orders aggregated from them."""
+        self.orders_group_by_order = not self.orders_group_by_order
+        self.orders_expanded_orders = set()
+        self._load_orders_group_page()
+
+    def toggle_orders_group(self, order_id: str):
+        """Show or hide the lines of one order in the grouped orders table."""
+        if order_id in self.orders_expanded_orders:
+            self.orders_expanded_orders.discard(order_id)
+        else:
+            self.orders_expanded_orders.add(order_id)
+        self._orders_group_lines = self._order_group_lines(
+            orders_filter_sql(self._orders_filter_snapshot()),
+            self._orders_group_page,
+            {order_id} & self.orders_expanded_orders,
+        ) | {
+            expanded: lines
+            for expanded, lines in self._orders_group_lines.items()
+            if expanded != order_id
+        }
+
+    def orders_group_next_page(self):
+        if self.orders_group_has_next_page:
+            self._load_orders_group_page(
+                self._orders_group_page["offset"] + self.orders_rows_per_page
+            )
+
+    def orders_group_previous_page(self):
+        if self.orders_group_has_previous_page:
+            self._load_orders_group_page(
+                max(self._orders_group_page["offset"] - self.orders_rows_per_page, 0)
+            )
+
+    def toggle_orders_scroll_mode(self):
+        """Switch the orders table between pages and the scroll grid, keeping its first row in view."""
+        if self.orders_scroll_mode:
+            self.orders_scroll_mode = False
+            self.orders_page_cursor = self._orders_cursor_at(self._orders_viewport_first)
+            return
+        first = self._orders_page_start
+        self.orders_scroll_mode = True
+        self.orders_window_size = ORDERS_WINDOW_SIZE
+        self.orders_window_start = max(first - ORDERS_WINDOW_READ_AHEAD, 0)
+        self._orders_viewport_first = first
+        return rx.call_script(
+            f"setTimeout(() => {{ document.getElementById('orders-grid').scrollTop = "
+            f"{first} * {ORDERS_ROW_HEIGHT}; }}, 0)"
+        )
+
+    def open_orders_detail(self, row_id: int, order_id: str):
+        """Show every column of an order line, read from the database by id."""
+        detail = db_service.get_order_detail(order_id, row_id)
+        self.orders_detail = (
+            [
+                {"label": label, "value": detail.get(field, "")}
+                for field, label in ORDER_DETAIL_LABELS.items()
+            ]
+            if detail
+            else []
+        )
+        self.show_orders_detail = True
+
+    def close_orders_detail(self):
+        self.show_orders_detail = False
+        self.orders_detail = []
+
+    def _set_orders_row_selected(self, item: OrderEntry, selected: bool):
+        """Select or deselect a single row, keeping the selection model minimal."""
+        row_id = item["id"]
+        matches = self.orders_select_all_matching and orders_filter_predicate(
+            self.orders_selection_filters
+        )(item)
+        if selected:
+            self.orders_excluded_rows.discard(row_id)
+            if not matches:
+                self.orders_selected_rows.add(row_id)
+        else:
+            self.orders_selected_rows.discard(row_id)
+            if matches:
+                self.orders_excluded_rows.add(row_id)
 
     def toggle_orders_row_selection(self, row_id: int):
         """Toggle selection state for a single row using its ID in orders table."""
-        if row_id in self.orders_selected_rows:
-            self.orders_selected_rows.remove(row_id)
-        else:
-            self.orders_selected_rows.add(row_id)
+        for item in self.orders_paginated_data:
+            if item["id"] == row_id:
+                self._set_orders_row_selected(
+                    item, row_id not in self.orders_page_selected_ids
+                )
+                return
 
     def toggle_orders_select_all_on_page(self):
         """Select or deselect all rows on the current page in orders table."""
-        page_ids = self.orders_page_item_ids
-        if self.orders_all_rows_on_page_selected:
-            self.orders_selected_rows -= page_ids
-        else:
-            self.orders_selected_rows.update(page_ids)
+        if self.orders_scroll_mode:
+            # The scroll grid has no pages; its header box selects every match.
+            if self.orders_select_all_matching:
+                self.clear_orders_selection()
+            else:
+                self.select_all_orders_matching()
+            return
+        selected = not self.orders_all_rows_on_page_selected
+        for item in self.orders_paginated_data:
+            self._set_orders_row_selected(item, selected)
+
+    def select_all_orders_matching(self):
+        """Select every row matching the current filters, however many there are."""
+        self.orders_select_all_matching = True
+        self.orders_selection_filters = self._orders_filter_snapshot()
+        self.orders_selected_rows = set()
+        self.orders_excluded_rows = set()
+
+    def clear_orders_selection(self):
+        """Deselect every row in orders table."""
+        self.orders_select_all_matching = False
+        self.orders_selection_filters = empty_orders_filter()
+        self.orders_selected_rows = set()
+        self.orders_excluded_rows = set()
 
     def toggle_orders_type_filter(self):
         is_opening = not self.show_orders_type_filter
@@ -1416,6 +2270,8 @@ class DashboardState(rx.State):
             self.orders_temp_selected_products = (
                 self.orders_selected_products.copy()
             )
+            self.orders_product_limit = PRODUCT_PICKER_PAGE_SIZE
+        self._load_orders_product_search()
 
     def toggle_orders_revenue_filter(self):
         is_opening = not self.show_orders_revenue_filter
@@ -1461,6 +2317,16 @@ class DashboardState(rx.State):
         else:
             self.orders_temp_selected_products.add(product)
 
+    def set_orders_product_query(self, value: str):
+        """Search the product filter; the list starts over from the top."""
+        self.orders_product_query = value
+        self.orders_product_limit = PRODUCT_PICKER_PAGE_SIZE
+        self._load_orders_product_search()
+
+    def load_more_orders_products(self):
+        """Show the next window of products matching the picker search."""
+        self.orders_product_limit += PRODUCT_PICKER_PAGE_SIZE
+
     def set_orders_temp_min_revenue(self, value: str):
         self.orders_temp_min_revenue_str = value
 
@@ -1478,14 +2344,18 @@ class DashboardState(rx.State):
             self.orders_temp_selected_types.copy()
         )
         self.show_orders_type_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def apply_orders_product_filter(self):
         self.orders_selected_products = (
             self.orders_temp_selected_products.copy()
         )
         self.show_orders_product_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def apply_orders_revenue_filter(self):
         new_min_revenue = None
@@ -1503,19 +2373,25 @@ class DashboardState(rx.State):
         self.orders_min_revenue = new_min_revenue
         self.orders_max_revenue = new_max_revenue
         self.show_orders_revenue_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def reset_orders_type_filter(self):
         self.orders_temp_selected_types = set()
         self.orders_selected_types = set()
         self.show_orders_type_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def reset_orders_product_filter(self):
         self.orders_temp_selected_products = set()
         self.orders_selected_products = set()
         self.show_orders_product_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def reset_orders_revenue_filter(self):
         self.orders_temp_min_revenue_str = ""
@@ -1523,7 +2399,9 @@ class DashboardState(rx.State):
         self.orders_min_revenue = None
         self.orders_max_revenue = None
         self.show_orders_revenue_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def apply_orders_date_filter(self):
         self.orders_start_date = (
@@ -1533,7 +2411,9 @@ class DashboardState(rx.State):
             self.orders_temp_end_date if self.orders_temp_end_date else None
         )
         self.show_orders_date_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def reset_orders_date_filter(self):
         self.orders_temp_start_date = ""
@@ -1541,17 +2421,44 @@ class DashboardState(rx.State):
         self.orders_start_date = None
         self.orders_end_date = None
         self.show_orders_date_filter = False
-        self.orders_current_page = 1
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
+
+    def clear_orders_error_code_filter(self):
+        self.orders_error_code = ""
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
+
+    def set_error_codes_window(self, window: str):
+        if window in ERROR_CODE_WINDOWS:
+            self.error_codes_window = window
+            self._load_error_code_stats()
+
+    def drill_into_error_code(self, error_code: str):
+        """Show the orders table filtered to the lines of one error code in the panel's window."""
+        self.orders_error_code = error_code
+        self.orders_start_date = error_code_window_start(self.error_codes_window)
+        self.orders_end_date = None
+        self.orders_temp_start_date = self.orders_start_date or ""
+        self.orders_temp_end_date = ""
+        self.orders_page_cursor = ""
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
+        return rx.scroll_to("orders-data")
 
     def reset_all_orders_filters(self):
         """Reset all orders filters and search."""
         self.orders_search_customer = ""
+        self.orders_search_mode = ""
         self.orders_selected_types = set()
         self.orders_selected_products = set()
         self.orders_min_revenue = None
         self.orders_max_revenue = None
         self.orders_start_date = None
         self.orders_end_date = None
+        self.orders_error_code = ""
         self.orders_temp_selected_types = set()
         self.orders_temp_selected_products = set()
         self.orders_temp_min_revenue_str = ""
@@ -1562,125 +2469,126 @@ class DashboardState(rx.State):
         self.show_orders_product_filter = False
         self.show_orders_revenue_filter = False
         self.show_orders_date_filter = False
-        self.orders_current_page = 1
-        self.orders_selected_rows = set()
+        self.orders_page_cursor = ""
+        self.clear_orders_selection()
         self.orders_sort_column = None
         self.orders_sort_ascending = True
+        self._load_orders_facet_counts()
+        self._load_orders_group_page()
 
     def refresh_orders_data(self):
-        """Refresh orders data - reload from database."""
-        self.load_orders_data()
+        """Refresh orders data - merge what changed, or reload from database."""
+        if not self.merge_orders_changes():
+            self.load_orders_data()
+        # The metric cards read their totals from the chart buckets.
+        self.load_chart_data()
         self._generate_fake_data()  # Regenerate metrics with new revenue data
-        self.orders_selected_rows = set()
-        self.orders_current_page = 1
+        # Ids are stable, so the selection still points at the same rows.
+        self._prune_orders_selection()
 
     def toggle_orders_export_dropdown(self):
         """Toggle the export dropdown for orders table."""
         # Close other export dropdowns first
         self.show_export_dropdown = False
         self.show_secondary_export_dropdown = False
+        self.show_product_codes_export_dropdown = False
         # Toggle this dropdown
         self.show_orders_export_dropdown = not self.show_orders_export_dropdown
 
+    def _start_orders_export(self, export_format: str):
+        """Export orders - selected rows if any are selected, otherwise all filtered data."""
+        filters = self._orders_filter_snapshot()
+        sort_column, ascending = self.orders_sort_column, self.orders_sort_ascending
+        selection = self._orders_selection() if self.orders_has_selection else None
+        return self._start_export(
+            {
+                "table": "orders",
+                "version": db_service.get_data_version(),
+                "filters": filters,
+                "sort": [sort_column, ascending],
+                "selection": selection,
+                "columns": ORDERS_EXPORT_COLUMNS,
+                "format": export_format,
+            },
+            f"orders_export.{export_format}",
+            lambda job: export_service.export_orders(
+                job.key,
+                export_format,
+                filters,
+                sort_column,
+                ascending,
+                selection,
+                job=job,
+            ),
+        )
+
     @rx.event
     def download_orders_csv(self):
         """Download the orders data as CSV - selected rows if any are selected, otherwise all filtered data."""
-        # If rows are selected, export only selected rows, otherwise export all filtered data
-        if self.orders_selected_rows:
-            data_to_export = [
-                item for item in self.orders_filtered_and_sorted_data
-                if item["id"] in self.orders_selected_rows
-            ]
-        else:
-            data_to_export = self.orders_filtered_and_sorted_data
-
-        df = pd.DataFrame(data_to_export)
-        display_columns = [
-            col.lower()
-            .replace(" ", "_")
-            .replace("ã", "a")
-            .replace("ô", "o")
-            .replace("ư", "u")
-            for col in self.orders_column_names
-            if col != "Edit"
-        ]
-        column_mapping = {
-            "order_date": "Ngày Ct",
-            "document_type": "Mã Ct",
-            "document_number": "Số Ct",
-            "department_code": "Mã bộ phận",
-            "order_id": "Mã đơn hàng",
-            "customer_name": "Tên khách hàng",
-            "phone_number": "Số điện thoại",
-            "district": "Quận huyện",
-            "ward": "Phường xã",
-            "address": "Địa chỉ",
-            "product_code": "Mã hàng",
-            "product_name": "Tên hàng",
-            "imei": "Imei",
-            "quantity": "Số lượng",
-            "revenue": "Doanh thu",
-            "error_code": "Ghi chú",
-        }
-        df_display = df[[key for key in column_mapping if key in df.columns]]
-        df_display.columns = [column_mapping[col] for col in df_display.columns]
-        stream = io.StringIO()
-        df_display.to_csv(stream, index=False)
-        return rx.download(
-            data=stream.getvalue(),
-            filename="orders_export.csv",
-        )
+        return self._start_orders_export("csv")
 
     @rx.event
     def download_orders_xlsx(self):
         """Download the orders data as XLSX - selected rows if any are selected, otherwise all filtered data."""
-        # If rows are selected, export only selected rows, otherwise export all filtered data
-        if self.orders_selected_rows:
-            data_to_export = [
-                item for item in self.orders_filtered_and_sorted_data
-                if item["id"] in self.orders_selected_rows
-            ]
-        else:
-            data_to_export = self.orders_filtered_and_sorted_data
-
-        df = pd.DataFrame(data_to_export)
-        display_columns = [
-            col.lower()
-            .replace(" ", "_")
-            .replace("ã", "a")
-            .replace("ô", "o")
-            .replace("ư", "u")
-            for col in self.orders_column_names
-            if col != "Edit"
-        ]
-        column_mapping = {
-            "order_date": "Ngày Ct",
-            "document_type": "Mã Ct",
-            "document_number": "Số Ct",
-            "department_code": "Mã bộ phận",
-            "order_id": "Mã đơn hàng",
-            "customer_name": "Tên khách hàng",
-            "phone_number": "Số điện thoại",
-            "district": "Quận huyện",
-            "ward": "Phường xã",
-            "address": "Địa chỉ",
-            "product_code": "Mã hàng",
-            "product_name": "Tên hàng",
-            "imei": "Imei",
-            "quantity": "Số lượng",
-            "revenue": "Doanh thu",
-            "error_code": "Ghi chú",
-        }
-        df_display = df[[key for key in column_mapping if key in df.columns]]
-        df_display.columns = [column_mapping[col] for col in df_display.columns]
-        stream = io.BytesIO()
-        df_display.to_excel(stream, index=False, engine='openpyxl')
-        return rx.download(
-            data=stream.getvalue(),
-            filename="orders_export.xlsx",
-        )
+        return self._start_orders_export("xlsx")
+
+    @rx.event
+    def download_orders_parquet(self):
+        """Download the orders data as Parquet - selected rows if any are selected, otherwise all filtered data."""
+        return self._start_orders_export("parquet")
+
+    @rx.event
+    def download_orders_arrow(self):
+        """Download the orders data as Arrow IPC - selected rows if any are selected, otherwise all filtered data."""
+        return self._start_orders_export("arrow")
 
     # Product codes table methods
+    def toggle_product_codes_export_dropdown(self):
+        """Toggle the export dropdown for product codes table."""
+        # Close other export dropdowns first
+        self.show_export_dropdown = False
+        self.show_secondary_export_dropdown = False
+        self.show_orders_export_dropdown = False
+        # Toggle this dropdown
+        self.show_product_codes_export_dropdown = (
+            not self.show_product_codes_export_dropdown
+        )
+
+    def _start_product_codes_export(self, export_format: str):
+        """Export every non-existing product code."""
+        return self._start_export(
+            {
+                "table": "product_codes",
+                "version": db_service.get_data_version(),
+                "columns": PRODUCT_CODES_EXPORT_COLUMNS,
+                "format": export_format,
+            },
+            f"product_codes_export.{export_format}",
+            lambda job: export_service.export_product_codes(
+                job.key, export_format, job=job
+            ),
+        )
+
+    @rx.event
+    def download_product_codes_csv(self):
+        """Download the product codes as CSV."""
+        return self._start_product_codes_export("csv")
+
+    @rx.event
+    def download_product_codes_xlsx(self):
+        """Download the product codes as XLSX."""
+        return self._start_product_codes_export("xlsx")
+
+    @rx.event
+    def download_product_codes_parquet(self):
+        """Download the product codes as Parquet."""
+        return self._start_product_codes_export("parquet")
+
+    @rx.event
+    def download_product_codes_arrow(self):
+        """Download the product codes as Arrow IPC."""
+        return self._start_product_codes_export("arrow")
+
     def product_codes_go_to_page(self, page_number: int):
         """Navigate to a specific page in product codes table."""
         if 1 <= page_number <= self.product_codes_total_pages:
@@ -0,0 +1,128 @@
+"""
+Benchmark the streaming XLSX export against the previous pandas/openpyxl path.
+
+Each variant runs in its own subprocess so peak RSS is measured in isolation:
+
+    python scripts/bench_xlsx_export.py --rows 200000
+"""
+
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def build_database(path: str, rows: int):
+    """Create an orders database with ``rows`` synthetic lines."""
+    import duckdb
+
+    con = duckdb.connect(path)
+    con.execute((ROOT / "schema.sql").read_text())
+    con.execute(
+        """
+        INSERT INTO orders (
+            order_id, customer_name, phone_number, document_type, document_number,
+            department_code, order_date, province, district, ward, address,
+            product_code, product_name, imei, quantity, revenue, source_type,
+            status, error_code
+        )
+        SELECT
+            'DH' || lpad(CAST(i // 3 AS VARCHAR), 8, '0'),
+            'Khách hàng ' || CAST(i % 5000 AS VARCHAR),
+            '09' || lpad(CAST(i % 100000000 AS VARCHAR), 8, '0'),
+            'HD',
+            'SCT' || CAST(i AS VARCHAR),
+            'BP' || CAST(i % 20 AS VARCHAR),
+            DATE '2023-01-01' + CAST(i % 1000 AS INTEGER),
+            'Hà Nội', 'Quận ' || CAST(i % 12 AS VARCHAR), 'Phường ' || CAST(i % 30 AS VARCHAR),
+            CAST(i AS VARCHAR) || ' Đường Láng, Đống Đa',
+            'P' || CAST(i % 800 AS VARCHAR),
+            'Sản phẩm ' || CAST(i % 800 AS VARCHAR),
+            '35' || lpad(CAST(i AS VARCHAR), 13, '0'),
+            1 + i % 5,
+            (i % 500) * 1000.0,
+            CASE WHEN i % 2 = 0 THEN 'online' ELSE 'offline' END,
+            'completed',
+            CASE WHEN i % 7 = 0 THEN 'E100' END
+        FROM range(?) AS t(i)
+        """,
+        [rows],
+    )
+    con.close()
+
+
+def run_pandas(db_path: str, out_path: str):
+    """The previous implementation: list of dicts -> DataFrame -> openpyxl."""
+    from data_dashboard.services.database_service import DatabaseService
+    from data_dashboard.services.orders_query import ORDERS_EXPORT_COLUMNS
+
+    import pandas as pd
+
+    data = DatabaseService(db_path).get_orders_data()
+    df = pd.DataFrame(data)
+    df_display = df[[key for key in ORDERS_EXPORT_COLUMNS if key in df.columns]]
+    df_display.columns = [ORDERS_EXPORT_COLUMNS[col] for col in df_display.columns]
+    stream = io.BytesIO()
+    df_display.to_excel(stream, index=False, engine="openpyxl")
+    Path(out_path).write_bytes(stream.getvalue())
+
+
+def run_streaming(db_path: str, out_path: str):
+    """The streaming implementation: DuckDB batches -> constant-memory writer."""
+    from data_dashboard.services import database_service
+    from data_dashboard.services.export_service import ExportService
+    from data_dashboard.services.orders_query import empty_orders_filter
+
+    database_service.db_service.db_path = db_path
+    service = ExportService(str(Path(out_path).parent / "streaming"))
+    service.export_orders("0" * 32, "xlsx", empty_orders_filter(), None, True)
+
+
+def measure(variant: str, db_path: str, out_dir: str):
+    """Run one variant in a subprocess and return (seconds, peak RSS MiB)."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, __file__, "--variant", variant, "--db", db_path, "--out", out_dir],
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return elapsed, peak_kib / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--variant", choices=["pandas", "streaming"])
+    parser.add_argument("--db")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    if args.variant:
+        out_path = os.path.join(args.out, f"{args.variant}.xlsx")
+        if args.variant == "pandas":
+            run_pandas(args.db, out_path)
+        else:
+            run_streaming(args.db, out_path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "orders.db")
+        build_database(db_path, args.rows)
+        print(f"{args.rows:,} rows")
+        # ru_maxrss of children is a high-water mark, so run the lighter variant first.
+        for variant in ("streaming", "pandas"):
+            elapsed, peak_mib = measure(variant, db_path, tmp)
+            print(f"{variant:>10}: {elapsed:7.1f} s   peak RSS {peak_mib:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
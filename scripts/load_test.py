@@ -0,0 +1,403 @@
+"""
+Load-test the dashboard backend with simulated browser sessions.
+
+Every simulated client opens its own Socket.IO connection to the event
+endpoint, hydrates, loads the dashboard and then replays a mix of table,
+filter, export and chart interactions. It waits for each event's final delta
+before sending the next one. Clients are added in --steps equal batches,
+one every --step-seconds. Unless --url points at a running backend, one is
+started on port 8035 against a generated DuckDB file, so no real data is
+needed:
+
+    uv run --with aiohttp python scripts/load_test.py --clients 50 --steps 5
+
+Reports throughput, latency percentiles and the server's RSS for every
+step of the ramp, then latency percentiles per event and CPU time over the
+whole run. Resource figures are read from /proc for the server's process
+tree, so they are only available for a local server on Linux.
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bench_xlsx_export import build_database  # noqa: E402
+
+EVENT_NAMESPACE = "/_event"
+
+CHART_TIMEFRAMES = ["Toàn bộ", "1 năm gần nhất", "3 tháng gần nhất", "30 ngày gần nhất", "7 ngày gần nhất"]
+CHART_GRANULARITIES = ["day", "week", "month"]
+ORDERS_SORT_COLUMNS = ["Ngày Ct", "Số Ct", "Tên khách hàng", "Doanh thu"]
+SEARCH_TERMS = ["", "khách", "hàng 12", "0900", "dh0000", "hà nội"]
+# Product names of the generated database ("Sản phẩm 0" to "Sản phẩm 799").
+PRODUCTS = [f"Sản phẩm {i}" for i in range(0, 800, 37)]
+
+
+def build_load_database(path: str, rows: int):
+    """Orders from the export benchmark, plus task stats and missing codes."""
+    import duckdb
+
+    build_database(path, rows)
+    con = duckdb.connect(path)
+    con.execute(
+        """
+        INSERT INTO daily_task_stats (stat_date, completed_tasks, failed_tasks)
+        SELECT CURRENT_DATE - CAST(i AS INTEGER), 50 + i % 40, i % 13
+        FROM range(1000) AS t(i)
+        """
+    )
+    con.execute(
+        """
+        INSERT INTO non_existing_codes (product_code, order_id)
+        SELECT 'X' || CAST(i AS VARCHAR), 'DH' || lpad(CAST(i AS VARCHAR), 8, '0')
+        FROM range(2000) AS t(i)
+        """
+    )
+    con.close()
+
+
+def _state_names():
+    from reflex.constants import CompileVars
+    from reflex.state import State
+
+    from data_dashboard.states.dashboard_state import DashboardState
+
+    return (
+        f"{State.get_full_name()}.{CompileVars.HYDRATE}",
+        DashboardState.get_full_name(),
+    )
+
+
+def interaction(rng: random.Random) -> List[Tuple[str, dict]]:
+    """One user action: the (handler name, payload) events it sends, in order."""
+    return rng.choice(
+        [
+            [("set_selected_section", {"section": rng.choice(["overview", "data"])})],
+            [("set_visitor_timeframe", {"timeframe": rng.choice(CHART_TIMEFRAMES)})],
+            [("set_chart_granularity", {"granularity": rng.choice(CHART_GRANULARITIES)})],
+            [("set_orders_search_customer", {"value": rng.choice(SEARCH_TERMS)})],
+            [("toggle_orders_sort", {"column_name": rng.choice(ORDERS_SORT_COLUMNS)})],
+            [("orders_next_page", {})],
+            [("orders_previous_page", {})],
+            [
+                ("toggle_orders_product_filter", {}),
+                ("toggle_orders_temp_product", {"product": rng.choice(PRODUCTS)}),
+                ("apply_orders_product_filter", {}),
+            ],
+            [("reset_orders_product_filter", {})],
+            [("download_orders_csv", {})],
+            [("set_secondary_search_owner", {"value": rng.choice(SEARCH_TERMS)})],
+            [("secondary_next_page", {})],
+        ]
+    )
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        # (finish time, latency) of every event and finish time of every
+        # error, to split the run by ramp step.
+        self.timeline: List[Tuple[float, float]] = []
+        self.error_times: List[float] = []
+        # (start time, clients connected) of every ramp step.
+        self.steps: List[Tuple[float, int]] = []
+
+    def step_of(self, when: float) -> int:
+        return max(bisect.bisect_right([start for start, _ in self.steps], when) - 1, 0)
+
+
+async def run_client(
+    url: str,
+    names,
+    deadline: float,
+    stats: Stats,
+    rng: random.Random,
+    think_seconds: float,
+    timeout: float,
+):
+    import socketio
+
+    hydrate_name, state_name = names
+    token = str(uuid.uuid4())
+    sio = socketio.AsyncClient(reconnection=False)
+    waiting: Optional[asyncio.Future] = None
+
+    @sio.on("event", namespace=EVENT_NAMESPACE)
+    async def on_update(update):
+        if isinstance(update, str):
+            update = json.loads(update)
+        if update.get("final") and waiting is not None and not waiting.done():
+            waiting.set_result(None)
+
+    async def send(name: str, payload: dict, label: str):
+        nonlocal waiting
+        waiting = asyncio.get_running_loop().create_future()
+        event = {
+            "name": name,
+            "payload": payload,
+            "token": token,
+            "router_data": {"pathname": "/", "query": {}, "asPath": "/"},
+        }
+        start = time.perf_counter()
+        try:
+            await sio.emit("event", event, namespace=EVENT_NAMESPACE)
+            await asyncio.wait_for(waiting, timeout)
+        except Exception:
+            stats.errors[label] += 1
+            stats.error_times.append(time.perf_counter())
+            return
+        end = time.perf_counter()
+        stats.latencies[label].append(end - start)
+        stats.timeline.append((end, end - start))
+
+    try:
+        await sio.connect(
+            f"{url}?token={token}",
+            socketio_path=EVENT_NAMESPACE,
+            namespaces=[EVENT_NAMESPACE],
+            transports=["websocket"],
+            wait_timeout=timeout,
+        )
+    except Exception:
+        stats.errors["connect"] += 1
+        stats.error_times.append(time.perf_counter())
+        return
+
+    try:
+        await send(hydrate_name, {}, "hydrate")
+        await send(f"{state_name}.load_initial_data", {}, "load_initial_data")
+        while time.perf_counter() < deadline and sio.connected:
+            for handler, payload in interaction(rng):
+                await send(f"{state_name}.{handler}", payload, handler)
+            if think_seconds:
+                await asyncio.sleep(rng.uniform(0, 2 * think_seconds))
+    finally:
+        await sio.disconnect()
+
+
+def _process_tree(pid: int) -> List[int]:
+    """``pid`` and all of its descendants, from /proc."""
+    children = defaultdict(list)
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children[ppid].append(int(entry.name))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def sample_resources(pid: int):
+    """(RSS in MiB, CPU seconds) summed over a process tree."""
+    rss_pages = 0
+    ticks = 0
+    for member in _process_tree(pid):
+        try:
+            stat = Path(f"/proc/{member}/stat").read_text().rsplit(")", 1)[1].split()
+            rss_pages += int(Path(f"/proc/{member}/statm").read_text().split()[1])
+        except OSError:
+            continue
+        ticks += int(stat[11]) + int(stat[12])
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    return rss_pages * page_size / 1024**2, ticks / os.sysconf("SC_CLK_TCK")
+
+
+async def monitor(pid: Optional[int], samples: list, stop: asyncio.Event):
+    """Append (time, RSS in MiB, CPU seconds) samples until ``stop`` is set."""
+    while pid is not None and not stop.is_set():
+        samples.append((time.perf_counter(), *sample_resources(pid)))
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_server(db_path: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DB_PATH": db_path}
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "reflex", "run",
+            "--env", "prod", "--backend-only",
+            "--backend-port", str(port), "--loglevel", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+        start_new_session=True,
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Backend exited during startup")
+        try:
+            urllib.request.urlopen(f"http://localhost:{port}/ping", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.5)
+    stop_server(process)
+    raise RuntimeError("Backend did not start within 120 s")
+
+
+def stop_server(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+async def run_load(args, url: str, pid: Optional[int]):
+    names = _state_names()
+    stats = Stats()
+    samples: list = []
+    stop = asyncio.Event()
+    monitor_task = asyncio.create_task(monitor(pid, samples, stop))
+
+    start = time.perf_counter()
+    deadline = start + args.steps * args.step_seconds
+    clients = []
+    for step in range(args.steps):
+        await asyncio.sleep(max(start + step * args.step_seconds - time.perf_counter(), 0))
+        target = round(args.clients * (step + 1) / args.steps)
+        stats.steps.append((time.perf_counter(), target))
+        while len(clients) < target:
+            rng = random.Random(args.seed + len(clients))
+            clients.append(
+                asyncio.create_task(
+                    run_client(url, names, deadline, stats, rng, args.think / 1000, args.timeout)
+                )
+            )
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor_task
+    return stats, samples, elapsed
+
+
+def report_steps(stats: Stats, samples: list, end: float):
+    """Throughput, latency and server RSS while each number of clients was connected."""
+    events = defaultdict(list)
+    for when, latency in stats.timeline:
+        events[stats.step_of(when)].append(latency)
+    errors = defaultdict(int)
+    for when in stats.error_times:
+        errors[stats.step_of(when)] += 1
+    rss = defaultdict(list)
+    for when, rss_mib, _ in samples:
+        rss[stats.step_of(when)].append(rss_mib)
+
+    print(
+        f"{'clients':>8}{'seconds':>9}{'events':>9}{'events/s':>10}"
+        f"{'p50':>9}{'p90':>9}{'p99':>9}{'errors':>8}{'RSS MiB':>9}"
+    )
+    for step, (start, clients) in enumerate(stats.steps):
+        step_end = stats.steps[step + 1][0] if step + 1 < len(stats.steps) else end
+        seconds = step_end - start
+        latencies = np.array(events[step]) * 1000
+        if len(latencies):
+            p50, p90, p99 = (f"{value:.1f}" for value in np.percentile(latencies, [50, 90, 99]))
+        else:
+            p50 = p90 = p99 = "-"
+        peak_rss = f"{max(rss[step]):.0f}" if rss[step] else "-"
+        print(
+            f"{clients:>8}{seconds:>9.1f}{len(latencies):>9}"
+            f"{len(latencies) / seconds if seconds else 0:>10.1f}"
+            f"{p50:>9}{p90:>9}{p99:>9}{errors[step]:>8}{peak_rss:>9}"
+        )
+
+
+def report(args, stats: Stats, samples: list, elapsed: float):
+    report_steps(stats, samples, stats.steps[0][0] + elapsed if stats.steps else elapsed)
+    print()
+    total = sum(len(values) for values in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(
+        f"{args.clients} clients, {elapsed:.1f} s: {total:,} events, "
+        f"{total / elapsed:,.1f} events/s, {errors} errors"
+    )
+    print(f"{'event':<30}{'count':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    rows = sorted(stats.latencies.items(), key=lambda item: -len(item[1]))
+    everything = np.concatenate([np.array(values) for _, values in rows]) if rows else np.array([])
+    for name, values in rows + [("all", everything)]:
+        if not len(values):
+            continue
+        p50, p90, p99 = np.percentile(np.array(values) * 1000, [50, 90, 99])
+        print(
+            f"{name:<30}{len(values):>8}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}"
+            f"{max(values) * 1000:>9.1f}"
+        )
+    for name, count in stats.errors.items():
+        print(f"errors in {name}: {count}")
+    if len(samples) >= 2:
+        rss = [rss for _, rss, _ in samples]
+        cpu_seconds = samples[-1][2] - samples[0][2]
+        print(
+            f"server RSS start {rss[0]:.0f} MiB, peak {max(rss):.0f} MiB, "
+            f"end {rss[-1]:.0f} MiB; CPU {cpu_seconds:.1f} s "
+            f"({100 * cpu_seconds / elapsed:.0f}% of one core)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--clients", type=int, default=20, help="clients after the last step")
+    parser.add_argument("--steps", type=int, default=4, help="batches the clients connect in")
+    parser.add_argument("--step-seconds", type=float, default=15, help="seconds between batches")
+    parser.add_argument("--think", type=float, default=0, help="mean pause between events, ms")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for an event")
+    parser.add_argument("--rows", type=int, default=200_000, help="rows of the generated database")
+    parser.add_argument("--port", type=int, default=8035)
+    parser.add_argument("--url", help="use a running backend instead of starting one")
+    parser.add_argument("--pid", type=int, help="process to measure when using --url")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.url:
+        stats, samples, elapsed = asyncio.run(run_load(args, args.url, args.pid))
+        report(args, stats, samples, elapsed)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "orders.db")
+        build_load_database(db_path, args.rows)
+        print(f"{args.rows:,} rows in {db_path}")
+        server = start_server(db_path, args.port)
+        try:
+            stats, samples, elapsed = asyncio.run(
+                run_load(args, f"http://localhost:{args.port}", server.pid)
+            )
+        finally:
+            stop_server(server)
+        report(args, stats, samples, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import datetime
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from data_dashboard.services.database_service import DatabaseService
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "schema.sql"
+
+LOADED_AT = datetime.datetime(2024, 3, 1, 8, 0, 0)
+
+ORDER_COLUMNS = (
+    "order_id",
+    "customer_name",
+    "phone_number",
+    "document_number",
+    "order_date",
+    "product_code",
+    "product_name",
+    "imei",
+    "quantity",
+    "revenue",
+    "source_type",
+    "status",
+    "error_code",
+)
+
+# Order lines covering what filters and lookups have to tell apart:
+# diacritics, spaced and country-coded phone numbers, missing values,
+# multi-line orders and exact duplicate lines.
+ORDER_ROWS = [
+    ("DH-0001", "Đặng Văn Hùng", "+84 912 345 678", "CT.001", "2024-01-03", "SP01", "Điện thoại A", "IMEI-111", 1, 1500000.0, "online", "completed", None),
+    ("DH-0001", "Đặng Văn Hùng", "+84 912 345 678", "CT.001", "2024-01-03", "SP02", "Ốp lưng", "IMEI-112", 2, 90000.0, "online", "completed", None),
+    ("DH-0002", "Nguyễn Thị Lan", "0987 654 321", "CT.002", "2024-01-05", "SP01", "Điện thoại A", "IMEI-221", 1, 1450000.0, "offline", "needs_retry", "E_STOCK"),
+    ("DH-0003", "Trần Minh", "0912345678", "CT.003", "2024-01-05", "SP03", "Tai nghe", None, 1, None, "online", "pending", None),
+    ("DH-0004", "Lê Thu Hà", None, None, None, "SP04", "Sạc nhanh", "IMEI-441", 3, 300000.0, "offline", "needs_retry", "E_CODE"),
+    ("DH-0005", "dang van hung", "0933 000 111", "CT.005", "2024-02-10", "SP02", "Ốp lưng", "IMEI-551", 1, 45000.0, "online", "completed", None),
+    ("DH-0005", "dang van hung", "0933 000 111", "CT.005", "2024-02-10", "SP02", "Ốp lưng", "IMEI-551", 1, 45000.0, "online", "completed", None),
+    ("DH-0006", "Phạm Quốc Bảo", "0909 123 123", "CT.006", "2024-02-28", "SP05", "Máy tính bảng", "IMEI-661", 1, 7200000.0, "offline", "needs_retry", "E_STOCK"),
+]
+
+
+def insert_orders(con, rows, updated_at=LOADED_AT):
+    """Insert order lines given as ORDER_COLUMNS tuples."""
+    columns = ", ".join(ORDER_COLUMNS + ("created_at", "updated_at"))
+    placeholders = ", ".join("?" for _ in ORDER_COLUMNS + ("created_at", "updated_at"))
+    con.executemany(
+        f"INSERT INTO orders ({columns}) VALUES ({placeholders})",
+        [list(row) + [updated_at, updated_at] for row in rows],
+    )
+
+
+@pytest.fixture
+def orders_db(tmp_path):
+    """A DatabaseService on a fresh database holding ORDER_ROWS."""
+    db_path = tmp_path / "orders.db"
+    con = duckdb.connect(str(db_path))
+    con.execute(SCHEMA_PATH.read_text())
+    insert_orders(con, ORDER_ROWS)
+    con.close()
+
+    service = DatabaseService(db_path=str(db_path))
+    yield service
+    service.close_connection()
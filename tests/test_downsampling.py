@@ -0,0 +1,60 @@
+import numpy as np
+
+from data_dashboard.services.downsampling import minmax_indices
+
+
+def test_short_series_are_kept_whole():
+    values = np.arange(10, dtype=float)
+
+    assert minmax_indices([values], 10).tolist() == list(range(10))
+    assert minmax_indices([values], 0).tolist() == list(range(10))
+
+
+def test_empty_input():
+    assert minmax_indices([], 10).tolist() == []
+    assert minmax_indices([np.array([])], 10).tolist() == []
+
+
+def test_result_is_bounded_sorted_and_keeps_the_ends():
+    rng = np.random.default_rng(0)
+    series = [rng.normal(size=1000), rng.normal(size=1000)]
+
+    indices = minmax_indices(series, 100)
+
+    assert len(indices) <= 100
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+
+
+def test_spikes_and_drops_survive():
+    values = np.zeros(1000)
+    values[437] = 50.0
+    values[612] = -50.0
+    flat = np.ones(1000)
+
+    indices = minmax_indices([flat, values], 40)
+
+    assert 437 in indices
+    assert 612 in indices
+
+
+def test_every_series_keeps_its_extremes():
+    first = np.zeros(500)
+    second = np.zeros(500)
+    first[101] = 1.0
+    second[333] = 1.0
+
+    indices = minmax_indices([first, second], 30)
+
+    assert 101 in indices
+    assert 333 in indices
+
+
+def test_length_not_multiple_of_bucket_size():
+    values = np.arange(1001, dtype=float)[::-1]
+
+    indices = minmax_indices([values], 50)
+
+    assert len(indices) <= 50
+    assert indices.max() == 1000
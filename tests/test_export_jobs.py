@@ -0,0 +1,68 @@
+import threading
+
+from data_dashboard.services.export_jobs import ExportJobManager, artifact_key
+
+
+def test_artifact_key_ignores_key_order():
+    first = artifact_key({"version": "1", "format": "csv", "filters": {"types": ["online"]}})
+    second = artifact_key({"filters": {"types": ["online"]}, "format": "csv", "version": "1"})
+
+    assert first == second
+    assert first != artifact_key({"version": "2", "format": "csv", "filters": {"types": ["online"]}})
+
+
+def _blocking_export():
+    started = threading.Event()
+    release = threading.Event()
+
+    def run(job):
+        started.set()
+        while not release.wait(0.01):
+            job.check_cancelled()
+        return "/exports/orders.csv"
+
+    return run, started, release
+
+
+def test_identical_exports_share_one_job():
+    manager = ExportJobManager(max_workers=1)
+    run, started, release = _blocking_export()
+
+    first = manager.submit("key", "orders.csv", run, lambda key, filename: None, subscriber="a")
+    second = manager.submit("key", "orders.csv", run, lambda key, filename: None, subscriber="b")
+    started.wait(1)
+    release.set()
+    manager._executor.shutdown(wait=True)
+
+    assert second is first
+    assert first.status == "done"
+    assert first.url == "/exports/orders.csv"
+
+
+def test_cached_artifact_is_served_without_running():
+    manager = ExportJobManager(max_workers=1)
+
+    def run(job):
+        raise AssertionError("cached exports are not rebuilt")
+
+    job = manager.submit("key", "orders.csv", run, lambda key, filename: "/exports/cached.csv")
+
+    assert job.status == "done"
+    assert job.url == "/exports/cached.csv"
+
+
+def test_shared_export_is_cancelled_only_by_its_last_session():
+    manager = ExportJobManager(max_workers=1)
+    run, started, release = _blocking_export()
+
+    job = manager.submit("key", "orders.csv", run, lambda key, filename: None, subscriber="a")
+    manager.submit("key", "orders.csv", run, lambda key, filename: None, subscriber="b")
+    started.wait(1)
+
+    manager.cancel(job.id, subscriber="a")
+    assert not job._cancelled.is_set()
+
+    manager.cancel(job.id, subscriber="b")
+    manager._executor.shutdown(wait=True)
+    assert job.status == "cancelled"
+    release.set()
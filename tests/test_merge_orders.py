@@ -0,0 +1,78 @@
+import datetime
+
+from conftest import LOADED_AT, insert_orders
+
+from data_dashboard.services.orders_query import merge_orders
+
+CHANGED_AT = LOADED_AT + datetime.timedelta(minutes=5)
+
+
+def _merged_after(service, change):
+    loaded = service.get_orders_data()
+    since = service.get_watermarks()["orders_updated_at"]
+    change(service.get_connection())
+    merged = merge_orders(loaded, service.get_orders_data(updated_since=since))
+    return loaded, merged
+
+
+def test_merge_matches_reload_after_updates(orders_db):
+    def change(con):
+        con.execute(
+            "UPDATE orders SET status = 'completed', error_code = NULL, updated_at = ? "
+            "WHERE order_id = 'DH-0002'",
+            [CHANGED_AT],
+        )
+        con.execute(
+            "UPDATE orders SET revenue = 99000, updated_at = ? WHERE product_code = 'SP02'",
+            [CHANGED_AT],
+        )
+
+    loaded, merged = _merged_after(orders_db, change)
+
+    assert merged == orders_db.get_orders_data()
+    assert len(merged) == len(loaded)
+
+
+def test_merge_matches_reload_after_inserts(orders_db):
+    def change(con):
+        insert_orders(
+            con,
+            [
+                # Newer than every loaded line, so it sorts first.
+                ("DH-0007", "Võ Thị Mai", "0911 222 333", "CT.007", "2024-03-01", "SP01", "Điện thoại A", "IMEI-771", 1, 1500000.0, "online", "pending", None),
+                # Same date as loaded lines, so its place depends on the id.
+                ("DH-0008", "Hoàng Nam", "0922 444 555", "CT.008", "2024-01-05", "SP03", "Tai nghe", "IMEI-881", 1, 250000.0, "offline", "pending", None),
+                # No date, so it sorts last.
+                ("DH-0009", "Bùi An", None, None, None, "SP04", "Sạc nhanh", None, 1, None, "online", "pending", None),
+                # A third copy of an exact duplicate line.
+                ("DH-0005", "dang van hung", "0933 000 111", "CT.005", "2024-02-10", "SP02", "Ốp lưng", "IMEI-551", 1, 45000.0, "online", "completed", None),
+            ],
+            updated_at=CHANGED_AT,
+        )
+
+    loaded, merged = _merged_after(orders_db, change)
+
+    assert merged == orders_db.get_orders_data()
+    assert len(merged) == len(loaded) + 4
+
+
+def test_loaded_lines_keep_their_ids(orders_db):
+    def change(con):
+        con.execute(
+            "UPDATE orders SET status = 'completed', updated_at = ? WHERE order_id = 'DH-0006'",
+            [CHANGED_AT],
+        )
+
+    loaded, merged = _merged_after(orders_db, change)
+
+    assert {item["id"] for item in merged} == {item["id"] for item in loaded}
+
+
+def test_merge_without_changes_keeps_rows():
+    rows = [
+        {"id": 2, "order_date": "2024-01-05"},
+        {"id": 1, "order_date": "2024-01-05"},
+        {"id": 3, "order_date": ""},
+    ]
+
+    assert merge_orders(rows, []) == [rows[1], rows[0], rows[2]]
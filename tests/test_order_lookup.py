@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from conftest import LOADED_AT, insert_orders
+
+from data_dashboard.services.search_index import IdentifierIndex
+
+LOOKUPS = [
+    ("phone_number", "0912 345 678"),
+    ("phone_number", "+84 987 654 321"),
+    ("imei", "imei111"),
+    ("imei", "IMEI-551"),
+    ("order_id", "dh 0001"),
+    ("order_id", "DH-0005"),
+    ("document_number", "ct003"),
+    ("document_number", "CT.404"),
+]
+
+
+def _expected(rows, field, value):
+    return [rows[position]["id"] for position in IdentifierIndex(rows).lookup(field, value)]
+
+
+@pytest.mark.parametrize("field, value", LOOKUPS)
+def test_lookup_matches_identifier_index(orders_db, field, value):
+    rows = orders_db.get_orders_data()
+
+    found = orders_db.find_orders(field, value)
+
+    assert [item["id"] for item in found] == _expected(rows, field, value)
+    assert all(set(item) == set(rows[0]) for item in found)
+
+
+def test_lookup_follows_inserts_and_updates(orders_db):
+    assert orders_db.find_orders("phone_number", "0911222333") == []
+    changed_at = LOADED_AT + datetime.timedelta(minutes=5)
+
+    con = orders_db.get_connection()
+    insert_orders(
+        con,
+        [("DH-0007", "Võ Thị Mai", "0911 222 333", "CT.007", "2024-03-01", "SP01", "Điện thoại A", "IMEI-771", 1, 1500000.0, "online", "pending", None)],
+        updated_at=changed_at,
+    )
+    con.execute(
+        "UPDATE orders SET imei = 'IMEI-999', updated_at = ? WHERE imei = 'IMEI-441'",
+        [changed_at],
+    )
+    rows = orders_db.get_orders_data()
+
+    assert [item["order_id"] for item in orders_db.find_orders("phone_number", "0911222333")] == ["DH-0007"]
+    assert orders_db.find_orders("imei", "IMEI-441") == []
+    assert [item["id"] for item in orders_db.find_orders("imei", "imei999")] == _expected(rows, "imei", "imei999")
+
+
+def test_lookup_rebuilds_after_deletes(orders_db):
+    assert orders_db.find_orders("order_id", "DH-0002")
+
+    orders_db.get_connection().execute("DELETE FROM orders WHERE order_id = 'DH-0002'")
+
+    assert orders_db.find_orders("order_id", "DH-0002") == []
+
+
+def test_lookup_rejects_other_fields(orders_db):
+    with pytest.raises(ValueError):
+        orders_db.find_orders("customer_name", "Trần Minh")
@@ -0,0 +1,53 @@
+import pytest
+
+from data_dashboard.services.orders_query import (
+    ORDERS_ID_SQL,
+    empty_orders_filter,
+    orders_filter_predicate,
+    orders_filter_sql,
+)
+
+FILTERS = [
+    {},
+    {"search_customer": "hùng"},
+    {"search_customer": "DANG VAN"},
+    {"search_customer": "dh-000"},
+    {"search_customer": "0912"},
+    {"search_customer": "đ"},
+    {"search_customer": "0912 345 678", "search_mode": "phone_number"},
+    {"search_customer": "+84912345678", "search_mode": "phone_number"},
+    {"search_customer": "imei 111", "search_mode": "imei"},
+    {"search_customer": "dh0005", "search_mode": "order_id"},
+    {"search_customer": "ct-003", "search_mode": "document_number"},
+    {"search_customer": "---", "search_mode": "imei"},
+    {"types": ["online"]},
+    {"types": ["online", "offline"]},
+    {"products": ["Ốp lưng", "Tai nghe"]},
+    {"min_revenue": 100000.0},
+    {"max_revenue": 0.0},
+    {"min_revenue": 45000.0, "max_revenue": 1450000.0},
+    {"start_date": "2024-01-05"},
+    {"end_date": "2024-01-05"},
+    {"start_date": "2024-01-04", "end_date": "2024-02-10", "types": ["online"]},
+    {"error_code": "E_STOCK"},
+    {"error_code": "E_STOCK", "search_customer": "phạm"},
+    {"products": ["Điện thoại A"], "min_revenue": 1450000.0, "search_customer": "lan"},
+]
+
+
+@pytest.mark.parametrize("overrides", FILTERS)
+def test_sql_and_python_filters_select_the_same_rows(orders_db, overrides):
+    filters = {**empty_orders_filter(), **overrides}
+    rows = orders_db.get_orders_data()
+    matches = orders_filter_predicate(filters)
+    where, params = orders_filter_sql(filters)
+
+    selected = orders_db.get_connection().execute(
+        f"SELECT id FROM (SELECT {ORDERS_ID_SQL} as id, * FROM orders) WHERE {where}",
+        params,
+    ).fetchall()
+
+    assert sorted(row[0] for row in selected) == sorted(
+        item["id"] for item in rows if matches(item)
+    )
+
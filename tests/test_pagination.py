@@ -0,0 +1,87 @@
+from data_dashboard.services.orders_query import orders_page_order
+from data_dashboard.services.pagination import (
+    cursor_position,
+    decode_cursor,
+    encode_cursor,
+    row_positions,
+)
+
+SORT_SPEC = ["Doanh thu", True]
+
+
+def _revenue(item):
+    return item["revenue"]
+
+
+def _rows(revenues):
+    return [{"id": 100 + index, "revenue": revenue} for index, revenue in enumerate(revenues)]
+
+
+def _position(cursor, rows, sort_spec=SORT_SPEC, ascending=True):
+    return cursor_position(cursor, rows, row_positions(rows), sort_spec, _revenue, ascending)
+
+
+def test_cursor_round_trip():
+    row = {"id": 7, "revenue": 1.5, "customer_name": "Đặng Văn Hùng"}
+
+    cursor = encode_cursor(row, SORT_SPEC, _revenue)
+
+    assert decode_cursor(cursor) == [SORT_SPEC, 1.5, 7]
+    assert "/" not in cursor and "+" not in cursor
+
+
+def test_garbage_cursors_decode_to_none():
+    assert decode_cursor("not a cursor") is None
+    assert decode_cursor("") is None
+    assert decode_cursor(encode_cursor({"id": 1, "revenue": 1}, SORT_SPEC, _revenue)[:-4]) is None
+
+
+def test_page_follows_its_row_across_inserts():
+    rows = _rows([10, 20, 30, 40, 50])
+    cursor = encode_cursor(rows[3], SORT_SPEC, _revenue)
+
+    rows = _rows([5, 10, 15, 20, 30]) + [{"id": 103, "revenue": 40}, {"id": 104, "revenue": 50}]
+
+    assert _position(cursor, rows) == 5
+
+
+def test_page_of_a_removed_row_starts_at_the_next_value():
+    rows = _rows([10, 20, 30, 40, 50])
+    cursor = encode_cursor(rows[2], SORT_SPEC, _revenue)
+
+    remaining = rows[:2] + rows[3:]
+
+    assert _position(cursor, remaining) == 2
+
+
+def test_descending_order():
+    rows = _rows([50, 40, 30, 20, 10])
+    cursor = encode_cursor(rows[2], ["Doanh thu", False], _revenue)
+
+    remaining = rows[:2] + rows[3:]
+
+    assert _position(cursor, remaining, ["Doanh thu", False], ascending=False) == 2
+
+
+def test_cursor_of_another_sort_starts_over():
+    rows = _rows([10, 20, 30])
+    cursor = encode_cursor(rows[2], ["Ngày Ct", True], _revenue)
+
+    assert _position(cursor, rows) == 0
+    assert _position("", rows) == 0
+    assert _position("garbage", rows) == 0
+
+
+def test_default_order_cursor_survives_new_orders():
+    sort_value, ascending = orders_page_order(None)
+    rows = [
+        {"id": 1, "order_date": "2024-02-10"},
+        {"id": 2, "order_date": "2024-01-05"},
+        {"id": 3, "order_date": ""},
+    ]
+    cursor = encode_cursor(rows[1], [None, True], sort_value)
+
+    rows = [{"id": 4, "order_date": "2024-03-01"}] + [rows[0], rows[2]]
+
+    assert ascending is False
+    assert cursor_position(cursor, rows, row_positions(rows), [None, True], sort_value, ascending) == 2
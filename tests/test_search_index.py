@@ -0,0 +1,116 @@
+import numpy as np
+
+from data_dashboard.services.search_index import (
+    IdentifierIndex,
+    TrigramIndex,
+    normalize_identifier,
+    normalize_text,
+    search_text,
+)
+
+ROWS = [
+    {"customer_name": "Đặng Văn Hùng", "phone_number": "0912345678", "order_id": "DH-0001"},
+    {"customer_name": "Nguyễn Thị Lan", "phone_number": "0987654321", "order_id": "DH-0002"},
+    {"customer_name": "dang van hung", "phone_number": None, "order_id": "DH-0003"},
+    {"customer_name": "Trần Minh", "phone_number": "0933000111", "order_id": "HD-1234"},
+]
+
+
+def _scan(rows, query):
+    needle = normalize_text(query)
+    return [position for position, row in enumerate(rows) if needle in search_text(row)]
+
+
+def test_normalize_text_strips_diacritics_and_case():
+    assert normalize_text("Đặng Văn Hùng") == "dang van hung"
+    assert normalize_text("ĐƯỜNG Lê Lợi") == "duong le loi"
+    assert normalize_text("abc-123") == "abc-123"
+    assert normalize_text(None) == ""
+    assert normalize_text(42) == "42"
+
+
+def test_search_ignores_diacritics():
+    index = TrigramIndex(ROWS)
+
+    assert index.search("hùng").tolist() == [0, 2]
+    assert index.search("DANG VAN").tolist() == [0, 2]
+    assert index.search("thị lan").tolist() == [1]
+
+
+def test_search_matches_any_field():
+    index = TrigramIndex(ROWS)
+
+    assert index.search("0933").tolist() == [3]
+    assert index.search("dh-000").tolist() == [0, 1, 2]
+
+
+def test_short_and_empty_queries():
+    index = TrigramIndex(ROWS)
+
+    assert index.search("").tolist() == [0, 1, 2, 3]
+    assert index.search("lA").tolist() == [1]
+    assert index.search("x").tolist() == []
+
+
+def test_matches_never_span_two_fields_or_rows():
+    index = TrigramIndex(ROWS)
+
+    # "hung" ends a name and "0912" starts the phone number of the same row.
+    assert index.search("hung0912").tolist() == []
+    assert index.search("lan0987").tolist() == []
+    # "0002" ends row 1 and "dang" starts row 2.
+    assert index.search("0002dang").tolist() == []
+
+
+def test_search_matches_a_full_scan():
+    rng = np.random.default_rng(7)
+    alphabet = list("aăâbcdđeêghiklmnoôơpqrstuưvxy 0123456789")
+    rows = [
+        {
+            "customer_name": "".join(rng.choice(alphabet, size=12)),
+            "phone_number": "".join(rng.choice(list("0123456789"), size=10)),
+            "order_id": f"DH{index:05d}",
+        }
+        for index in range(300)
+    ]
+    index = TrigramIndex(rows)
+
+    for query in ["ơn", "dđa", "a b", "123", "dh001", "dh0029", "ăâ", "zzz", "01 2"]:
+        assert index.search(query).tolist() == _scan(rows, query), query
+
+
+def test_empty_index():
+    index = TrigramIndex([])
+
+    assert len(index) == 0
+    assert index.search("abc").tolist() == []
+    assert index.search("").tolist() == []
+
+
+def test_normalize_identifier():
+    assert normalize_identifier("order_id", "DH-0001") == "dh0001"
+    assert normalize_identifier("imei", " 35 6789.012 ") == "356789012"
+    assert normalize_identifier("phone_number", "+84 912 345 678") == "0912345678"
+    assert normalize_identifier("phone_number", "0912.345.678") == "0912345678"
+    # Only phone numbers have a country code.
+    assert normalize_identifier("imei", "84912345678") == "84912345678"
+    assert normalize_identifier("order_id", None) == ""
+
+
+def test_identifier_lookup():
+    rows = [
+        {"phone_number": "+84 912 345 678", "imei": "IMEI-1", "order_id": "DH-0001"},
+        {"phone_number": "0912345678", "imei": "IMEI-2", "order_id": "DH-0001"},
+        {"phone_number": "0987654321", "imei": None, "order_id": "DH-0002"},
+    ]
+    index = IdentifierIndex(rows, fields=("phone_number", "imei", "order_id"))
+
+    assert len(index) == 3
+    assert index.lookup("phone_number", "0912 345 678") == [0, 1]
+    assert index.lookup("order_id", "dh0001") == [0, 1]
+    assert index.lookup("order_id", "DH-0002") == [2]
+    assert index.lookup("imei", "imei 2") == [1]
+    assert index.lookup("imei", "IMEI-3") == []
+    # Blank values and unknown fields find nothing.
+    assert index.lookup("imei", "--") == []
+    assert index.lookup("document_number", "DH-0001") == []
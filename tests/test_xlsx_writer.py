@@ -0,0 +1,89 @@
+import datetime
+
+from openpyxl import load_workbook
+
+from data_dashboard.services.xlsx_writer import _sheet_name, batched, write_xlsx
+
+HEADERS = ["Mã đơn hàng", "Ngày Ct", "Doanh thu"]
+
+
+def _rows(count):
+    return [
+        (f"DH{index:04d}", datetime.date(2024, 1, 1 + index % 28), index * 1.5)
+        for index in range(count)
+    ]
+
+
+def _sheets(path):
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return {
+            sheet.title: [list(row) for row in sheet.iter_rows(values_only=True)]
+            for sheet in workbook.worksheets
+        }
+    finally:
+        workbook.close()
+
+
+def test_rows_fit_in_one_sheet(tmp_path):
+    path = tmp_path / "orders.xlsx"
+    rows = _rows(5)
+
+    written = write_xlsx(str(path), HEADERS, batched(rows, 2), sheet_name="Orders")
+
+    assert written == 5
+    sheets = _sheets(path)
+    assert list(sheets) == ["Orders"]
+    assert sheets["Orders"][0] == HEADERS
+    assert [row[0] for row in sheets["Orders"][1:]] == [row[0] for row in rows]
+    assert sheets["Orders"][1][1] == datetime.datetime(2024, 1, 1)
+    assert sheets["Orders"][2][2] == 1.5
+
+
+def test_rows_split_across_sheets_with_repeated_header(tmp_path):
+    path = tmp_path / "orders.xlsx"
+    rows = _rows(7)
+
+    # Three rows per sheet: the header and two data rows.
+    written = write_xlsx(
+        str(path), HEADERS, batched(rows, 3), sheet_name="Orders", max_rows_per_sheet=3
+    )
+
+    assert written == 7
+    sheets = _sheets(path)
+    assert list(sheets) == ["Orders", "Orders (2)", "Orders (3)", "Orders (4)"]
+    for rows_in_sheet in sheets.values():
+        assert rows_in_sheet[0] == HEADERS
+        assert 1 <= len(rows_in_sheet) - 1 <= 2
+    exported = [row[0] for sheet in sheets.values() for row in sheet[1:]]
+    assert exported == [row[0] for row in rows]
+
+
+def test_split_exactly_at_the_limit_adds_no_empty_sheet(tmp_path):
+    path = tmp_path / "orders.xlsx"
+
+    write_xlsx(str(path), HEADERS, [_rows(4)], sheet_name="Orders", max_rows_per_sheet=3)
+
+    assert list(_sheets(path)) == ["Orders", "Orders (2)"]
+
+
+def test_no_rows_still_writes_the_header(tmp_path):
+    path = tmp_path / "orders.xlsx"
+
+    assert write_xlsx(str(path), HEADERS, [], sheet_name="Orders") == 0
+    assert _sheets(path) == {"Orders": [HEADERS]}
+
+
+def test_progress_is_reported_per_batch(tmp_path):
+    reported = []
+
+    write_xlsx(str(tmp_path / "orders.xlsx"), HEADERS, batched(_rows(5), 2), on_batch=reported.append)
+
+    assert reported == [2, 4, 5]
+
+
+def test_sheet_names_fit_excel_limit():
+    base = "x" * 40
+
+    assert _sheet_name(base, 0) == "x" * 31
+    assert _sheet_name(base, 11) == "x" * 26 + " (12)"